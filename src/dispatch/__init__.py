@@ -67,6 +67,8 @@ try:
     from dispatch.case.severity.models import CaseSeverity  # noqa lgtm[py/unused-import]
     from dispatch.case.type.models import CaseType  # noqa lgtm[py/unused-import]
     from dispatch.signal.models import Signal  # noqa lgtm[py/unused-import]
+    from dispatch.lease.models import SchedulerLease  # noqa lgtm[py/unused-import]
+    from dispatch.job.models import Job  # noqa lgtm[py/unused-import]
 except Exception:
     traceback.print_exc()
 
@@ -21,6 +21,7 @@ from dispatch.data.source.type.views import router as source_type_router
 from dispatch.data.source.views import router as source_router
 from dispatch.definition.views import router as definition_router
 from dispatch.document.views import router as document_router
+from dispatch.event.views import router as event_router
 from dispatch.feedback.views import router as feedback_router
 from dispatch.incident.priority.views import router as incident_priority_router
 from dispatch.incident.severity.views import router as incident_severity_router
@@ -131,6 +132,9 @@ authenticated_organization_api_router.include_router(user_router, prefix="/users
 authenticated_organization_api_router.include_router(
     document_router, prefix="/documents", tags=["documents"]
 )
+authenticated_organization_api_router.include_router(
+    event_router, prefix="/events", tags=["events"]
+)
 authenticated_organization_api_router.include_router(tag_router, prefix="/tags", tags=["tags"])
 authenticated_organization_api_router.include_router(
     tag_type_router, prefix="/tag_types", tags=["tag_types"]
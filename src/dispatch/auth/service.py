@@ -4,9 +4,13 @@
     :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
     :license: Apache, see LICENSE for more details.
 """
+import hashlib
 import logging
+import threading
+import time
 from typing import Optional
 
+from cachetools import TLRUCache
 from fastapi import HTTPException, Depends
 from starlette.requests import Request
 from starlette.status import HTTP_401_UNAUTHORIZED
@@ -14,8 +18,10 @@ from starlette.status import HTTP_401_UNAUTHORIZED
 from sqlalchemy.exc import IntegrityError
 
 from dispatch.config import (
-    DISPATCH_AUTHENTICATION_PROVIDER_SLUG,
+    DISPATCH_AUTHENTICATION_CACHE_SIZE,
+    DISPATCH_AUTHENTICATION_CACHE_TTL,
     DISPATCH_AUTHENTICATION_DEFAULT_USER,
+    DISPATCH_AUTHENTICATION_PROVIDER_SLUG,
 )
 from dispatch.enums import UserRoles
 from dispatch.organization import service as organization_service
@@ -41,6 +47,18 @@ InvalidCredentialException = HTTPException(
 )
 
 
+def get_credential_expiration(key, value, now) -> float:
+    """Cached credentials expire after the configured TTL, or with their token if sooner."""
+    return value[1]
+
+
+# maps a credential digest to the resolved user email and when it expires
+_credential_cache = TLRUCache(
+    maxsize=DISPATCH_AUTHENTICATION_CACHE_SIZE, ttu=get_credential_expiration, timer=time.time
+)
+_credential_cache_lock = threading.Lock()
+
+
 def get(*, db_session, user_id: int) -> Optional[DispatchUser]:
     """Returns a user based on the given user id."""
     return db_session.query(DispatchUser).filter(DispatchUser.id == user_id).one_or_none()
@@ -226,14 +244,68 @@ def update(*, db_session, user: DispatchUser, user_in: UserUpdate) -> DispatchUs
     return user
 
 
-def get_current_user(request: Request) -> DispatchUser:
-    """Attempts to get the current user depending on the configured authentication provider."""
-    if DISPATCH_AUTHENTICATION_PROVIDER_SLUG:
-        auth_plugin = plugins.get(DISPATCH_AUTHENTICATION_PROVIDER_SLUG)
-        user_email = auth_plugin.get_current_user(request)
-    else:
+def get_credential_digest(auth_plugin, credential: str) -> str:
+    """Returns a digest of the credential an authentication provider reads."""
+    return hashlib.sha256(f"{auth_plugin.slug}:{credential}".encode("utf-8")).hexdigest()
+
+
+def get_cached_credential(digest: str) -> Optional[str]:
+    """Returns the cached user email of a credential or None."""
+    with _credential_cache_lock:
+        value = _credential_cache.get(digest)
+    return value[0] if value else None
+
+
+def set_cached_credential(digest: str, user_email: str, expires_at: float) -> None:
+    """Caches the user email of a credential until `expires_at` (a unix timestamp)."""
+    with _credential_cache_lock:
+        _credential_cache[digest] = (user_email, expires_at)
+
+
+def clear_credential_cache() -> None:
+    """Drops all cached credentials."""
+    with _credential_cache_lock:
+        _credential_cache.clear()
+
+
+def get_current_user_email(request: Request) -> Optional[str]:
+    """Resolves the email of the requesting user via the configured authentication provider."""
+    if not DISPATCH_AUTHENTICATION_PROVIDER_SLUG:
         log.debug("No authentication provider. Default user will be used")
-        user_email = DISPATCH_AUTHENTICATION_DEFAULT_USER
+        return DISPATCH_AUTHENTICATION_DEFAULT_USER
+
+    auth_plugin = plugins.get(DISPATCH_AUTHENTICATION_PROVIDER_SLUG)
+
+    # we key the cache on the exact credential the provider authenticates with
+    credential = auth_plugin.get_credential(request) if DISPATCH_AUTHENTICATION_CACHE_TTL else None
+    digest = get_credential_digest(auth_plugin, credential) if credential else None
+    if digest:
+        user_email = get_cached_credential(digest)
+        if user_email:
+            return user_email
+
+    user_email = auth_plugin.get_current_user(request)
+
+    if digest and user_email:
+        expires_at = time.time() + DISPATCH_AUTHENTICATION_CACHE_TTL
+        # a token is never accepted past its expiration
+        credential_expires_at = auth_plugin.get_credential_expiration(credential)
+        if credential_expires_at is not None:
+            expires_at = min(expires_at, credential_expires_at)
+        set_cached_credential(digest, user_email, expires_at)
+    return user_email
+
+
+def get_current_user(request: Request) -> DispatchUser:
+    """Attempts to get the current user depending on the configured authentication provider.
+
+    The user is resolved once per request and memoized on the request state.
+    """
+    current_user = getattr(request.state, "current_user", None)
+    if current_user:
+        return current_user
+
+    user_email = get_current_user_email(request)
 
     if not user_email:
         log.exception(
@@ -241,15 +313,25 @@ def get_current_user(request: Request) -> DispatchUser:
         )
         raise InvalidCredentialException
 
-    return get_or_create(
+    current_user = get_or_create(
         db_session=request.state.db,
         organization=request.state.organization,
         user_in=UserRegister(email=user_email),
     )
+    request.state.current_user = current_user
+    return current_user
 
 
 def get_current_role(
     request: Request, current_user: DispatchUser = Depends(get_current_user)
 ) -> UserRoles:
-    """Attempts to get the current user depending on the configured authentication provider."""
-    return current_user.get_organization_role(organization_slug=request.state.organization)
+    """Attempts to get the current user depending on the configured authentication provider.
+
+    The role is resolved once per request and memoized on the request state.
+    """
+    if hasattr(request.state, "current_role"):
+        return request.state.current_role
+
+    role = current_user.get_organization_role(organization_slug=request.state.organization)
+    request.state.current_role = role
+    return role
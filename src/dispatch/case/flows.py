@@ -22,6 +22,7 @@ from dispatch.plugin import service as plugin_service
 from dispatch.storage import flows as storage_flows
 from dispatch.storage.enums import StorageAction
 from dispatch.ticket import flows as ticket_flows
+from dispatch.tracing import traced
 
 from .models import Case, CaseStatus
 from .service import delete, get
@@ -29,6 +30,7 @@ from .service import delete, get
 log = logging.getLogger(__name__)
 
 
+@traced()
 def create_conversation(case: Case, db_session: SessionLocal):
     """Create external communication conversation."""
     plugin = plugin_service.get_active_instance(
@@ -49,6 +51,7 @@ def create_conversation(case: Case, db_session: SessionLocal):
     return conversation
 
 
+@traced()
 def update_conversation(case: Case, db_session: SessionLocal):
     """Updates external communication conversation."""
     plugin = plugin_service.get_active_instance(
@@ -294,3 +294,4 @@ class CasePagination(DispatchBase):
     itemsPerPage: int
     page: int
     total: int
+    next: Optional[str]
@@ -1,8 +1,6 @@
 import logging
 from typing import List
 
-import json
-
 from starlette.requests import Request
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 
@@ -19,9 +17,19 @@ from dispatch.auth.permissions import (
 from dispatch.auth import service as auth_service
 from dispatch.auth.models import DispatchUser
 from dispatch.case.enums import CaseStatus
-from dispatch.common.utils.views import create_pydantic_include
+from dispatch.common.utils.views import (
+    ModelResponse,
+    create_export_response,
+    create_pagination_include,
+)
 from dispatch.database.core import get_db
-from dispatch.database.service import common_parameters, search_filter_sort_paginate
+from dispatch.database.service import (
+    common_parameters,
+    export_parameters,
+    get_loading_plan,
+    search_filter_sort_paginate,
+    search_filter_sort_stream,
+)
 from dispatch.models import OrganizationSlug, PrimaryKey
 from dispatch.incident.models import IncidentCreate, IncidentRead
 from dispatch.incident import service as incident_service
@@ -37,7 +45,14 @@ from .flows import (
     case_triage_create_flow,
     case_update_flow,
 )
-from .models import Case, CaseCreate, CasePagination, CaseRead, CaseUpdate
+from .models import (
+    Case,
+    CaseCreate,
+    CasePagination,
+    CaseRead,
+    CaseReadMinimal,
+    CaseUpdate,
+)
 from .service import create, delete, get, update
 
 
@@ -57,6 +72,19 @@ def get_current_case(*, db_session: Session = Depends(get_db), request: Request)
     return case
 
 
+# declared before the case routes, so "export" isn't parsed as a case id
+@router.get("/export", summary="Exports cases as NDJSON or CSV.")
+def export_cases(*, export: dict = Depends(export_parameters)):
+    """Streams all cases matching the given search and filters."""
+    export_format = export.pop("export_format")
+    cases = search_filter_sort_stream(
+        model="Case", loading_plan=get_loading_plan(Case, CaseReadMinimal), **export
+    )
+    return create_export_response(
+        instances=cases, schema=CaseReadMinimal, export_format=export_format, filename="cases"
+    )
+
+
 @router.get(
     "/{case_id}",
     response_model=CaseRead,
@@ -80,20 +108,16 @@ def get_cases(
     include: List[str] = Query([], alias="include[]"),
 ):
     """Retrieves all cases."""
-    pagination = search_filter_sort_paginate(model="Case", **common)
+    pagination = search_filter_sort_paginate(
+        model="Case", loading_plan=get_loading_plan(Case, CaseReadMinimal), **common
+    )
 
     if include:
         # only allow two levels for now
-        include_sets = create_pydantic_include(include)
-
-        include_fields = {
-            "items": {"__all__": include_sets},
-            "itemsPerPage": ...,
-            "page": ...,
-            "total": ...,
-        }
-        return json.loads(CasePagination(**pagination).json(include=include_fields))
-    return json.loads(CasePagination(**pagination).json())
+        return ModelResponse(
+            CasePagination(**pagination), include=create_pagination_include(include)
+        )
+    return ModelResponse(CasePagination(**pagination))
 
 
 @router.post("", response_model=CaseRead, summary="Creates a new case.")
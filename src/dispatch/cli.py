@@ -220,6 +220,96 @@ def database_init():
     click.secho("Success.", fg="green")
 
 
+@dispatch_database.command("reindex-search")
+@click.option(
+    "--organization",
+    "organizations",
+    multiple=True,
+    help="Organization slug to reindex, defaults to all organizations and the core schema.",
+)
+@click.option(
+    "--table",
+    "tables",
+    multiple=True,
+    help="Table to reindex, defaults to all tables with a search vector.",
+)
+@click.option("--batch-size", default=1000, show_default=True, help="Rows updated per transaction.")
+@click.option(
+    "--sync-triggers",
+    is_flag=True,
+    help="Recreates the search triggers first, e.g. after changing weights or the regconfig.",
+)
+@click.option(
+    "--concurrent-indexes",
+    is_flag=True,
+    help="Drops the search indexes while reindexing and rebuilds them concurrently afterwards.",
+)
+@click.option(
+    "--state-file",
+    default="dispatch-reindex-search.json",
+    show_default=True,
+    help="Path to the file recording the reindex progress.",
+)
+@click.option("--resume", is_flag=True, help="Resumes from the progress in the state file.")
+def reindex_search(
+    organizations, tables, batch_size, sync_triggers, concurrent_indexes, state_file, resume
+):
+    """Recomputes the full-text search vectors in batches."""
+    import json
+
+    from .database.core import engine
+    from .database.manage import (
+        create_search_index,
+        drop_search_index,
+        get_search_tables,
+        reindex_search_vectors,
+        sync_search_trigger,
+    )
+
+    state = {}
+    if resume and os.path.exists(state_file):
+        with open(state_file) as f:
+            state = json.load(f)
+
+    def save_state():
+        with open(state_file, "w") as f:
+            json.dump(state, f, default=str)
+
+    for table in get_search_tables(engine, organizations, tables):
+        key = f"{table.schema}.{table.name}"
+        progress = state.setdefault(key, {"last_id": None, "rows": 0, "done": False})
+        if progress["done"]:
+            click.echo(f"Skipping {key}, already reindexed.")
+            continue
+
+        click.echo(f"Reindexing {key}...")
+        if sync_triggers:
+            sync_search_trigger(engine, table)
+
+        if concurrent_indexes:
+            drop_search_index(engine, table)
+
+        for last_id, rows in reindex_search_vectors(
+            engine, table, batch_size=batch_size, lower=progress["last_id"]
+        ):
+            progress["last_id"] = last_id
+            progress["rows"] += rows
+            save_state()
+            click.echo(f"  {progress['rows']} rows reindexed (last id: {last_id})")
+
+        if concurrent_indexes:
+            click.echo(f"Building search index of {key}...")
+            create_search_index(engine, table)
+
+        progress["done"] = True
+        save_state()
+
+    # a completed run starts over the next time
+    if os.path.exists(state_file):
+        os.remove(state_file)
+    click.secho("Success.", fg="green")
+
+
 @dispatch_database.command("restore")
 @click.option(
     "--dump-file",
@@ -641,6 +731,31 @@ def start_tasks(tasks, exclude, eager):
     scheduler.start()
 
 
+@dispatch_cli.group("worker")
+def dispatch_worker():
+    """Container for all dispatch worker commands."""
+    pass
+
+
+@dispatch_worker.command("start")
+@click.option(
+    "--concurrency",
+    type=int,
+    default=None,
+    help="How many jobs to run at once (defaults to JOB_QUEUE_CONCURRENCY).",
+)
+def start_worker(concurrency):
+    """Starts a worker running the queued background flows."""
+    from dispatch.common.utils.cli import install_plugins
+    from dispatch.job.worker import Worker
+
+    install_plugins()
+
+    worker = Worker(concurrency=concurrency) if concurrency else Worker()
+    click.secho("Starting worker...", fg="blue")
+    worker.start()
+
+
 @dispatch_cli.group("server")
 def dispatch_server():
     """Container for all dispatch server commands."""
@@ -1,3 +1,18 @@
+import csv
+import io
+from itertools import islice
+from typing import Iterable, Iterator, Type
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response, StreamingResponse
+
+from dispatch.enums import ExportFormats
+
+# the number of rows written per chunk of a streamed export
+EXPORT_CHUNK_SIZE = 100
+
+
 def create_pydantic_include(include):
     """Creates a pydantic sets based on dotted notation."""
     include_sets = {}
@@ -15,3 +30,101 @@ def create_pydantic_include(include):
         include_sets.update(keyset)
 
     return include_sets
+
+
+def create_pagination_include(include):
+    """Creates the pydantic include for a pagination model based on dotted notation."""
+    return {
+        "items": {"__all__": create_pydantic_include(include)},
+        "itemsPerPage": ...,
+        "page": ...,
+        "total": ...,
+        "next": ...,
+    }
+
+
+def serialize_model(model: BaseModel, include=None) -> bytes:
+    """Serializes a pydantic model to JSON in a single pass.
+
+    Datetimes and other types orjson doesn't handle natively are passed to the
+    model's encoder, so the output matches `model.json()`.
+    """
+    return orjson.dumps(
+        model.dict(include=include),
+        default=model.__json_encoder__,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class ModelResponse(Response):
+    """Renders a pydantic model, skipping FastAPI's response encoding."""
+
+    media_type = "application/json"
+
+    def __init__(self, content: BaseModel, include=None, **kwargs):
+        self.include = include
+        super().__init__(content, **kwargs)
+
+    def render(self, content: BaseModel) -> bytes:
+        return serialize_model(content, include=self.include)
+
+
+def chunk(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        items = list(islice(iterator, size))
+        if not items:
+            return
+        yield items
+
+
+def stream_ndjson(instances: Iterable, schema: Type[BaseModel]) -> Iterator[bytes]:
+    """Serializes instances as newline delimited JSON, one object per line."""
+    for instances_chunk in chunk(instances, EXPORT_CHUNK_SIZE):
+        yield b"".join(serialize_model(schema.from_orm(i)) + b"\n" for i in instances_chunk)
+
+
+def stream_csv(instances: Iterable, schema: Type[BaseModel]) -> Iterator[bytes]:
+    """Serializes instances as CSV, nested values are written as JSON."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(schema.__fields__))
+    writer.writeheader()
+
+    for instances_chunk in chunk(instances, EXPORT_CHUNK_SIZE):
+        for i in instances_chunk:
+            row = orjson.loads(serialize_model(schema.from_orm(i)))
+            writer.writerow(
+                {
+                    k: orjson.dumps(v).decode("utf-8") if isinstance(v, (dict, list)) else v
+                    for k, v in row.items()
+                }
+            )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    # we still send the header when there's nothing to export
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+EXPORT_STREAMS = {
+    ExportFormats.ndjson: (stream_ndjson, "application/x-ndjson"),
+    ExportFormats.csv: (stream_csv, "text/csv"),
+}
+
+
+def create_export_response(
+    *,
+    instances: Iterable,
+    schema: Type[BaseModel],
+    export_format: ExportFormats,
+    filename: str,
+) -> StreamingResponse:
+    """Streams instances serialized with a schema in the requested format."""
+    stream, media_type = EXPORT_STREAMS[export_format]
+    return StreamingResponse(
+        stream(instances, schema),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
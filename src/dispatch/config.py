@@ -136,6 +136,11 @@ DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS = config(
     "DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS", default=None
 )
 
+# used when the JWKS response doesn't specify a max-age
+DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS_TTL = config(
+    "DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS_TTL", cast=int, default=300
+)
+
 DISPATCH_PKCE_DONT_VERIFY_AT_HASH = config("DISPATCH_PKCE_DONT_VERIFY_AT_HASH", default=False)
 
 if DISPATCH_AUTHENTICATION_PROVIDER_SLUG == "dispatch-auth-provider-pkce":
@@ -148,6 +153,15 @@ DISPATCH_AUTHENTICATION_PROVIDER_HEADER_NAME = config(
     "DISPATCH_AUTHENTICATION_PROVIDER_HEADER_NAME", default="remote-user"
 )
 
+# how long (in seconds) the user a credential resolves to is cached across requests (never past
+# the expiration of a token), 0 disables caching
+DISPATCH_AUTHENTICATION_CACHE_TTL = config(
+    "DISPATCH_AUTHENTICATION_CACHE_TTL", cast=int, default=60
+)
+DISPATCH_AUTHENTICATION_CACHE_SIZE = config(
+    "DISPATCH_AUTHENTICATION_CACHE_SIZE", cast=int, default=1024
+)
+
 # sentry middleware
 SENTRY_ENABLED = config("SENTRY_ENABLED", default="")
 SENTRY_DSN = config("SENTRY_DSN", default="")
@@ -179,8 +193,59 @@ DEFAULT_STATIC_DIR = os.path.join(
 )
 STATIC_DIR = config("STATIC_DIR", default=DEFAULT_STATIC_DIR)
 
+# routing
+# how long (in seconds) a worker keeps its routing index before rebuilding it
+ROUTE_INDEX_CACHE_TTL = config("ROUTE_INDEX_CACHE_TTL", cast=int, default=300)
+
+# scheduler
+# how many scheduled task runs can be in progress at once
+SCHEDULER_MAX_WORKERS = config("SCHEDULER_MAX_WORKERS", cast=int, default=8)
+# how long (in seconds) a scheduled task run may take, unless the task sets its own timeout
+SCHEDULER_TASK_TIMEOUT = config("SCHEDULER_TASK_TIMEOUT", cast=int, default=3600)
+# how scheduled project tasks run for each (organization, project), one after another
+# ("serial") or on a "thread" or "process" pool running up to SCHEDULER_FANOUT_CONCURRENCY at once
+SCHEDULER_FANOUT_MODE = config("SCHEDULER_FANOUT_MODE", default="serial")
+SCHEDULER_FANOUT_CONCURRENCY = config("SCHEDULER_FANOUT_CONCURRENCY", cast=int, default=4)
+# run several scheduler replicas: each run of a task, or of a scheduled project task for a
+# given project, is leased to a single replica through the scheduler_lease table
+SCHEDULER_LEASES_ENABLED = config("SCHEDULER_LEASES_ENABLED", cast=bool, default=False)
+# how long (in seconds) a lease outlives its last heartbeat, i.e. how long the runs of a replica
+# that died wait before another replica takes them over
+SCHEDULER_LEASE_TTL = config("SCHEDULER_LEASE_TTL", cast=int, default=60)
+
+# job queue
+# run background flows (e.g. creating an incident's resources) on `dispatch worker start`
+# processes, through a queue in the database, instead of in the API process after responding
+JOB_QUEUE_ENABLED = config("JOB_QUEUE_ENABLED", cast=bool, default=False)
+# how many jobs a worker runs at once
+JOB_QUEUE_CONCURRENCY = config("JOB_QUEUE_CONCURRENCY", cast=int, default=8)
+# how many jobs of a single organization can run at once, across all workers
+JOB_QUEUE_TENANT_CONCURRENCY = config("JOB_QUEUE_TENANT_CONCURRENCY", cast=int, default=4)
+# how long (in seconds) to wait before retrying a failed job, doubled on every attempt
+# (jobs are only retried if their flow opts in, see background_task's max_attempts)
+JOB_QUEUE_RETRY_BACKOFF = config("JOB_QUEUE_RETRY_BACKOFF", cast=int, default=30)
+JOB_QUEUE_RETRY_BACKOFF_MAX = config("JOB_QUEUE_RETRY_BACKOFF_MAX", cast=int, default=1800)
+# how long (in seconds) a running job stays locked after its worker's last heartbeat, i.e. how
+# long the jobs of a worker that died wait before being retried
+JOB_QUEUE_LOCK_TTL = config("JOB_QUEUE_LOCK_TTL", cast=int, default=60)
+# how long (in seconds) an idle worker waits before looking for jobs again
+JOB_QUEUE_POLL_INTERVAL = config("JOB_QUEUE_POLL_INTERVAL", cast=float, default=1.0)
+# how long (in days) finished jobs are kept
+JOB_QUEUE_RETENTION_DAYS = config("JOB_QUEUE_RETENTION_DAYS", cast=int, default=7)
+
+# tracing
+# where the spans of flows are exported to, either "file" or "otlp" (OTLP/HTTP JSON)
+TRACE_EXPORTER = config("TRACE_EXPORTER", default="")
+TRACE_FILE_PATH = config("TRACE_FILE_PATH", default="dispatch-traces.jsonl")
+TRACE_OTLP_ENDPOINT = config("TRACE_OTLP_ENDPOINT", default="http://localhost:4318/v1/traces")
+TRACE_EXPORT_QUEUE_SIZE = config("TRACE_EXPORT_QUEUE_SIZE", cast=int, default=1000)
+
 # metrics
 METRIC_PROVIDERS = config("METRIC_PROVIDERS", cast=CommaSeparatedStrings, default="")
+# how often (in seconds) aggregated metrics are sent to the providers
+METRIC_FLUSH_INTERVAL = config("METRIC_FLUSH_INTERVAL", cast=float, default=10)
+# how many distinct series are aggregated between flushes, new ones are dropped past it
+METRIC_BUFFER_SIZE = config("METRIC_BUFFER_SIZE", cast=int, default=10000)
 
 # database
 DATABASE_HOSTNAME = config("DATABASE_HOSTNAME")
@@ -192,6 +257,25 @@ DATABASE_NAME = config("DATABASE_NAME", default="dispatch")
 DATABASE_PORT = config("DATABASE_PORT", default="5432")
 DATABASE_ENGINE_POOL_SIZE = config("DATABASE_ENGINE_POOL_SIZE", cast=int, default=20)
 DATABASE_ENGINE_MAX_OVERFLOW = config("DATABASE_ENGINE_MAX_OVERFLOW", cast=int, default=0)
+DATABASE_FILTER_CACHE_SIZE = config("DATABASE_FILTER_CACHE_SIZE", cast=int, default=1024)
+DATABASE_PAGINATION_COUNT_CAP = config("DATABASE_PAGINATION_COUNT_CAP", cast=int, default=10000)
+DATABASE_EXPORT_BATCH_SIZE = config("DATABASE_EXPORT_BATCH_SIZE", cast=int, default=500)
+# query instrumentation, recording query counts, time and repeated statements
+# of a sample of requests, background flows and scheduled tasks
+DATABASE_INSTRUMENTATION_ENABLED = config(
+    "DATABASE_INSTRUMENTATION_ENABLED", cast=bool, default=False
+)
+DATABASE_INSTRUMENTATION_SAMPLE_RATE = config(
+    "DATABASE_INSTRUMENTATION_SAMPLE_RATE", cast=float, default=1.0
+)
+# a statement executed this many times in a single unit of work is reported as N+1
+DATABASE_INSTRUMENTATION_REPEATED_THRESHOLD = config(
+    "DATABASE_INSTRUMENTATION_REPEATED_THRESHOLD", cast=int, default=10
+)
+DATABASE_INSTRUMENTATION_SLOWEST = config("DATABASE_INSTRUMENTATION_SLOWEST", cast=int, default=3)
+DATABASE_INSTRUMENTATION_SERVER_TIMING = config(
+    "DATABASE_INSTRUMENTATION_SERVER_TIMING", cast=bool, default=False
+)
 SQLALCHEMY_DATABASE_URI = f"postgresql+psycopg2://{_DATABASE_CREDENTIAL_USER}:{_QUOTED_DATABASE_PASSWORD}@{DATABASE_HOSTNAME}:{DATABASE_PORT}/{DATABASE_NAME}"
 
 ALEMBIC_CORE_REVISION_PATH = config(
@@ -21,24 +21,11 @@ engine = create_engine(
     max_overflow=config.DATABASE_ENGINE_MAX_OVERFLOW,
 )
 
+# useful for identifying slow or n + 1 queries, see dispatch.database.instrumentation
+if config.DATABASE_INSTRUMENTATION_ENABLED:
+    from .instrumentation import install as install_instrumentation
 
-# Useful for identifying slow or n + 1 queries. But doesn't need to be enabled in production.
-# logging.basicConfig()
-# logger = logging.getLogger(__name__)
-# logger.setLevel(logging.DEBUG)
-
-
-# @event.listens_for(Engine, "before_cursor_execute")
-# def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-#    conn.info.setdefault("query_start_time", []).append(time.time())
-#    logger.debug("Start Query: %s", statement)
-
-
-# @event.listens_for(Engine, "after_cursor_execute")
-# def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-#    total = time.time() - conn.info["query_start_time"].pop(-1)
-#    logger.debug("Query Complete!")
-#    logger.debug("Total Time: %f", total)
+    install_instrumentation()
 
 
 SessionLocal = sessionmaker(bind=engine)
@@ -130,6 +117,7 @@ def get_model_name_by_tablename(table_fullname: str) -> str:
     return get_class_by_tablename(table_fullname=table_fullname).__name__
 
 
+@functools.lru_cache()
 def get_class_by_tablename(table_fullname: str) -> Any:
     """Return class reference mapped to table."""
 
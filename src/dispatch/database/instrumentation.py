@@ -0,0 +1,183 @@
+"""
+.. module: dispatch.database.instrumentation
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+
+Records the queries made by a unit of work (a request, a background flow or a
+scheduled task): how many, how long they took, the slowest statements and the
+statements repeated often enough to suggest N+1 queries.
+
+Statements are grouped by their SQL text, which holds placeholders rather than
+values, so the same query made for several objects shows up as one statement.
+"""
+import heapq
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from dispatch.config import (
+    DATABASE_INSTRUMENTATION_ENABLED,
+    DATABASE_INSTRUMENTATION_REPEATED_THRESHOLD,
+    DATABASE_INSTRUMENTATION_SAMPLE_RATE,
+    DATABASE_INSTRUMENTATION_SLOWEST,
+)
+from dispatch.metrics import provider as metrics_provider
+
+
+log = logging.getLogger(__name__)
+
+# statements are truncated in logs
+STATEMENT_MAX_LENGTH = 300
+
+
+class QueryStats(object):
+    """The queries made by a unit of work."""
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.count = 0
+        self.elapsed = 0.0
+        self.finished = False
+        # statement -> [count, total elapsed, slowest elapsed]
+        self.statements: Dict[str, list] = {}
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.elapsed += elapsed
+        stats = self.statements.get(statement)
+        if stats is None:
+            self.statements[statement] = [1, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+
+    def slowest(self, n: int = DATABASE_INSTRUMENTATION_SLOWEST) -> List[Tuple[str, float]]:
+        """Returns the statements with the slowest single execution."""
+        slowest = heapq.nlargest(n, self.statements.items(), key=lambda s: s[1][2])
+        return [(statement, stats[2]) for statement, stats in slowest]
+
+    def repeated(
+        self, threshold: int = DATABASE_INSTRUMENTATION_REPEATED_THRESHOLD
+    ) -> List[Tuple[str, int]]:
+        """Returns the statements executed at least `threshold` times, most repeated first."""
+        repeated = [
+            (statement, stats[0])
+            for statement, stats in self.statements.items()
+            if stats[0] >= threshold
+        ]
+        return sorted(repeated, key=lambda s: s[1], reverse=True)
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Returns the stats of the instrumented unit of work in progress, if any."""
+    stats = _query_stats.get()
+    # tasks spawned by a unit of work (e.g. background tasks) can outlive it
+    if stats is not None and not stats.finished:
+        return stats
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if get_query_stats() is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = get_query_stats()
+    if stats is not None and hasattr(context, "_query_start_time"):
+        stats.record(statement, time.perf_counter() - context._query_start_time)
+
+
+def install():
+    """Listens to the queries of every engine."""
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+
+def truncate(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > STATEMENT_MAX_LENGTH:
+        return f"{statement[:STATEMENT_MAX_LENGTH]}..."
+    return statement
+
+
+def report(stats: QueryStats):
+    """Sends the stats of a unit of work as metrics and a log line."""
+    tags = {"kind": stats.kind, "name": stats.name}
+    metrics_provider.counter("database.query.counter", value=stats.count, tags=tags)
+    metrics_provider.timer("database.query.elapsed", value=stats.elapsed, tags=tags)
+
+    repeated = stats.repeated()
+    if repeated:
+        metrics_provider.counter("database.query.repeated.counter", value=len(repeated), tags=tags)
+
+    level = logging.WARNING if repeated else logging.DEBUG
+    if not log.isEnabledFor(level):
+        return
+
+    slowest = stats.slowest()
+    log.log(
+        level,
+        f"{stats.kind} {stats.name} made {stats.count} queries in {stats.elapsed * 1000:.1f}ms"
+        + (f", {len(repeated)} statement(s) look like N+1 queries" if repeated else ""),
+        extra={
+            "database_queries": {
+                "kind": stats.kind,
+                "name": stats.name,
+                "count": stats.count,
+                "elapsed": stats.elapsed,
+                "slowest": [
+                    {"statement": truncate(statement), "elapsed": elapsed}
+                    for statement, elapsed in slowest
+                ],
+                "repeated": [
+                    {"statement": truncate(statement), "count": count}
+                    for statement, count in repeated
+                ],
+            }
+        },
+    )
+
+
+@contextmanager
+def instrument(kind: str, name: str):
+    """Records the queries made within the block, for a sample of the blocks.
+
+    Yields the stats being recorded, or None when the block isn't sampled. Nested
+    blocks are recorded as part of the outermost one.
+    """
+    if (
+        not DATABASE_INSTRUMENTATION_ENABLED
+        or get_query_stats() is not None
+        or random.random() >= DATABASE_INSTRUMENTATION_SAMPLE_RATE
+    ):
+        yield None
+        return
+
+    stats = QueryStats(kind, name)
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        stats.finished = True
+        _query_stats.reset(token)
+        try:
+            report(stats)
+        except Exception as e:
+            log.warning(f"Unable to report the queries of {kind} {name}. Error: {e}")
+
+
+def get_server_timing(stats: QueryStats) -> str:
+    """Returns a Server-Timing header value describing the queries of a request."""
+    return f'db;dur={stats.elapsed * 1000:.1f};desc="{stats.count} queries"'
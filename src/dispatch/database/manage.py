@@ -1,10 +1,12 @@
 import os
 import logging
+from typing import Any, Iterator, List, Optional, Tuple
 
 from alembic import command as alembic_command
 from alembic.config import Config as AlembicConfig
 
-from sqlalchemy import text
+from sqlalchemy import MetaData, Table, func, select, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.schema import CreateSchema
 from sqlalchemy_utils import create_database, database_exists
 
@@ -12,6 +14,7 @@ from dispatch import config
 from dispatch.organization.models import Organization
 from dispatch.search import fulltext
 from dispatch.search.fulltext import (
+    UpdateSearchVectorSQL,
     sync_trigger,
 )
 
@@ -59,6 +62,10 @@ def init_database(engine):
         with engine.connect() as connection:
             connection.execute(CreateSchema(schema_name))
 
+    # required by the typeahead (trigram) indexes of the tenant tables
+    with engine.connect() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public"))
+
     tables = get_core_tables()
 
     Base.metadata.create_all(engine, tables=tables)
@@ -155,3 +162,120 @@ def setup_fulltext_search(connection, tables):
 
         for trigger in table_triggers:
             sync_trigger(**trigger)
+
+
+def get_search_tables(
+    engine: Engine, organization_slugs: List[str] = None, table_names: List[str] = None
+) -> List[Table]:
+    """Returns schema bound copies of the tables that have a search vector.
+
+    Core tables are only included when no organization is given.
+    """
+    schemas = []
+    if not organization_slugs:
+        schemas.append(("dispatch_core", get_core_tables()))
+        session = sessionmaker(bind=engine)
+        db_session = session()
+        organization_slugs = [o.slug for o in db_session.query(Organization.slug)]
+        db_session.close()
+
+    for slug in organization_slugs:
+        schemas.append((f"{DISPATCH_ORGANIZATION_SCHEMA_PREFIX}_{slug}", get_tenant_tables()))
+
+    search_tables = []
+    for schema, tables in schemas:
+        # we copy the tables, so that the shared metadata stays untouched
+        metadata = MetaData()
+        for table in tables:
+            if table_names and table.name not in table_names:
+                continue
+            if "search_vector" not in table.c:
+                continue
+            if not hasattr(table.c.search_vector.type, "columns"):
+                continue
+            search_tables.append(table.tometadata(metadata, schema=schema))
+    return search_tables
+
+
+def get_search_index_name(table: Table) -> str:
+    return f"{table.name}_search_vector_idx"
+
+
+def drop_search_index(engine: Engine, table: Table):
+    """Drops the search index of a table without locking out writes."""
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        index_name = f'{table.schema}."{get_search_index_name(table)}"'
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+
+
+def create_search_index(engine: Engine, table: Table):
+    """Builds the search index of a table without locking out writes."""
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.execute(
+            text(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{get_search_index_name(table)}" '
+                f'ON {table.schema}."{table.name}" USING gin (search_vector)'
+            )
+        )
+
+
+def get_batch_upper_bound(connection, table: Table, lower: Any, batch_size: int) -> Any:
+    """Returns the primary key closing the batch that starts after `lower`, if any rows are left."""
+    (primary_key,) = table.primary_key.columns
+
+    query = select([primary_key]).order_by(primary_key).offset(batch_size - 1).limit(1)
+    if lower is not None:
+        query = query.where(primary_key > lower)
+    upper = connection.execute(query).scalar()
+
+    if upper is None:
+        # the last batch is a partial one
+        query = select([func.max(primary_key)])
+        if lower is not None:
+            query = query.where(primary_key > lower)
+        upper = connection.execute(query).scalar()
+    return upper
+
+
+def sync_search_trigger(engine: Engine, table: Table):
+    """Recreates the search trigger and function of a table, leaving its rows untouched."""
+    with engine.begin() as connection:
+        sync_trigger(
+            conn=connection,
+            table=table,
+            tsvector_column="search_vector",
+            indexed_columns=table.c.search_vector.type.columns,
+            update_rows=False,
+        )
+
+
+def reindex_search_vectors(
+    engine: Engine, table: Table, batch_size: int = 1000, lower: Optional[Any] = None
+) -> Iterator[Tuple[Any, int]]:
+    """Recomputes the search vectors of a table in primary key ranges.
+
+    Each range is updated in its own transaction, yielding the last primary key
+    of the range and the number of updated rows, so a reindex can be resumed by
+    passing the last yielded key as `lower`.
+    """
+    while True:
+        with engine.begin() as connection:
+            upper = get_batch_upper_bound(connection, table, lower, batch_size)
+            if upper is None:
+                return
+
+            sql = UpdateSearchVectorSQL(
+                table.c.search_vector, conn=connection, lower_bound=lower is not None
+            )
+            statement = str(sql)
+            result = connection.execute(
+                statement,
+                search_vector_lower=lower,
+                search_vector_upper=upper,
+                **sql.params,
+            )
+
+        lower = upper
+        yield upper, result.rowcount
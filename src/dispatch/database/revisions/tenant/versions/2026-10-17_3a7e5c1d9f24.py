@@ -0,0 +1,38 @@
+"""Makes incident costs unique per incident and cost type.
+
+Revision ID: 3a7e5c1d9f24
+Revises: b2f5c8d41e07
+Create Date: 2026-10-17 14:21:07.531882
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3a7e5c1d9f24"
+down_revision = "b2f5c8d41e07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # we keep the most recent of any duplicated costs, they're recalculated by the scheduler
+    op.execute(
+        """
+        DELETE FROM incident_cost AS a
+        USING incident_cost AS b
+        WHERE a.incident_id = b.incident_id
+        AND a.incident_cost_type_id = b.incident_cost_type_id
+        AND a.id < b.id
+        """
+    )
+    op.create_unique_constraint(
+        "incident_cost_incident_id_incident_cost_type_id_key",
+        "incident_cost",
+        ["incident_id", "incident_cost_type_id"],
+    )
+
+
+def downgrade():
+    op.drop_constraint(
+        "incident_cost_incident_id_incident_cost_type_id_key", "incident_cost", type_="unique"
+    )
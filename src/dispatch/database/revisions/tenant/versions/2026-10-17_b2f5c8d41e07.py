@@ -0,0 +1,44 @@
+"""Adds trigram indexes used by typeahead lookups.
+
+Revision ID: b2f5c8d41e07
+Revises: 7d1c3b9e5a42
+Create Date: 2026-10-17 11:02:45.184203
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b2f5c8d41e07"
+down_revision = "7d1c3b9e5a42"
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_INDEXES = [
+    ("tag_name_trgm_idx", "tag", "name"),
+    ("individual_contact_name_trgm_idx", "individual_contact", "name"),
+    ("individual_contact_email_trgm_idx", "individual_contact", "email"),
+    ("service_name_trgm_idx", "service", "name"),
+    ("term_text_trgm_idx", "term", "text"),
+]
+
+
+def upgrade():
+    # the extension is database wide, we keep it in public so every tenant schema can use it
+    # (the operator class is schema qualified as the search path is set to the tenant schema)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public")
+
+    for index_name, table_name, column_name in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            [column_name],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column_name: "public.gin_trgm_ops"},
+        )
+
+
+def downgrade():
+    for index_name, table_name, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
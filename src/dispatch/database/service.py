@@ -1,10 +1,15 @@
+import base64
+import binascii
+import functools
 import json
 import logging
 from collections import namedtuple
 from collections.abc import Iterable
+from contextlib import contextmanager
+from datetime import datetime
 from inspect import signature
 from itertools import chain
-from typing import List
+from typing import Iterator, List, Optional, Type
 
 from fastapi import Depends, Query
 from pydantic import BaseModel
@@ -12,19 +17,27 @@ from pydantic.error_wrappers import ErrorWrapper, ValidationError
 from pydantic.types import Json, constr
 from six import string_types
 from sortedcontainers import SortedSet
-from sqlalchemy import and_, desc, func, not_, or_, orm
+from sqlalchemy import and_, asc, desc, exists, false, func, not_, or_, orm
 from sqlalchemy.exc import InvalidRequestError, ProgrammingError
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm.mapper import Mapper
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from sqlalchemy_filters import apply_pagination, apply_sort
-from sqlalchemy_filters.exceptions import BadFilterFormat, FieldNotFound
+from sqlalchemy_filters.exceptions import BadFilterFormat, BadSpec, FieldNotFound
 from sqlalchemy_filters.models import Field, get_model_from_spec
 
 from dispatch.auth.models import DispatchUser
 from dispatch.auth.service import get_current_role, get_current_user
 from dispatch.case.models import Case
+from dispatch.config import (
+    DATABASE_EXPORT_BATCH_SIZE,
+    DATABASE_FILTER_CACHE_SIZE,
+    DATABASE_PAGINATION_COUNT_CAP,
+)
 from dispatch.data.query.models import Query as QueryModel
 from dispatch.data.source.models import Source
-from dispatch.enums import UserRoles, Visibility
+from dispatch.enums import CountTypes, ExportFormats, SearchModes, UserRoles, Visibility
+from dispatch.event.models import Event
 from dispatch.exceptions import FieldNotFoundError, InvalidFilterError
 from dispatch.feedback.models import Feedback
 from dispatch.incident.models import Incident
@@ -212,6 +225,11 @@ def get_query_models(query):
 
 def get_model_class_by_name(registry, name):
     """Return the model class matching `name` in the given `registry`."""
+    # the registry is keyed by class name, so we only scan it on ambiguous names
+    cls = registry.get(name)
+    if isinstance(cls, type):
+        return cls
+
     for cls in registry.values():
         if getattr(cls, "__name__", None) == name:
             return cls
@@ -260,6 +278,8 @@ def apply_model_specific_filters(
     """Applies any model specific filter as it pertains to the given user."""
     model_map = {
         Incident: [restricted_incident_filter],
+        Event: [restricted_event_filter],
+        # Case: [restricted_case_filter],
         # IncidentType: [restricted_incident_type_filter],
     }
 
@@ -323,50 +343,167 @@ def apply_filters(query, filter_spec, model_cls=None, do_auto_join=True):
     return query
 
 
+# this is required because by default sqlalchemy-filter's auto-join
+# knows nothing about how to join many-many relationships.
+FILTER_SPECIFIC_JOINS = {
+    (Feedback, "Project"): (Incident, False),
+    (Feedback, "Incident"): (Incident, False),
+    (Task, "Project"): (Incident, False),
+    (Task, "Incident"): (Incident, False),
+    (Task, "IncidentPriority"): (Incident, False),
+    (Task, "IncidentType"): (Incident, False),
+    (PluginInstance, "Plugin"): (Plugin, False),
+    (Source, "Tag"): (Source.tags, True),
+    (Source, "TagType"): (Source.tags, True),
+    (QueryModel, "Tag"): (QueryModel.tags, True),
+    (QueryModel, "TagType"): (QueryModel.tags, True),
+    (DispatchUser, "Organization"): (DispatchUser.organizations, True),
+    (Incident, "Tag"): (Incident.tags, True),
+    (Incident, "TagType"): (Incident.tags, True),
+    (Incident, "Term"): (Incident.terms, True),
+    (Case, "Tag"): (Case.tags, True),
+}
+
+# filter models joined across to-many relationships, which may yield duplicate rows
+TO_MANY_FILTER_MODELS = {
+    Incident: {"Tag", "TagType", "Term", "Participant"},
+}
+
+
 def apply_filter_specific_joins(model: Base, filter_spec: dict, query: orm.query):
     """Applies any model specific implicity joins."""
-    # this is required because by default sqlalchemy-filter's auto-join
-    # knows nothing about how to join many-many relationships.
-    model_map = {
-        (Feedback, "Project"): (Incident, False),
-        (Feedback, "Incident"): (Incident, False),
-        (Task, "Project"): (Incident, False),
-        (Task, "Incident"): (Incident, False),
-        (Task, "IncidentPriority"): (Incident, False),
-        (Task, "IncidentType"): (Incident, False),
-        (PluginInstance, "Plugin"): (Plugin, False),
-        (Source, "Tag"): (Source.tags, True),
-        (Source, "TagType"): (Source.tags, True),
-        (QueryModel, "Tag"): (QueryModel.tags, True),
-        (QueryModel, "TagType"): (QueryModel.tags, True),
-        (DispatchUser, "Organization"): (DispatchUser.organizations, True),
-        (Incident, "Tag"): (Incident.tags, True),
-        (Incident, "TagType"): (Incident.tags, True),
-        (Incident, "Term"): (Incident.terms, True),
-        (Case, "Tag"): (Case.tags, True),
-    }
     filters = build_filters(filter_spec)
     filter_models = get_named_models(filters)[0]
     for filter_model in filter_models:
-        if model_map.get((model, filter_model)):
-            joined_model, is_outer = model_map[(model, filter_model)]
+        if FILTER_SPECIFIC_JOINS.get((model, filter_model)):
+            joined_model, is_outer = FILTER_SPECIFIC_JOINS[(model, filter_model)]
+            try:
+                query = query.join(joined_model, isouter=is_outer)
+            except Exception as e:
+                log.debug(str(e))
+
+    return query
+
+
+CompiledFilter = namedtuple("CompiledFilter", ("joins", "auto_joins", "criteria"))
+
+
+def canonical_filter_spec(filter_spec) -> str:
+    """Returns a canonical representation of a filter spec, suitable as a cache key."""
+    return json.dumps(filter_spec, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@functools.lru_cache(maxsize=DATABASE_FILTER_CACHE_SIZE)
+def _compile_filter_spec(model: Base, spec_key: str) -> Optional[CompiledFilter]:
+    filters = build_filters(json.loads(spec_key))
+    filter_models = sorted(set().union(*get_named_models(filters)))
+
+    # we resolve the join plan once against a session-less query for the model
+    query = orm.Query(model)
+
+    joins = []
+    for filter_model in filter_models:
+        if FILTER_SPECIFIC_JOINS.get((model, filter_model)):
+            joined_model, is_outer = FILTER_SPECIFIC_JOINS[(model, filter_model)]
             try:
                 query = query.join(joined_model, isouter=is_outer)
+                joins.append((joined_model, is_outer))
             except Exception as e:
                 log.debug(str(e))
 
+    auto_joins = []
+    model_registry = model._decl_class_registry
+    for filter_model in filter_models:
+        filter_model_cls = get_model_class_by_name(model_registry, filter_model)
+        if filter_model_cls not in get_query_models(query).values():
+            try:
+                query = query.join(filter_model_cls)
+                auto_joins.append(filter_model_cls)
+            except InvalidRequestError:
+                pass  # can't be autojoined
+
+    try:
+        criteria = [f.format_for_sqlalchemy(query, model) for f in filters]
+    except BadSpec:
+        # the filter relies on joins made by the caller's query, we can't precompile it
+        return None
+
+    return CompiledFilter(joins=joins, auto_joins=auto_joins, criteria=criteria)
+
+
+def compile_filter_spec(model: Base, filter_spec) -> Optional[CompiledFilter]:
+    """Compiles a filter spec for a model into a reusable join plan and criteria.
+
+    Compiled filters are cached (LRU) by a canonical form of the spec, so saved
+    filters that are evaluated over and over only have their filter tree built once.
+    """
+    return _compile_filter_spec(model, canonical_filter_spec(filter_spec))
+
+
+def apply_compiled_filters(query: orm.Query, filter_spec, model: Base) -> orm.Query:
+    """Applies the joins and filters of a filter spec to a query using its compiled form."""
+    compiled = compile_filter_spec(model, filter_spec)
+    if not compiled:
+        query = apply_filter_specific_joins(model, filter_spec, query)
+        return apply_filters(query, filter_spec, model)
+
+    for joined_model, is_outer in compiled.joins:
+        try:
+            query = query.join(joined_model, isouter=is_outer)
+        except Exception as e:
+            log.debug(str(e))
+
+    for filter_model_cls in compiled.auto_joins:
+        if filter_model_cls not in get_query_models(query).values():
+            try:
+                query = query.join(filter_model_cls)
+            except InvalidRequestError:
+                pass  # can't be autojoined
+
+    if compiled.criteria:
+        query = query.filter(*compiled.criteria)
     return query
 
 
-def composite_search(*, db_session, query_str: str, models: List[Base], current_user: DispatchUser):
-    """Perform a multi-table search based on the supplied query."""
-    s = CompositeSearch(db_session, models)
-    query = s.build_query(query_str, sort=True)
+def searchable_incident_filter(current_user: DispatchUser):
+    """Returns a filter limiting searched incidents to the ones the user is allowed to see."""
+    admin_project_ids = [p.project_id for p in current_user.projects if p.role == UserRoles.admin]
+
+    def restrict(query: orm.Query) -> orm.Query:
+        conditions = [
+            Incident.visibility == Visibility.open,
+            is_participant_filter(Incident, Participant.incident_id, current_user.email),
+        ]
+        if admin_project_ids:
+            conditions.append(Incident.project_id.in_(admin_project_ids))
+        return query.filter(or_(*conditions))
 
-    # TODO can we do this with composite filtering?
-    # for model in models:
-    # 	 query = apply_model_specific_filters(model, query, current_user)
+    return restrict
 
+
+def composite_search(
+    *,
+    db_session,
+    query_str: str,
+    models: List[Base],
+    current_user: DispatchUser,
+    page: int = 1,
+    items_per_page: int = 5,
+    mode: SearchModes = SearchModes.tsquery,
+):
+    """Perform a multi-table search based on the supplied query.
+
+    Each model returns its `items_per_page` best ranked hits for the given page,
+    restricted to what the user is allowed to see.
+    """
+    model_filters = {Incident: searchable_incident_filter(current_user)}
+    s = CompositeSearch(db_session, models, model_filters=model_filters)
+
+    limit, offset = None, 0
+    if items_per_page and items_per_page > 0:
+        limit, offset = items_per_page, (page - 1) * items_per_page
+
+    query = s.build_query(query_str, sort=True, limit=limit, offset=offset, mode=mode)
     return s.search(query=query)
 
 
@@ -423,6 +560,8 @@ def common_parameters(
     filter_spec: Json = Query([], alias="filter"),
     sort_by: List[str] = Query([], alias="sortBy[]"),
     descending: List[bool] = Query([], alias="descending[]"),
+    cursor: str = Query(None),
+    count: CountTypes = Query(CountTypes.exact),
     current_user: DispatchUser = Depends(get_current_user),
     role: UserRoles = Depends(get_current_role),
 ):
@@ -434,42 +573,229 @@ def common_parameters(
         "filter_spec": filter_spec,
         "sort_by": sort_by,
         "descending": descending,
+        "cursor": cursor,
+        "count": count,
         "current_user": current_user,
         "role": role,
     }
 
 
-def search_filter_sort_paginate(
-    db_session,
-    model,
-    query_str: str = None,
-    filter_spec: List[dict] = None,
-    page: int = 1,
-    items_per_page: int = 5,
-    sort_by: List[str] = None,
-    descending: List[bool] = None,
-    current_user: DispatchUser = None,
-    role: UserRoles = UserRoles.member,
-):
-    """Common functionality for searching, filtering, sorting, and pagination."""
-    model_cls = get_class_by_tablename(model)
+class explain(Executable, ClauseElement):
+    """Wraps a statement in an EXPLAIN so the planner's row estimate can be read."""
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def pg_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def get_total(*, db_session, query: orm.Query, count: CountTypes = CountTypes.exact) -> int:
+    """Counts the rows of a query exactly, from the planner's estimate or up to a cap."""
+    query = query.order_by(None).enable_eagerloads(False)
+
+    if count == CountTypes.estimated:
+        plan = db_session.execute(explain(query.statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    if count == CountTypes.capped:
+        capped = query.limit(DATABASE_PAGINATION_COUNT_CAP).subquery()
+        return db_session.query(func.count()).select_from(capped).scalar()
+
+    return query.count()
+
+
+def invalid_cursor(msg: str = "Invalid cursor.") -> ValidationError:
+    return ValidationError(
+        [ErrorWrapper(InvalidFilterError(msg=msg), loc="cursor")], model=BaseModel
+    )
+
+
+def encode_cursor(values: list) -> str:
+    """Encodes the sort key values of the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """Decodes a cursor into sort key values for the given keyset columns."""
     try:
-        query = db_session.query(model_cls)
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise invalid_cursor()
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise invalid_cursor("Cursor does not match the requested sort order.")
 
-        if query_str:
-            sort = False if sort_by else True
-            query = search(query_str=query_str, query=query, model=model, sort=sort)
+    decoded = []
+    for (column, _), value in zip(columns, values):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = None
 
-        query = apply_model_specific_filters(model_cls, query, current_user, role)
+        if value is not None and python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise invalid_cursor()
+        decoded.append(value)
+    return decoded
 
-        if filter_spec:
-            query = apply_filter_specific_joins(model_cls, filter_spec, query)
-            query = apply_filters(query, filter_spec, model_cls)
 
-        if sort_by:
-            sort_spec = create_sort_spec(model, sort_by, descending)
-            query = apply_sort(query, sort_spec)
+def get_keyset_columns(model_cls, sort_by: List[str], descending: List[bool]) -> list:
+    """Returns the (column, descending) pairs that define a stable keyset order.
+
+    The primary key is always appended as the tie breaker.
+    """
+    if len(sort_by or []) != len(descending or []):
+        raise ValidationError(
+            [
+                ErrorWrapper(
+                    InvalidFilterError(msg="sortBy[] and descending[] must have the same length."),
+                    loc="descending",
+                )
+            ],
+            model=BaseModel,
+        )
+
+    columns = []
+    for field, direction in zip(sort_by or [], descending or []):
+        if "." in field:
+            raise invalid_cursor(
+                "Cursor pagination only supports sorting by the model's own fields."
+            )
+        columns.append((Field(model_cls, field).get_sqlalchemy_field(), direction))
+
+    if not any(column.key == "id" for column, _ in columns):
+        columns.append((model_cls.id, columns[-1][1] if columns else True))
+    return columns
+
+
+def get_keyset_values(item, columns: list) -> list:
+    """Returns the sort key values of a row."""
+    return [getattr(item, column.key) for column, _ in columns]
+
+
+def keyset_filter(columns: list, values: list):
+    """Builds the predicate selecting rows that sort after the given key values.
+
+    Postgres sorts NULLs last in ascending and first in descending order.
+    """
+    clauses = []
+    for i, ((column, is_descending), value) in enumerate(zip(columns, values)):
+        equal = [c.is_(None) if v is None else c == v for (c, _), v in zip(columns[:i], values[:i])]
+        if value is None:
+            if not is_descending:
+                continue
+            after = column.isnot(None)
+        elif is_descending:
+            after = column < value
+        else:
+            after = or_(column > value, column.is_(None))
+        clauses.append(and_(*equal, after))
+
+    if not clauses:
+        return false()
+    return or_(*clauses)
+
+
+# relationship loading strategies that fetch related rows along with their parent
+EAGER_LOADING_STRATEGIES = ("joined", "subquery", "selectin", False)
+
+
+def add_loader(loader, strategy: str, attribute):
+    """Adds a loader option for a relationship, chained to its parent's loader if any."""
+    if loader is None:
+        return getattr(orm, strategy)(attribute)
+    return getattr(loader, strategy)(attribute)
+
+
+@functools.lru_cache()
+def get_loading_plan(model: Base, schema: Type[BaseModel], max_depth: int = 3) -> tuple:
+    """Returns the loader options needed to serialize instances of a model with a schema.
+
+    Relationships the schema reads are eager loaded, collections with a select IN
+    and scalars with a join. Eagerly configured relationships the schema doesn't
+    read are skipped.
+    """
+    options = []
+
+    def plan(model, schema, loader, depth, seen):
+        for relationship in orm.class_mapper(model).relationships:
+            attribute = relationship.class_attribute
+            field = schema.__fields__.get(relationship.key)
+
+            if not field:
+                if relationship.lazy in EAGER_LOADING_STRATEGIES:
+                    options.append(add_loader(loader, "lazyload", attribute))
+                continue
+
+            if relationship.lazy == "dynamic" or depth == max_depth:
+                continue
+
+            strategy = "selectinload" if relationship.uselist else "joinedload"
+            related_loader = add_loader(loader, strategy, attribute)
+            options.append(related_loader)
 
+            related = (relationship.mapper.class_, field.type_)
+            if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+                if related not in seen:
+                    plan(*related, related_loader, depth + 1, seen | {related})
+
+    plan(model, schema, None, 0, {(model, schema)})
+    return tuple(options)
+
+
+def keyset_paginate(
+    *,
+    db_session,
+    query: orm.Query,
+    columns: list,
+    cursor: str,
+    page: int,
+    items_per_page: Optional[int],
+    count: CountTypes,
+    loading_plan: tuple = (),
+) -> dict:
+    """Paginates a query using keyset predicates instead of offsets."""
+    total = get_total(db_session=db_session, query=query, count=count)
+
+    if cursor:
+        query = query.filter(keyset_filter(columns, decode_cursor(cursor, columns)))
+
+    # the keyset order replaces any other (e.g. the search rank), the predicate only follows it
+    query = query.order_by(None).order_by(*[desc(c) if d else asc(c) for c, d in columns])
+    query = query.options(*loading_plan)
+
+    if items_per_page:
+        # we fetch one extra row to know whether there's a next page
+        items = query.limit(items_per_page + 1).all()
+    else:
+        items = query.all()
+
+    next_cursor = None
+    if items_per_page and len(items) > items_per_page:
+        items = items[:items_per_page]
+        next_cursor = encode_cursor(get_keyset_values(items[-1], columns))
+
+    return {
+        "items": items,
+        "itemsPerPage": items_per_page or len(items),
+        "page": page,
+        "total": total,
+        "next": next_cursor,
+    }
+
+
+@contextmanager
+def filter_errors():
+    """Turns errors in user provided filters and sorts into validation errors."""
+    try:
+        yield
     except FieldNotFound as e:
         raise ValidationError(
             [
@@ -482,6 +808,77 @@ def search_filter_sort_paginate(
             [ErrorWrapper(InvalidFilterError(msg=str(e)), loc="filter")], model=BaseModel
         )
 
+
+def search_filter(
+    *,
+    db_session,
+    model: str,
+    query_str: str = None,
+    filter_spec: List[dict] = None,
+    sort_by: List[str] = None,
+    current_user: DispatchUser = None,
+    role: UserRoles = UserRoles.member,
+) -> orm.Query:
+    """Builds the query for a search and filter spec, restricted to what the user can see."""
+    model_cls = get_class_by_tablename(model)
+    query = db_session.query(model_cls)
+
+    if query_str:
+        sort = False if sort_by else True
+        query = search(query_str=query_str, query=query, model=model, sort=sort)
+
+    query = apply_model_specific_filters(model_cls, query, current_user, role)
+
+    if filter_spec:
+        query = apply_compiled_filters(query, filter_spec, model_cls)
+
+        # only joins across to-many relationships (e.g. tags) may yield duplicates
+        if get_query_models(query).keys() & TO_MANY_FILTER_MODELS.get(model_cls, set()):
+            query = query.distinct()
+
+    return query
+
+
+def search_filter_sort_paginate(
+    db_session,
+    model,
+    query_str: str = None,
+    filter_spec: List[dict] = None,
+    page: int = 1,
+    items_per_page: int = 5,
+    sort_by: List[str] = None,
+    descending: List[bool] = None,
+    cursor: str = None,
+    count: CountTypes = CountTypes.exact,
+    current_user: DispatchUser = None,
+    role: UserRoles = UserRoles.member,
+    loading_plan: tuple = (),
+):
+    """Common functionality for searching, filtering, sorting, and pagination.
+
+    Passing a cursor (an empty one for the first page) switches to keyset pagination,
+    and `count` controls whether the total is exact, estimated by the planner or capped.
+    The loader options of a `loading_plan` (see `get_loading_plan`) are applied to the
+    fetched page only.
+    """
+    model_cls = get_class_by_tablename(model)
+    with filter_errors():
+        query = search_filter(
+            db_session=db_session,
+            model=model,
+            query_str=query_str,
+            filter_spec=filter_spec,
+            sort_by=sort_by,
+            current_user=current_user,
+            role=role,
+        )
+
+        if cursor is not None:
+            keyset_columns = get_keyset_columns(model_cls, sort_by, descending)
+        elif sort_by:
+            sort_spec = create_sort_spec(model, sort_by, descending)
+            query = apply_sort(query, sort_spec)
+
     if items_per_page == -1:
         items_per_page = None
 
@@ -490,7 +887,29 @@ def search_filter_sort_paginate(
     # e.g. websearch_to_tsquery
     # https://www.postgresql.org/docs/current/textsearch-controls.html
     try:
-        query, pagination = apply_pagination(query, page_number=page, page_size=items_per_page)
+        if cursor is not None:
+            return keyset_paginate(
+                db_session=db_session,
+                query=query,
+                columns=keyset_columns,
+                cursor=cursor,
+                page=page,
+                items_per_page=items_per_page,
+                count=count,
+                loading_plan=loading_plan,
+            )
+
+        if count == CountTypes.exact:
+            query, pagination = apply_pagination(query, page_number=page, page_size=items_per_page)
+            page, items_per_page = pagination.page_number, pagination.page_size
+            total = pagination.total_results
+        else:
+            total = get_total(db_session=db_session, query=query, count=count)
+            if items_per_page:
+                query = query.limit(items_per_page).offset((page - 1) * items_per_page)
+            else:
+                items_per_page = total
+        items = query.options(*loading_plan).all()
     except ProgrammingError as e:
         log.debug(e)
         return {
@@ -498,31 +917,138 @@ def search_filter_sort_paginate(
             "itemsPerPage": items_per_page,
             "page": page,
             "total": 0,
+            "next": None,
         }
 
     return {
-        "items": query.all(),
-        "itemsPerPage": pagination.page_size,
-        "page": pagination.page_number,
-        "total": pagination.total_results,
+        "items": items,
+        "itemsPerPage": items_per_page,
+        "page": page,
+        "total": total,
+        "next": None,
+    }
+
+
+def export_parameters(
+    db_session: orm.Session = Depends(get_db),
+    query_str: QueryStr = Query(None, alias="q"),
+    filter_spec: Json = Query([], alias="filter"),
+    sort_by: List[str] = Query([], alias="sortBy[]"),
+    descending: List[bool] = Query([], alias="descending[]"),
+    export_format: ExportFormats = Query(ExportFormats.ndjson, alias="format"),
+    current_user: DispatchUser = Depends(get_current_user),
+    role: UserRoles = Depends(get_current_role),
+):
+    return {
+        "db_session": db_session,
+        "query_str": query_str,
+        "filter_spec": filter_spec,
+        "sort_by": sort_by,
+        "descending": descending,
+        "export_format": export_format,
+        "current_user": current_user,
+        "role": role,
     }
 
 
+def search_filter_sort_stream(
+    db_session,
+    model: str,
+    query_str: str = None,
+    filter_spec: List[dict] = None,
+    sort_by: List[str] = None,
+    descending: List[bool] = None,
+    current_user: DispatchUser = None,
+    role: UserRoles = UserRoles.member,
+    loading_plan: tuple = (),
+    batch_size: int = DATABASE_EXPORT_BATCH_SIZE,
+) -> Iterator[Base]:
+    """Searches, filters and sorts like `search_filter_sort_paginate`, streaming every result.
+
+    Rows are fetched `batch_size` at a time through a server side cursor. The
+    stream outlives the request's session, so it runs in its own session, which
+    is closed once the stream is exhausted or closed.
+    """
+    model_cls = get_class_by_tablename(model)
+    stream_session = orm.Session(bind=db_session.get_bind())
+    try:
+        with filter_errors():
+            query = search_filter(
+                db_session=stream_session,
+                model=model,
+                query_str=query_str,
+                filter_spec=filter_spec,
+                sort_by=sort_by,
+                current_user=current_user,
+                role=role,
+            )
+
+            if sort_by:
+                sort_spec = create_sort_spec(model, sort_by, descending)
+                query = apply_sort(query, sort_spec)
+            elif not query_str:
+                query = query.order_by(model_cls.id)
+    except Exception:
+        stream_session.close()
+        raise
+
+    def stream():
+        try:
+            yield from query.options(*loading_plan).yield_per(batch_size)
+        finally:
+            stream_session.close()
+
+    return stream()
+
+
+def is_participant_filter(model: Base, participant_fk, email: str):
+    """Returns a correlated EXISTS that holds when the user with the given email participates."""
+    return (
+        exists()
+        .where(participant_fk == model.id)
+        .where(Participant.individual_contact_id == IndividualContact.id)
+        .where(IndividualContact.email == email)
+        .correlate(model)
+    )
+
+
 def restricted_incident_filter(query: orm.Query, current_user: DispatchUser, role: UserRoles):
     """Adds additional incident filters to query (usually for permissions)."""
     if role == UserRoles.member:
         # We filter out resticted incidents for users with a member role if the user is not an incident participant
-        query = (
-            query.join(Participant, Incident.id == Participant.incident_id)
-            .join(IndividualContact)
-            .filter(
-                or_(
-                    Incident.visibility == Visibility.open,
-                    IndividualContact.email == current_user.email,
-                )
+        query = query.filter(
+            or_(
+                Incident.visibility == Visibility.open,
+                is_participant_filter(Incident, Participant.incident_id, current_user.email),
             )
         )
-    return query.distinct()
+    return query
+
+
+def restricted_event_filter(query: orm.Query, current_user: DispatchUser, role: UserRoles):
+    """Adds additional event filters to query (usually for permissions)."""
+    if role == UserRoles.member:
+        # We filter out events of incidents the user isn't allowed to see
+        visible_incidents = restricted_incident_filter(
+            query.session.query(Incident.id), current_user, role
+        ).subquery()
+        query = query.filter(
+            or_(Event.incident_id.is_(None), Event.incident_id.in_(visible_incidents))
+        )
+    return query
+
+
+def restricted_case_filter(query: orm.Query, current_user: DispatchUser, role: UserRoles):
+    """Adds additional case filters to query (usually for permissions)."""
+    if role == UserRoles.member:
+        # We filter out resticted cases for users with a member role if the user is not a case participant
+        query = query.filter(
+            or_(
+                Case.visibility == Visibility.open,
+                is_participant_filter(Case, Participant.case_id, current_user.email),
+            )
+        )
+    return query
 
 
 def restricted_incident_type_filter(query: orm.Query, current_user: DispatchUser):
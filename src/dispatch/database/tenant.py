@@ -0,0 +1,96 @@
+"""
+.. module: dispatch.database.tenant
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import logging
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from dispatch.organization.models import Organization
+
+from .core import engine
+from .enums import DISPATCH_ORGANIZATION_SCHEMA_PREFIX
+
+
+log = logging.getLogger(__name__)
+
+
+class Tenant(NamedTuple):
+    slug: str
+    schema: str
+    engine: Engine
+    session_factory: sessionmaker
+
+
+def get_schema_name(organization_slug: str) -> str:
+    """Returns the schema name for a given organization slug."""
+    return f"{DISPATCH_ORGANIZATION_SCHEMA_PREFIX}_{organization_slug}"
+
+
+class TenantRegistry(object):
+    """Maps organization slugs to prebuilt schema-translated engines and session factories."""
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._tenants: Dict[str, Tenant] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, organization_slug: str) -> bool:
+        return organization_slug in self._tenants
+
+    def build(self, organization_slug: str) -> Tenant:
+        """Builds a tenant without registering it."""
+        schema = get_schema_name(organization_slug)
+        schema_engine = self._engine.execution_options(schema_translate_map={None: schema})
+        return Tenant(
+            slug=organization_slug,
+            schema=schema,
+            engine=schema_engine,
+            session_factory=sessionmaker(bind=schema_engine),
+        )
+
+    def register(self, organization_slug: str) -> Tenant:
+        """Registers (or replaces) the tenant for a given organization slug."""
+        tenant = self.build(organization_slug)
+        with self._lock:
+            self._tenants[organization_slug] = tenant
+        log.debug(f"Registered tenant {tenant.schema}.")
+        return tenant
+
+    def unregister(self, organization_slug: str) -> None:
+        """Removes the tenant for a given organization slug."""
+        with self._lock:
+            self._tenants.pop(organization_slug, None)
+        log.debug(f"Unregistered tenant {get_schema_name(organization_slug)}.")
+
+    def clear(self) -> None:
+        """Removes all registered tenants."""
+        with self._lock:
+            self._tenants.clear()
+
+    def warm(self, db_session) -> None:
+        """Registers a tenant for every known organization."""
+        for organization in db_session.query(Organization):
+            self.register(organization.slug)
+        log.info(f"Tenant registry warmed with {len(self._tenants)} organization(s).")
+
+    def get(self, organization_slug: str) -> Optional[Tenant]:
+        """Resolves the tenant for a given organization slug.
+
+        Organizations created by another process are not known to this registry,
+        so on a miss we check whether the schema exists before giving up.
+        """
+        tenant = self._tenants.get(organization_slug)
+        if tenant:
+            return tenant
+
+        if self._engine.dialect.has_schema(self._engine, get_schema_name(organization_slug)):
+            return self.register(organization_slug)
+
+
+tenant_registry = TenantRegistry(engine)
@@ -1,114 +1,289 @@
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from functools import wraps
-from typing import Any, List
+from typing import Any, List, NamedTuple, Optional, Tuple
+import functools
+import importlib
 import inspect
+import itertools
 import logging
+import multiprocessing
 import time
 
+from dispatch.config import SCHEDULER_FANOUT_CONCURRENCY, SCHEDULER_FANOUT_MODE
+
+from dispatch.database.instrumentation import instrument
+from dispatch.enums import SchedulerFanoutModes
 from dispatch.metrics import provider as metrics_provider
 from dispatch.organization import service as organization_service
 from dispatch.project import service as project_service
+from dispatch.scheduler import acquire_lease, is_timed_out, release_lease
+from dispatch.tracing import get_current_span, get_span_name, span
 
 from .database.core import SessionLocal, engine, sessionmaker
 
 
 log = logging.getLogger(__name__)
 
+# the arguments of background tasks recorded on their spans
+TRACED_ARGUMENTS = ["organization_slug", "incident_id", "case_id"]
+
 
 def fullname(o):
     module = inspect.getmodule(o)
     return f"{module.__name__}.{o.__qualname__}"
 
 
-def scheduled_project_task(func):
+class ProjectUnit(NamedTuple):
+    """A project a scheduled task runs for."""
+
+    organization_slug: str
+    project_id: int
+
+    @property
+    def lease_key(self) -> str:
+        return f"{self.organization_slug}:{self.project_id}"
+
+
+def get_schema_session(organization_slug: str):
+    schema_engine = engine.execution_options(
+        schema_translate_map={None: f"dispatch_organization_{organization_slug}"}
+    )
+    return sessionmaker(bind=schema_engine)()
+
+
+def get_project_units(db_session) -> List[ProjectUnit]:
+    """Returns the projects of every organization."""
+    units = []
+    for organization in organization_service.get_all(db_session=db_session):
+        schema_session = get_schema_session(organization.slug)
+        try:
+            for project in project_service.get_all(db_session=schema_session):
+                units.append(ProjectUnit(organization.slug, project.id))
+        finally:
+            schema_session.close()
+    return units
+
+
+def run_project_unit(func, unit: ProjectUnit, args, kwargs) -> Tuple[float, Optional[str]]:
+    """Runs a scheduled task for a single project, in its own session.
+
+    Returns how long it took and the error it raised, if any.
+    """
+    start = time.perf_counter()
+    db_session = get_schema_session(unit.organization_slug)
+    try:
+        project = project_service.get(db_session=db_session, project_id=unit.project_id)
+        with instrument("scheduled", fullname(func)):
+            func(*args, **{**kwargs, "db_session": db_session, "project": project})
+    except Exception as e:
+        log.exception(e)
+        return time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    finally:
+        db_session.close()
+    return time.perf_counter() - start, None
+
+
+def run_project_unit_by_name(module: str, name: str, unit: ProjectUnit, args, kwargs):
+    """Runs a scheduled task for a single project, from a pool process.
+
+    Decorated functions can't be pickled, so the task is looked up by name.
+    """
+    func = functools.reduce(getattr, name.split("."), importlib.import_module(module))
+    func = inspect.unwrap(func, stop=lambda f: hasattr(f, "__scheduled_project_task__"))
+    return run_project_unit(func.__wrapped__, unit, args, kwargs)
+
+
+def get_fanout_executor(mode: SchedulerFanoutModes, concurrency: int) -> Executor:
+    if mode == SchedulerFanoutModes.process:
+        # spawned processes get their own database connections
+        from dispatch.common.utils.cli import install_plugins
+
+        return ProcessPoolExecutor(
+            max_workers=concurrency,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=install_plugins,
+        )
+    return ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scheduled-project")
+
+
+def scheduled_project_task(
+    func=None, *, mode: SchedulerFanoutModes = None, concurrency: int = None
+):
     """Decorator that sets up a background task function with
     a database session and exception tracking.
 
-    Each task is executed in a specific project context.
+    Each task is executed in a specific project context, with a session of
+    its own. Projects are run one after another (serial mode), or `concurrency`
+    at a time on a thread or process pool (defaults to SCHEDULER_FANOUT_MODE and
+    SCHEDULER_FANOUT_CONCURRENCY). Projects leased by another scheduler replica
+    are skipped.
     """
+    if func is None:
+        return functools.partial(scheduled_project_task, mode=mode, concurrency=concurrency)
+
+    mode = mode or SCHEDULER_FANOUT_MODE
+    concurrency = concurrency or SCHEDULER_FANOUT_CONCURRENCY
+    tags = {"function": fullname(func)}
+
+    def record(unit: ProjectUnit, elapsed_time: float, error: Optional[str]):
+        unit_tags = {**tags, "organization": unit.organization_slug}
+        metrics_provider.timer("function.unit.elapsed.time", value=elapsed_time, tags=unit_tags)
+        if error:
+            metrics_provider.counter("function.unit.error.counter", tags=unit_tags)
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        db_session = SessionLocal()
-        metrics_provider.counter("function.call.counter", tags={"function": fullname(func)})
+        metrics_provider.counter("function.call.counter", tags=tags)
         start = time.perf_counter()
 
-        # iterate for all schema
-        for organization in organization_service.get_all(db_session=db_session):
-            schema_engine = engine.execution_options(
-                schema_translate_map={None: f"dispatch_organization_{organization.slug}"}
-            )
-            schema_session = sessionmaker(bind=schema_engine)()
-            kwargs["db_session"] = schema_session
-            for project in project_service.get_all(db_session=schema_session):
-                kwargs["project"] = project
+        db_session = SessionLocal()
+        try:
+            units = get_project_units(db_session)
+        finally:
+            db_session.close()
+
+        pending = iter(units)
+
+        def next_unit() -> Optional[ProjectUnit]:
+            """Returns the next project to run, once leased to this replica."""
+            if is_timed_out():
+                return None
+            for unit in pending:
+                if acquire_lease(unit.lease_key):
+                    return unit
+
+        if mode == SchedulerFanoutModes.serial:
+            for unit in iter(next_unit, None):
                 try:
-                    func(*args, **kwargs)
-                except Exception as e:
-                    log.exception(e)
-            schema_session.close()
+                    record(unit, *run_project_unit(func, unit, args, kwargs))
+                finally:
+                    release_lease(unit.lease_key)
+        else:
+            with get_fanout_executor(mode, concurrency) as executor:
+
+                def submit(unit: ProjectUnit):
+                    if mode == SchedulerFanoutModes.process:
+                        return executor.submit(
+                            run_project_unit_by_name,
+                            func.__module__,
+                            func.__qualname__,
+                            unit,
+                            args,
+                            kwargs,
+                        )
+                    return executor.submit(run_project_unit, func, unit, args, kwargs)
+
+                # projects are leased as they're submitted, so that replicas running
+                # the task at the same time share them
+                futures = {
+                    submit(unit): unit
+                    for unit in itertools.islice(iter(next_unit, None), concurrency)
+                }
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        unit = futures.pop(future)
+                        try:
+                            record(unit, *future.result())
+                        except Exception as e:
+                            # e.g. a pool process died
+                            log.exception(e)
+                            record(unit, 0, f"{type(e).__name__}: {e}")
+                        finally:
+                            release_lease(unit.lease_key)
+
+                        unit = next_unit()
+                        if unit is not None:
+                            futures[submit(unit)] = unit
+
+        skipped = len(list(pending))
+        if skipped:
+            log.warning(f"{tags['function']} timed out, skipped {skipped} project(s).")
+
         elapsed_time = time.perf_counter() - start
-        metrics_provider.timer(
-            "function.elapsed.time", value=elapsed_time, tags={"function": fullname(func)}
-        )
-        db_session.close()
+        metrics_provider.timer("function.elapsed.time", value=elapsed_time, tags=tags)
 
+    wrapper.__scheduled_project_task__ = True
     return wrapper
 
 
-def background_task(func):
+def background_task(func=None, *, max_attempts: int = 1):
     """Decorator that sets up the a background task function
     with a database session and exception tracking.
 
     As background tasks run in their own threads, it does not attempt
     to propagate errors.
+
+    When queued as a job, the task is attempted up to `max_attempts` times. Only
+    tasks that are safe to run again after failing midway should opt in to retries.
     """
+    if func is None:
+        return functools.partial(background_task, max_attempts=max_attempts)
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
+    tags = {"function": fullname(func)}
+    span_name = get_span_name(func)
+
+    def run(*args, **kwargs):
+        """Runs the task, raising its errors (e.g. so that queued jobs can be retried)."""
         background = False
         if not kwargs.get("db_session"):
             if not kwargs.get("organization_slug"):
                 raise Exception("If not db_session is supplied organization slug must be provided.")
 
-            schema_engine = engine.execution_options(
-                schema_translate_map={
-                    None: f"dispatch_organization_{kwargs['organization_slug']}",
-                }
-            )
-            db_session = sessionmaker(bind=schema_engine)
-
+            kwargs["db_session"] = get_schema_session(kwargs["organization_slug"])
             background = True
-            kwargs["db_session"] = db_session()
         try:
-            metrics_provider.counter("function.call.counter", tags={"function": fullname(func)})
+            metrics_provider.counter("function.call.counter", tags=tags)
             start = time.perf_counter()
-            result = func(*args, **kwargs)
+            attributes = {k: kwargs[k] for k in TRACED_ARGUMENTS if kwargs.get(k) is not None}
+            with instrument("background", tags["function"]), span(span_name, **attributes):
+                result = func(*args, **kwargs)
             elapsed_time = time.perf_counter() - start
-            metrics_provider.timer(
-                "function.elapsed.time", value=elapsed_time, tags={"function": fullname(func)}
-            )
+            metrics_provider.timer("function.elapsed.time", value=elapsed_time, tags=tags)
             return result
-        except Exception as e:
-            log.exception(e)
         finally:
             if background:
                 kwargs["db_session"].close()
 
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not kwargs.get("db_session") and not kwargs.get("organization_slug"):
+            raise Exception("If not db_session is supplied organization slug must be provided.")
+        try:
+            return run(*args, **kwargs)
+        except Exception as e:
+            log.exception(e)
+
+    wrapper.run = run
+    wrapper.__background_task__ = True
+    wrapper.__max_attempts__ = max_attempts
     return wrapper
 
 
 def timer(func: Any):
     """Timing decorator that sends a timing metric."""
+    tags = {"function": fullname(func)}
 
     @wraps(func)
     def wrapper(*args, **kwargs):
         start = time.perf_counter()
-        result = func(*args, **kwargs)
+        if get_current_span() is not None:
+            # calls made within a traced flow (e.g. plugin calls) are recorded as spans
+            slug = getattr(args[0], "slug", None) if args else None
+            attributes = {"plugin_slug": slug} if slug else {}
+            with span(tags["function"], **attributes):
+                result = func(*args, **kwargs)
+        else:
+            result = func(*args, **kwargs)
         elapsed_time = time.perf_counter() - start
-        metrics_provider.timer(
-            "function.elapsed.time", value=elapsed_time, tags={"function": fullname(func)}
-        )
-        log.debug(f"function.elapsed.time.{fullname(func)}: {elapsed_time}")
+        metrics_provider.timer("function.elapsed.time", value=elapsed_time, tags=tags)
+        log.debug(f"function.elapsed.time.{tags['function']}: {elapsed_time}")
         return result
 
     return wrapper
@@ -116,10 +291,11 @@ def timer(func: Any):
 
 def counter(func: Any):
     """Counting decorator that sends a counting metric."""
+    tags = {"function": fullname(func)}
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        metrics_provider.counter("function.call.counter", tags={"function": fullname(func)})
+        metrics_provider.counter("function.call.counter", tags=tags)
         return func(*args, **kwargs)
 
     return wrapper
@@ -6,6 +6,7 @@ from dispatch.database.core import get_table_name_by_class_instance
 from dispatch.enums import DocumentResourceTypes
 from dispatch.event import service as event_service
 from dispatch.plugin import service as plugin_service
+from dispatch.tracing import traced
 
 from .models import Document, DocumentCreate
 from .service import create, delete
@@ -15,6 +16,7 @@ from .utils import deslug
 log = logging.getLogger(__name__)
 
 
+@traced()
 def create_document(
     subject: Any, document_type: str, document_template: Document, db_session: SessionLocal
 ):
@@ -108,6 +110,7 @@ def create_document(
     return document
 
 
+@traced()
 def update_document(document: Document, project_id: int, db_session: SessionLocal):
     """Updates an existing document."""
     plugin = plugin_service.get_active_instance(
@@ -170,6 +173,7 @@ def update_document(document: Document, project_id: int, db_session: SessionLoca
         )
 
 
+@traced()
 def delete_document(document: Document, project_id: int, db_session: SessionLocal):
     """Deletes an existing document."""
     # we delete the external document
@@ -36,6 +36,40 @@ class SearchTypes(DispatchEnum):
     term = "Term"
 
 
+class TypeaheadTypes(DispatchEnum):
+    individual_contact = "IndividualContact"
+    service = "Service"
+    tag = "Tag"
+    term = "Term"
+
+
+class SearchModes(DispatchEnum):
+    tsquery = "tsquery"
+    websearch = "websearch"
+
+
+class CountTypes(DispatchEnum):
+    exact = "exact"
+    estimated = "estimated"
+    capped = "capped"
+
+
+class ExportFormats(DispatchEnum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class SchedulerPolicies(DispatchEnum):
+    skip = "skip"
+    coalesce = "coalesce"
+
+
+class SchedulerFanoutModes(DispatchEnum):
+    serial = "serial"
+    thread = "thread"
+    process = "process"
+
+
 class UserRoles(DispatchEnum):
     owner = "Owner"
     manager = "Manager"
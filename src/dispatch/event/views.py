@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from dispatch.common.utils.views import create_export_response
+from dispatch.database.service import export_parameters, search_filter_sort_stream
+
+from .models import EventRead
+
+router = APIRouter()
+
+
+@router.get("/export", summary="Exports timeline events as NDJSON or CSV.")
+def export_events(*, export: dict = Depends(export_parameters)):
+    """Streams all timeline events matching the given search and filters."""
+    export_format = export.pop("export_format")
+    events = search_filter_sort_stream(model="Event", **export)
+    return create_export_response(
+        instances=events, schema=EventRead, export_format=export_format, filename="events"
+    )
@@ -5,6 +5,7 @@ from dispatch.database.core import SessionLocal
 from dispatch.database.core import get_table_name_by_class_instance
 from dispatch.event import service as event_service
 from dispatch.plugin import service as plugin_service
+from dispatch.tracing import traced
 
 from .enums import GroupType, GroupAction
 from .models import Group, GroupCreate
@@ -14,6 +15,7 @@ from .service import create
 log = logging.getLogger(__name__)
 
 
+@traced()
 def create_group(
     subject: Any, group_type: str, group_participants: List[str], db_session: SessionLocal
 ):
@@ -81,6 +83,7 @@ def create_group(
     return group
 
 
+@traced()
 def update_group(
     subject: Any,
     group: Group,
@@ -120,6 +123,7 @@ def update_group(
             return
 
 
+@traced()
 def delete_group(group: Group, db_session: SessionLocal):
     """Deletes an existing group."""
     plugin = plugin_service.get_active_instance(
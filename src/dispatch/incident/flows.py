@@ -38,6 +38,7 @@ from dispatch.storage.models import StorageCreate
 from dispatch.task.enums import TaskStatus
 from dispatch.ticket import service as ticket_service
 from dispatch.ticket.models import TicketCreate
+from dispatch.tracing import traced
 
 from .messaging import (
     get_suggested_document_items,
@@ -60,6 +61,7 @@ from .models import Incident, IncidentStatus
 log = logging.getLogger(__name__)
 
 
+@traced()
 def get_incident_participants(incident: Incident, db_session: SessionLocal):
     """Get additional incident participants based on priority, type, and description."""
     individual_contacts = []
@@ -114,6 +116,7 @@ def inactivate_incident_participants(incident: Incident, db_session: SessionLoca
     )
 
 
+@traced()
 def create_incident_ticket(incident: Incident, db_session: SessionLocal):
     """Create an external ticket for tracking."""
     plugin = plugin_service.get_active_instance(
@@ -153,6 +156,7 @@ def create_incident_ticket(incident: Incident, db_session: SessionLocal):
     return ticket
 
 
+@traced()
 def update_external_incident_ticket(
     incident_id: int,
     db_session: SessionLocal,
@@ -208,6 +212,7 @@ def update_external_incident_ticket(
     )
 
 
+@traced()
 def create_participant_groups(
     incident: Incident,
     direct_participants: List[Any],
@@ -258,6 +263,7 @@ def create_participant_groups(
     return tactical_group, notifications_group
 
 
+@traced()
 def create_conference(incident: Incident, participants: List[str], db_session: SessionLocal):
     """Create external conference room."""
     plugin = plugin_service.get_active_instance(
@@ -277,6 +283,7 @@ def create_conference(incident: Incident, participants: List[str], db_session: S
     return conference
 
 
+@traced()
 def create_incident_storage(
     incident: Incident, participant_group_emails: List[str], db_session: SessionLocal
 ):
@@ -290,6 +297,7 @@ def create_incident_storage(
     return storage
 
 
+@traced()
 def create_incident_documents(incident: Incident, db_session: SessionLocal):
     """Create incident documents."""
     incident_documents = []
@@ -386,6 +394,7 @@ def create_incident_documents(incident: Incident, db_session: SessionLocal):
     return incident_documents
 
 
+@traced()
 def create_post_incident_review_document(incident: Incident, db_session: SessionLocal):
     """Create post-incident review document."""
     # we get the storage plugin
@@ -463,6 +472,7 @@ def create_post_incident_review_document(incident: Incident, db_session: Session
     db_session.commit()
 
 
+@traced()
 def update_document(document_resource_id: str, incident: Incident, db_session: SessionLocal):
     """Updates an existing document."""
     # we get the document plugin
@@ -494,6 +504,7 @@ def update_document(document_resource_id: str, incident: Incident, db_session: S
     )
 
 
+@traced()
 def create_conversation(incident: Incident, db_session: SessionLocal):
     """Create external communication conversation."""
     plugin = plugin_service.get_active_instance(
@@ -512,6 +523,7 @@ def create_conversation(incident: Incident, db_session: SessionLocal):
     return conversation
 
 
+@traced()
 def set_conversation_topic(incident: Incident, db_session: SessionLocal):
     """Sets the conversation topic."""
     if not incident.conversation:
@@ -542,6 +554,7 @@ def set_conversation_topic(incident: Incident, db_session: SessionLocal):
         log.exception(e)
 
 
+@traced()
 def set_conversation_bookmarks(incident: Incident, db_session: SessionLocal):
     """Sets the conversation bookmarks."""
     if not incident.conversation:
@@ -598,6 +611,7 @@ def set_conversation_bookmarks(incident: Incident, db_session: SessionLocal):
         log.exception(e)
 
 
+@traced()
 def add_participants_to_conversation(
     participant_emails: List[str], incident: Incident, db_session: SessionLocal
 ):
@@ -629,6 +643,7 @@ def add_participants_to_conversation(
         log.exception(e)
 
 
+@traced()
 def add_participant_to_tactical_group(
     user_email: str, incident: Incident, db_session: SessionLocal
 ):
@@ -665,6 +680,7 @@ def add_participant_to_tactical_group(
         log.exception(e)
 
 
+@traced()
 def remove_participant_from_tactical_group(
     user_email: str, incident: Incident, db_session: SessionLocal
 ):
@@ -1553,7 +1569,7 @@ def incident_engage_oncall_flow(
     return oncall_participant_added.individual, oncall_service
 
 
-@background_task
+@background_task(max_attempts=3)
 def incident_add_participant_to_tactical_group_flow(
     user_email: str,
     incident_id: Incident,
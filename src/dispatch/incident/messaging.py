@@ -39,6 +39,7 @@ from dispatch.messaging.strings import (
 from dispatch.participant import service as participant_service
 from dispatch.participant_role import service as participant_role_service
 from dispatch.plugin import service as plugin_service
+from dispatch.tracing import traced
 
 
 log = logging.getLogger(__name__)
@@ -214,6 +215,7 @@ def send_welcome_email_to_participant(
     log.debug(f"Welcome email sent to {participant_email}.")
 
 
+@traced()
 def send_incident_welcome_participant_messages(
     participant_email: str, incident: Incident, db_session: SessionLocal
 ):
@@ -246,6 +248,7 @@ def get_suggested_document_items(incident: Incident, db_session: SessionLocal):
     return items
 
 
+@traced()
 def send_incident_suggested_reading_messages(
     incident: Incident, items: list, participant_email: str, db_session: SessionLocal
 ):
@@ -278,6 +281,7 @@ def send_incident_suggested_reading_messages(
     log.debug(f"Suggested reading ephemeral message sent to {participant_email}.")
 
 
+@traced()
 def send_incident_created_notifications(incident: Incident, db_session: SessionLocal):
     """Sends incident created notifications."""
     notification_template = INCIDENT_NOTIFICATION.copy()
@@ -344,6 +348,7 @@ def send_incident_created_notifications(incident: Incident, db_session: SessionL
     log.debug("Incident created notifications sent.")
 
 
+@traced()
 def send_incident_update_notifications(
     incident: Incident, previous_incident: IncidentRead, db_session: SessionLocal
 ):
@@ -464,6 +469,7 @@ def send_incident_update_notifications(
     log.debug("Incident updated notifications sent.")
 
 
+@traced()
 def send_incident_participant_announcement_message(
     participant_email: str, incident: Incident, db_session: SessionLocal
 ):
@@ -921,6 +927,7 @@ def send_incident_rating_feedback_message(incident: Incident, db_session: Sessio
     log.debug("Incident rating and feedback message sent to all participants.")
 
 
+@traced()
 def send_incident_management_help_tips_message(incident: Incident, db_session: SessionLocal):
     """
     Sends a direct message to the incident commander
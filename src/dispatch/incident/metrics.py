@@ -12,7 +12,7 @@ from statsmodels.tsa.api import ExponentialSmoothing
 
 from sqlalchemy import and_
 
-from dispatch.database.service import apply_filters, apply_filter_specific_joins
+from dispatch.database.service import apply_compiled_filters
 from dispatch.incident.type.models import IncidentType
 
 from .models import Incident
@@ -41,8 +41,7 @@ def create_incident_metric_query(
     query = db_session.query(Incident)
 
     if filter_spec:
-        query = apply_filter_specific_joins(Incident, filter_spec, query)
-        query = apply_filters(query, filter_spec)
+        query = apply_compiled_filters(query, filter_spec, Incident)
 
     if start_date:
         query = query.filter(
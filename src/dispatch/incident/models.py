@@ -366,6 +366,7 @@ class IncidentExpandedPagination(DispatchBase):
     itemsPerPage: int
     page: int
     items: List[IncidentRead] = []
+    next: Optional[str]
 
 
 class IncidentPagination(DispatchBase):
@@ -373,3 +374,4 @@ class IncidentPagination(DispatchBase):
     itemsPerPage: int
     page: int
     items: List[IncidentReadMinimal] = []
+    next: Optional[str]
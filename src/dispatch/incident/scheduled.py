@@ -108,15 +108,16 @@ def daily_report(db_session: SessionLocal, project: Project):
     notifications = notification_service.get_all_enabled(
         db_session=db_session, project_id=project.id
     )
+    # we match every distinct filter against all incidents at once
+    matches = search_filter_service.match_many(
+        db_session=db_session,
+        search_filters=[f for n in notifications for f in n.filters],
+        class_instances=incidents,
+    )
     for incident in incidents:
         for notification in notifications:
             for search_filter in notification.filters:
-                match = search_filter_service.match(
-                    db_session=db_session,
-                    filter_spec=search_filter.expression,
-                    class_instance=incident,
-                )
-                if match:
+                if incident.id in matches[search_filter.id]:
                     incidents_notification_filters_mapping[notification.id][
                         search_filter.id
                     ].append(incident)
@@ -1,5 +1,4 @@
 import calendar
-import json
 import logging
 from datetime import date
 from typing import List
@@ -17,11 +16,22 @@ from dispatch.auth.permissions import (
     PermissionsDependency,
 )
 from dispatch.auth.service import get_current_user
-from dispatch.common.utils.views import create_pydantic_include
+from dispatch.common.utils.views import (
+    ModelResponse,
+    create_export_response,
+    create_pagination_include,
+)
 from dispatch.database.core import get_db
-from dispatch.database.service import common_parameters, search_filter_sort_paginate
+from dispatch.database.service import (
+    common_parameters,
+    export_parameters,
+    get_loading_plan,
+    search_filter_sort_paginate,
+    search_filter_sort_stream,
+)
 from dispatch.incident.enums import IncidentStatus
 from dispatch.individual.models import IndividualContactRead
+from dispatch.job.service import run_in_background
 from dispatch.models import OrganizationSlug, PrimaryKey
 from dispatch.participant.models import ParticipantUpdate
 from dispatch.report import flows as report_flows
@@ -42,6 +52,7 @@ from .models import (
     IncidentExpandedPagination,
     IncidentPagination,
     IncidentRead,
+    IncidentReadMinimal,
     IncidentUpdate,
 )
 from .service import create, delete, get, update
@@ -70,24 +81,37 @@ def get_incidents(
     expand: bool = Query(default=False),
 ):
     """Retrieves a list of incidents."""
-    print(expand)
-    pagination = search_filter_sort_paginate(model="Incident", **common)
+    schema = IncidentRead if expand else IncidentReadMinimal
+    pagination = search_filter_sort_paginate(
+        model="Incident", loading_plan=get_loading_plan(Incident, schema), **common
+    )
 
     if expand:
-        return json.loads(IncidentExpandedPagination(**pagination).json())
+        return ModelResponse(IncidentExpandedPagination(**pagination))
 
     if include:
         # only allow two levels for now
-        include_sets = create_pydantic_include(include)
+        return ModelResponse(
+            IncidentPagination(**pagination), include=create_pagination_include(include)
+        )
+    return ModelResponse(IncidentPagination(**pagination))
 
-        include_fields = {
-            "items": {"__all__": include_sets},
-            "itemsPerPage": ...,
-            "page": ...,
-            "total": ...,
-        }
-        return json.loads(IncidentPagination(**pagination).json(include=include_fields))
-    return json.loads(IncidentPagination(**pagination).json())
+
+@router.get("/export", summary="Exports incidents as NDJSON or CSV.")
+def export_incidents(
+    *,
+    export: dict = Depends(export_parameters),
+    expand: bool = Query(default=False),
+):
+    """Streams all incidents matching the given search and filters."""
+    export_format = export.pop("export_format")
+    schema = IncidentRead if expand else IncidentReadMinimal
+    incidents = search_filter_sort_stream(
+        model="Incident", loading_plan=get_loading_plan(Incident, schema), **export
+    )
+    return create_export_response(
+        instances=incidents, schema=schema, export_format=export_format, filename="incidents"
+    )
 
 
 @router.get(
@@ -123,17 +147,19 @@ def create_incident(
     incident = create(db_session=db_session, incident_in=incident_in)
 
     if incident.status == IncidentStatus.stable:
-        background_tasks.add_task(
-            incident_create_stable_flow, incident_id=incident.id, organization_slug=organization
-        )
+        create_flow = incident_create_stable_flow
     elif incident.status == IncidentStatus.closed:
-        background_tasks.add_task(
-            incident_create_closed_flow, incident_id=incident.id, organization_slug=organization
-        )
+        create_flow = incident_create_closed_flow
     else:
-        background_tasks.add_task(
-            incident_create_flow, incident_id=incident.id, organization_slug=organization
-        )
+        create_flow = incident_create_flow
+
+    run_in_background(
+        create_flow,
+        background_tasks=background_tasks,
+        idempotency_key=f"incident-create-{incident.id}",
+        incident_id=incident.id,
+        organization_slug=organization,
+    )
 
     return incident
 
@@ -162,8 +188,9 @@ def update_incident(
     incident = update(db_session=db_session, incident=current_incident, incident_in=incident_in)
 
     # we run the incident update flow
-    background_tasks.add_task(
+    run_in_background(
         incident_update_flow,
+        background_tasks=background_tasks,
         user_email=current_user.email,
         commander_email=incident_in.commander.individual.email,
         reporter_email=incident_in.reporter.individual.email,
@@ -190,9 +217,11 @@ def join_incident(
     background_tasks: BackgroundTasks,
 ):
     """Adds an individual to an incident."""
-    background_tasks.add_task(
+    run_in_background(
         incident_add_or_reactivate_participant_flow,
         current_user.email,
+        background_tasks=background_tasks,
+        idempotency_key=f"incident-join-{current_incident.id}-{current_user.email}",
         incident_id=current_incident.id,
         organization_slug=organization,
     )
@@ -213,9 +242,11 @@ def subscribe_to_incident(
     background_tasks: BackgroundTasks,
 ):
     """Subscribes an individual to an incident."""
-    background_tasks.add_task(
+    run_in_background(
         incident_add_participant_to_tactical_group_flow,
         current_user.email,
+        background_tasks=background_tasks,
+        idempotency_key=f"incident-subscribe-{current_incident.id}-{current_user.email}",
         incident_id=current_incident.id,
         organization_slug=organization,
     )
@@ -237,8 +268,9 @@ def create_tactical_report(
     background_tasks: BackgroundTasks,
 ):
     """Creates a tactical report."""
-    background_tasks.add_task(
+    run_in_background(
         report_flows.create_tactical_report,
+        background_tasks=background_tasks,
         user_email=current_user.email,
         incident_id=current_incident.id,
         tactical_report_in=tactical_report_in,
@@ -262,8 +294,9 @@ def create_executive_report(
     background_tasks: BackgroundTasks,
 ):
     """Creates an executive report."""
-    background_tasks.add_task(
+    run_in_background(
         report_flows.create_executive_report,
+        background_tasks=background_tasks,
         user_email=current_user.email,
         incident_id=current_incident.id,
         executive_report_in=executive_report_in,
@@ -2,7 +2,7 @@ from typing import List, Optional
 from dispatch.models import PrimaryKey
 
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, ForeignKey, Integer, Numeric
+from sqlalchemy import Column, ForeignKey, Integer, Numeric, UniqueConstraint
 from sqlalchemy.ext.associationproxy import association_proxy
 
 from dispatch.database.core import Base
@@ -15,6 +15,8 @@ from dispatch.project.models import ProjectRead
 
 # SQLAlchemy Model
 class IncidentCost(Base, TimeStampMixin, ProjectMixin):
+    __table_args__ = (UniqueConstraint("incident_id", "incident_cost_type_id"),)
+
     # columns
     id = Column(Integer, primary_key=True)
     amount = Column(Numeric(precision=10, scale=2), nullable=True)
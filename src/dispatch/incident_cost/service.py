@@ -1,13 +1,20 @@
 import math
 from datetime import datetime
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload, selectinload
 
 from dispatch.database.core import SessionLocal
 from dispatch.incident import service as incident_service
 from dispatch.incident.enums import IncidentStatus
+from dispatch.incident.models import Incident
 from dispatch.incident_cost_type import service as incident_cost_type_service
-from dispatch.participant_role.models import ParticipantRoleType
+from dispatch.incident_cost_type.models import IncidentCostType
+from dispatch.participant.models import Participant
+from dispatch.participant_role.models import ParticipantRole, ParticipantRoleType
 
 from .models import IncidentCost, IncidentCostCreate, IncidentCostUpdate
 
@@ -43,6 +50,90 @@ def get_all(*, db_session) -> List[Optional[IncidentCost]]:
     return db_session.query(IncidentCost)
 
 
+def get_stale_response_costs(
+    *, db_session, project_id: int, incident_cost_type_id: int
+) -> List[Tuple[Incident, Optional[IncidentCost]]]:
+    """Gets the incidents whose response cost may have changed since it was calculated,
+    along with that cost.
+
+    The cost's updated_at is the time it was last calculated. Active incidents
+    are always returned, as their cost grows with time. Stable incidents are
+    returned if they became stable, were updated or had participant roles
+    assumed or renounced since. Closed incidents are only returned if their
+    cost wasn't calculated after they became stable.
+    """
+    roles_changed = (
+        exists()
+        .where(Participant.incident_id == Incident.id)
+        .where(ParticipantRole.participant_id == Participant.id)
+        .where(
+            or_(
+                ParticipantRole.assumed_at > IncidentCost.updated_at,
+                ParticipantRole.renounced_at > IncidentCost.updated_at,
+            )
+        )
+    )
+    return (
+        db_session.query(Incident, IncidentCost)
+        .outerjoin(
+            IncidentCost,
+            and_(
+                IncidentCost.incident_id == Incident.id,
+                IncidentCost.incident_cost_type_id == incident_cost_type_id,
+            ),
+        )
+        .filter(Incident.project_id == project_id)
+        .filter(
+            or_(
+                Incident.status == IncidentStatus.active,
+                IncidentCost.id.is_(None),
+                IncidentCost.updated_at <= Incident.stable_at,
+                and_(
+                    Incident.status == IncidentStatus.stable,
+                    or_(Incident.updated_at > IncidentCost.updated_at, roles_changed),
+                ),
+            )
+        )
+        .options(
+            joinedload(Incident.project),
+            selectinload(Incident.participants).selectinload(Participant.participant_roles),
+        )
+        .all()
+    )
+
+
+def upsert_amounts(
+    *,
+    db_session,
+    incident_cost_type: IncidentCostType,
+    amounts: Dict[int, float],
+    calculated_at: datetime,
+) -> None:
+    """Saves the amounts (by incident id) of an incident cost type in a single statement."""
+    if not amounts:
+        return
+
+    statement = insert(IncidentCost).values(
+        [
+            {
+                "incident_id": incident_id,
+                "incident_cost_type_id": incident_cost_type.id,
+                "project_id": incident_cost_type.project_id,
+                "amount": amount,
+                "created_at": calculated_at,
+                "updated_at": calculated_at,
+            }
+            for incident_id, amount in amounts.items()
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["incident_id", "incident_cost_type_id"],
+        set_={"amount": statement.excluded.amount, "updated_at": statement.excluded.updated_at},
+    )
+    db_session.execute(statement)
+    db_session.commit()
+
+
 def get_or_create(*, db_session, incident_cost_in: IncidentCostCreate) -> IncidentCost:
     """Gets or creates an incident cost."""
     if incident_cost_in.id:
@@ -109,7 +200,11 @@ def calculate_incident_response_cost(
 ):
     """Calculates the response cost of a given incident."""
     incident = incident_service.get(db_session=db_session, incident_id=incident_id)
+    return get_incident_response_cost(incident, incident_review=incident_review)
+
 
+def get_incident_response_cost(incident: Incident, incident_review=True):
+    """Calculates the response cost of a loaded incident, from its participants' roles."""
     participants_total_response_time_seconds = 0
 
     for participant in incident.participants:
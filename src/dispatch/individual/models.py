@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List, Optional
 from pydantic import Field
 
-from sqlalchemy import Column, ForeignKey, Integer, PrimaryKeyConstraint, String, Table
+from sqlalchemy import Column, ForeignKey, Index, Integer, PrimaryKeyConstraint, String, Table
 from sqlalchemy.sql.schema import UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy_utils import TSVectorType
@@ -25,7 +25,22 @@ assoc_individual_filters = Table(
 
 
 class IndividualContact(Base, ContactMixin, ProjectMixin):
-    __table_args__ = (UniqueConstraint("email", "project_id"),)
+    __table_args__ = (
+        UniqueConstraint("email", "project_id"),
+        # supports typeahead lookups
+        Index(
+            "individual_contact_name_trgm_idx",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "public.gin_trgm_ops"},
+        ),
+        Index(
+            "individual_contact_email_trgm_idx",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "public.gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String)
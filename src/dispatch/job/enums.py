@@ -0,0 +1,8 @@
+from dispatch.enums import DispatchEnum
+
+
+class JobStatus(DispatchEnum):
+    pending = "Pending"
+    running = "Running"
+    succeeded = "Succeeded"
+    failed = "Failed"
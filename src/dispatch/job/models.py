@@ -0,0 +1,36 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from dispatch.database.core import Base
+
+from .enums import JobStatus
+
+# jobs that are queued or running, their idempotency keys are unique
+IN_FLIGHT = text(f"status IN ('{JobStatus.pending}', '{JobStatus.running}')")
+
+
+class Job(Base):
+    """A background flow queued for a worker."""
+
+    __table_args__ = (
+        Index("ix_job_idempotency_key", "idempotency_key", unique=True, postgresql_where=IN_FLIGHT),
+        Index("ix_job_status_run_at", "status", "run_at"),
+        {"schema": "dispatch_core"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    # the flow to run, as module:qualname
+    name = Column(String, nullable=False)
+    organization_slug = Column(String, nullable=False)
+    arguments = Column(JSONB, nullable=False, default={})
+    idempotency_key = Column(String)
+    status = Column(String, nullable=False, default=JobStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    error = Column(String)
+    locked_by = Column(String)
+    locked_until = Column(DateTime)
+    # timed by the database clock, like the queries that claim jobs
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    run_at = Column(DateTime, nullable=False, server_default=func.now())
+    finished_at = Column(DateTime)
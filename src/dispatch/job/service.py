@@ -0,0 +1,239 @@
+import inspect
+from datetime import timedelta
+from typing import List, Optional
+
+from fastapi import BackgroundTasks
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import case, func, null, text
+from sqlalchemy.dialects.postgresql import insert
+
+from dispatch.config import JOB_QUEUE_ENABLED
+from dispatch.database.core import SessionLocal
+
+from .enums import JobStatus
+from .models import IN_FLIGHT, Job
+
+# claims the next job to run: a queued job that's due, or a running job whose worker stopped
+# renewing its lock. Organizations with the fewest running jobs go first, and organizations
+# already running `tenant_concurrency` jobs are skipped, so one can't starve the others.
+CLAIM_STATEMENT = text(
+    """
+    WITH running AS (
+        SELECT organization_slug, count(*) AS jobs
+        FROM dispatch_core.job
+        WHERE status = :running AND locked_until >= now()
+        GROUP BY organization_slug
+    ), next AS (
+        SELECT job.id
+        FROM dispatch_core.job AS job
+        LEFT JOIN running USING (organization_slug)
+        WHERE (
+            (job.status = :pending AND job.run_at <= now())
+            OR (job.status = :running AND job.locked_until < now())
+        )
+        AND job.attempts < job.max_attempts
+        AND coalesce(running.jobs, 0) < :tenant_concurrency
+        ORDER BY coalesce(running.jobs, 0), job.run_at, job.id
+        LIMIT 1
+        FOR UPDATE OF job SKIP LOCKED
+    )
+    UPDATE dispatch_core.job AS job
+    SET status = :running,
+        attempts = job.attempts + 1,
+        locked_by = :worker_id,
+        locked_until = now() + make_interval(secs => :ttl)
+    FROM next
+    WHERE job.id = next.id
+    RETURNING job.id
+    """
+)
+
+
+def get(*, db_session, job_id: int) -> Optional[Job]:
+    """Returns a job based on the given id."""
+    return db_session.query(Job).filter(Job.id == job_id).one_or_none()
+
+
+def get_job_name(func) -> str:
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def create(
+    *,
+    db_session,
+    name: str,
+    organization_slug: str,
+    arguments: dict,
+    idempotency_key: str = None,
+    max_attempts: int = 1,
+) -> Optional[Job]:
+    """Queues a job.
+
+    Idempotency keys are scoped to the organization. While a job with the same
+    key is queued or running, no job is queued and that job is returned instead.
+    """
+    if idempotency_key:
+        idempotency_key = f"{organization_slug}:{idempotency_key}"
+
+    statement = insert(Job).values(
+        name=name,
+        organization_slug=organization_slug,
+        arguments=arguments,
+        idempotency_key=idempotency_key,
+        status=JobStatus.pending,
+        attempts=0,
+        max_attempts=max_attempts,
+    )
+    if idempotency_key:
+        statement = statement.on_conflict_do_nothing(
+            index_elements=["idempotency_key"], index_where=IN_FLIGHT
+        )
+    job_id = db_session.execute(statement.returning(Job.id)).scalar()
+    db_session.commit()
+
+    if job_id is None:
+        return (
+            db_session.query(Job)
+            .filter(Job.idempotency_key == idempotency_key)
+            .filter(Job.status.in_([JobStatus.pending, JobStatus.running]))
+            .one_or_none()
+        )
+    return get(db_session=db_session, job_id=job_id)
+
+
+def enqueue(
+    *, db_session, func, args: tuple = (), kwargs: dict = None, idempotency_key: str = None
+) -> Optional[Job]:
+    """Queues a run of a background task, for the organization given by its `organization_slug`.
+
+    The job is attempted as many times as the task allows (see `background_task`).
+    """
+    arguments = inspect.signature(func).bind_partial(*args, **(kwargs or {})).arguments
+    return create(
+        db_session=db_session,
+        name=get_job_name(func),
+        organization_slug=arguments["organization_slug"],
+        arguments=jsonable_encoder(dict(arguments)),
+        idempotency_key=idempotency_key,
+        max_attempts=getattr(func, "__max_attempts__", 1),
+    )
+
+
+def run_in_background(
+    func,
+    *args,
+    background_tasks: BackgroundTasks,
+    idempotency_key: str = None,
+    **kwargs,
+):
+    """Runs a background task once the response is sent, or on a worker when the job queue
+    is enabled."""
+    if JOB_QUEUE_ENABLED:
+        # the job is queued in a session of its own, so the caller's session isn't committed
+        db_session = SessionLocal()
+        try:
+            enqueue(
+                db_session=db_session,
+                func=func,
+                args=args,
+                kwargs=kwargs,
+                idempotency_key=idempotency_key,
+            )
+        finally:
+            db_session.close()
+    else:
+        background_tasks.add_task(func, *args, **kwargs)
+
+
+def claim(*, db_session, worker_id: str, ttl: int, tenant_concurrency: int) -> Optional[Job]:
+    """Locks the next job to run for `ttl` seconds, returning it."""
+    job_id = db_session.execute(
+        CLAIM_STATEMENT,
+        {
+            "pending": JobStatus.pending.value,
+            "running": JobStatus.running.value,
+            "worker_id": worker_id,
+            "ttl": ttl,
+            "tenant_concurrency": tenant_concurrency,
+        },
+    ).scalar()
+    db_session.commit()
+
+    if job_id is not None:
+        return get(db_session=db_session, job_id=job_id)
+
+
+def renew(*, db_session, job_ids: List[int], worker_id: str, ttl: int) -> List[int]:
+    """Extends the locks of a worker's running jobs, returning the ids of those it still holds."""
+    if not job_ids:
+        return []
+
+    statement = (
+        Job.__table__.update()
+        .where(Job.id.in_(job_ids))
+        .where(Job.locked_by == worker_id)
+        .where(Job.status == JobStatus.running)
+        .values(locked_until=func.now() + timedelta(seconds=ttl))
+        .returning(Job.id)
+    )
+    renewed = [job_id for job_id, in db_session.execute(statement)]
+    db_session.commit()
+    return renewed
+
+
+def finish(
+    *, db_session, job_id: int, worker_id: str, error: str = None, retry_in: float = None
+) -> None:
+    """Marks a running job as succeeded, or failed with an error.
+
+    Failed jobs are queued again to run in `retry_in` seconds, if given and they have
+    attempts left (jobs out of attempts would never be claimed again, so they're failed).
+    """
+    values = {"locked_by": None, "locked_until": None}
+    if error is None:
+        values.update(status=JobStatus.succeeded, finished_at=func.now())
+    elif retry_in is not None:
+        retry = Job.attempts < Job.max_attempts
+        values.update(
+            status=case([(retry, JobStatus.pending.value)], else_=JobStatus.failed.value),
+            error=error,
+            run_at=func.now() + timedelta(seconds=retry_in),
+            finished_at=case([(retry, null())], else_=func.now()),
+        )
+    else:
+        values.update(status=JobStatus.failed, error=error, finished_at=func.now())
+
+    statement = (
+        Job.__table__.update()
+        .where(Job.id == job_id)
+        .where(Job.locked_by == worker_id)
+        .where(Job.status == JobStatus.running)
+        .values(**values)
+    )
+    db_session.execute(statement)
+    db_session.commit()
+
+
+def cleanup(*, db_session, retention_days: int) -> int:
+    """Fails the jobs that ran out of attempts while their worker was gone, and deletes the
+    jobs that finished more than `retention_days` ago. Returns how many jobs were deleted."""
+    db_session.execute(
+        Job.__table__.update()
+        .where(Job.status == JobStatus.running)
+        .where(Job.locked_until < func.now())
+        .where(Job.attempts >= Job.max_attempts)
+        .values(
+            status=JobStatus.failed,
+            error="The worker running the job stopped.",
+            finished_at=func.now(),
+            locked_by=None,
+            locked_until=None,
+        )
+    )
+    deleted = db_session.execute(
+        Job.__table__.delete()
+        .where(Job.status.in_([JobStatus.succeeded, JobStatus.failed]))
+        .where(Job.finished_at < func.now() - timedelta(days=retention_days))
+    ).rowcount
+    db_session.commit()
+    return deleted
@@ -0,0 +1,240 @@
+"""
+.. module: dispatch.job.worker
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+
+Runs the background flows queued in the job table (see `dispatch worker start`).
+
+Jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of
+workers can share the queue. A claimed job stays locked while its worker
+renews the lock; the jobs of a worker that died are retried once their lock
+expires. Failed jobs are retried with an exponential backoff, which means a
+flow may run more than once.
+"""
+import functools
+import importlib
+import inspect
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from pydantic import parse_obj_as
+
+from dispatch.config import (
+    JOB_QUEUE_CONCURRENCY,
+    JOB_QUEUE_LOCK_TTL,
+    JOB_QUEUE_POLL_INTERVAL,
+    JOB_QUEUE_RETENTION_DAYS,
+    JOB_QUEUE_RETRY_BACKOFF,
+    JOB_QUEUE_RETRY_BACKOFF_MAX,
+    JOB_QUEUE_TENANT_CONCURRENCY,
+)
+from dispatch.database.core import SessionLocal
+from dispatch.metrics import provider as metrics_provider
+
+from . import service as job_service
+from .models import Job
+
+log = logging.getLogger(__name__)
+
+# how often (in seconds) finished jobs are cleaned up
+CLEANUP_INTERVAL = 3600
+
+
+def resolve(name: str):
+    """Returns the background task a job runs."""
+    module, qualname = name.split(":", 1)
+    func = functools.reduce(getattr, qualname.split("."), importlib.import_module(module))
+    # only background tasks can be run, whatever was written to the queue
+    if not getattr(func, "__background_task__", False):
+        raise ValueError(f"{name} is not a background task.")
+    return func
+
+
+def get_arguments(func, arguments: dict) -> dict:
+    """Parses the JSON arguments of a job back into the types the task expects (e.g. models)."""
+    try:
+        hints = typing.get_type_hints(inspect.unwrap(func))
+    except Exception:
+        hints = {}
+
+    parsed = {}
+    for key, value in arguments.items():
+        parsed[key] = value
+        if key in hints and value is not None:
+            try:
+                parsed[key] = parse_obj_as(hints[key], value)
+            except Exception:
+                # e.g. arguments annotated with a type pydantic can't parse
+                log.debug(f"Unable to parse argument {key} as {hints[key]}, passing it as is.")
+    return parsed
+
+
+def get_backoff(attempts: int) -> float:
+    """Returns how long to wait before retrying a job that failed `attempts` times."""
+    backoff = min(JOB_QUEUE_RETRY_BACKOFF * 2 ** (attempts - 1), JOB_QUEUE_RETRY_BACKOFF_MAX)
+    # jitter, so that jobs that failed together aren't all retried at once
+    return backoff * random.uniform(0.5, 1)
+
+
+class Worker(object):
+    """Runs queued jobs on a pool of threads."""
+
+    def __init__(
+        self,
+        concurrency: int = JOB_QUEUE_CONCURRENCY,
+        tenant_concurrency: int = JOB_QUEUE_TENANT_CONCURRENCY,
+        lock_ttl: int = JOB_QUEUE_LOCK_TTL,
+        poll_interval: float = JOB_QUEUE_POLL_INTERVAL,
+    ):
+        self.concurrency = concurrency
+        self.tenant_concurrency = tenant_concurrency
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        # job id -> job, for the jobs in progress
+        self._jobs: Dict[int, Job] = {}
+        self._stopping = threading.Event()
+        # set when a job ends, so that its slot is filled right away
+        self._wakeup = threading.Event()
+        self._heartbeat_at = 0.0
+        self._cleanup_at = 0.0
+
+    def claim(self) -> typing.Optional[Job]:
+        db_session = SessionLocal()
+        try:
+            return job_service.claim(
+                db_session=db_session,
+                worker_id=self.worker_id,
+                ttl=self.lock_ttl,
+                tenant_concurrency=self.tenant_concurrency,
+            )
+        except Exception as e:
+            log.warning(f"Unable to claim a job. Error: {e}")
+        finally:
+            db_session.close()
+
+    def run(self, job: Job):
+        """Runs a claimed job, then marks it as succeeded, failed or to be retried."""
+        tags = {"job": job.name}
+        error = retry_in = None
+        start = time.perf_counter()
+        try:
+            func = resolve(job.name)
+            func.run(**get_arguments(func, job.arguments))
+        except Exception as e:
+            log.exception(f"Job {job.id} ({job.name}) failed, attempt {job.attempts}.")
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                retry_in = get_backoff(job.attempts)
+                metrics_provider.counter("job.retried", tags=tags)
+            else:
+                metrics_provider.counter("job.failed", tags=tags)
+        finally:
+            elapsed_time = time.perf_counter() - start
+            metrics_provider.timer("job.elapsed", value=elapsed_time, tags=tags)
+
+            db_session = SessionLocal()
+            try:
+                job_service.finish(
+                    db_session=db_session,
+                    job_id=job.id,
+                    worker_id=self.worker_id,
+                    error=error,
+                    retry_in=retry_in,
+                )
+            except Exception as e:
+                # the job runs again once its lock expires
+                log.warning(f"Unable to finish job {job.id}. Error: {e}")
+            finally:
+                db_session.close()
+
+            with self._lock:
+                del self._jobs[job.id]
+            self._wakeup.set()
+
+    def heartbeat(self):
+        """Renews the locks of the jobs in progress on this worker."""
+        self._heartbeat_at = time.monotonic()
+        with self._lock:
+            job_ids = list(self._jobs)
+        if not job_ids:
+            return
+
+        db_session = SessionLocal()
+        try:
+            renewed = job_service.renew(
+                db_session=db_session, job_ids=job_ids, worker_id=self.worker_id, ttl=self.lock_ttl
+            )
+        except Exception as e:
+            log.warning(f"Unable to renew the locks of {len(job_ids)} job(s). Error: {e}")
+            return
+        finally:
+            db_session.close()
+
+        with self._lock:
+            # jobs that ended in the meantime aren't renewed, they aren't lost
+            lost = [job_id for job_id in set(job_ids) - set(renewed) if job_id in self._jobs]
+        for job_id in lost:
+            log.error(f"Lost the lock of job {job_id}, another worker may run it too.")
+            metrics_provider.counter("job.lock.lost")
+
+    def cleanup(self):
+        self._cleanup_at = time.monotonic()
+        db_session = SessionLocal()
+        try:
+            deleted = job_service.cleanup(
+                db_session=db_session, retention_days=JOB_QUEUE_RETENTION_DAYS
+            )
+            log.debug(f"Deleted {deleted} finished job(s).")
+        except Exception as e:
+            log.warning(f"Unable to clean up finished jobs. Error: {e}")
+        finally:
+            db_session.close()
+
+    def stop(self, *args):
+        """Stops claiming jobs, the jobs in progress run to completion."""
+        log.info("Stopping worker, waiting for the jobs in progress...")
+        self._stopping.set()
+        self._wakeup.set()
+
+    def start(self):
+        """Runs queued jobs until stopped."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        log.info(f"Starting worker {self.worker_id} running {self.concurrency} job(s) at once.")
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="worker"
+        ) as executor:
+            while True:
+                with self._lock:
+                    running = len(self._jobs)
+                if self._stopping.is_set() and not running:
+                    break
+
+                now = time.monotonic()
+                if now - self._heartbeat_at >= self.lock_ttl / 3:
+                    self.heartbeat()
+                if now - self._cleanup_at >= CLEANUP_INTERVAL:
+                    self.cleanup()
+
+                if not self._stopping.is_set() and running < self.concurrency:
+                    job = self.claim()
+                    if job is not None:
+                        with self._lock:
+                            self._jobs[job.id] = job
+                        executor.submit(self.run, job)
+                        continue
+
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, String
+
+from dispatch.database.core import Base
+
+
+class SchedulerLease(Base):
+    """Which scheduler replica owns a run of a scheduled task, and until when."""
+
+    __table_args__ = {"schema": "dispatch_core"}
+
+    # e.g. calculate-incidents-response-cost:default:1
+    key = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    acquired_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
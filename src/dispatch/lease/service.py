@@ -0,0 +1,71 @@
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from .models import SchedulerLease
+
+
+def get(*, db_session, key: str) -> Optional[SchedulerLease]:
+    """Returns a lease based on the given key."""
+    return db_session.query(SchedulerLease).filter(SchedulerLease.key == key).one_or_none()
+
+
+def acquire(*, db_session, key: str, owner: str, ttl: int) -> bool:
+    """Takes the lease of a key for `ttl` seconds, if it's free or has expired.
+
+    A lease that hasn't expired can't be taken again, not even by its owner.
+    Leases are timed by the database clock, so replicas don't need to agree on
+    the time. Returns whether the lease was acquired.
+    """
+    now = func.now()
+    statement = insert(SchedulerLease).values(
+        key=key, owner=owner, acquired_at=now, expires_at=now + timedelta(seconds=ttl)
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["key"],
+        set_={
+            "owner": statement.excluded.owner,
+            "acquired_at": statement.excluded.acquired_at,
+            "expires_at": statement.excluded.expires_at,
+        },
+        where=SchedulerLease.expires_at < now,
+    ).returning(SchedulerLease.key)
+
+    acquired = db_session.execute(statement).first() is not None
+    db_session.commit()
+    return acquired
+
+
+def renew(*, db_session, keys: List[str], owner: str, ttl: int) -> List[str]:
+    """Extends the leases of an owner by `ttl` seconds, returning the keys it still owns."""
+    if not keys:
+        return []
+
+    statement = (
+        SchedulerLease.__table__.update()
+        .where(SchedulerLease.key.in_(keys))
+        .where(SchedulerLease.owner == owner)
+        .values(expires_at=func.now() + timedelta(seconds=ttl))
+        .returning(SchedulerLease.key)
+    )
+    renewed = [key for key, in db_session.execute(statement)]
+    db_session.commit()
+    return renewed
+
+
+def release(*, db_session, key: str, owner: str, hold_for: float = 0) -> None:
+    """Releases the lease of an owner, or holds it until `hold_for` seconds after acquiring it."""
+    statement = (
+        SchedulerLease.__table__.update()
+        .where(SchedulerLease.key == key)
+        .where(SchedulerLease.owner == owner)
+        .values(
+            expires_at=func.greatest(
+                func.now(), SchedulerLease.acquired_at + timedelta(seconds=hold_for)
+            )
+        )
+    )
+    db_session.execute(statement)
+    db_session.commit()
@@ -2,7 +2,8 @@ import time
 import logging
 from os import path
 from uuid import uuid1
-from typing import Optional, Final
+from itertools import chain
+from typing import Final, Optional, Tuple
 from contextvars import ContextVar
 
 from fastapi import FastAPI, status
@@ -10,7 +11,6 @@ from fastapi.responses import JSONResponse
 from pydantic.error_wrappers import ValidationError
 
 from sentry_asgi import SentryMiddleware
-from sqlalchemy import inspect
 from sqlalchemy.orm import scoped_session
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
@@ -22,9 +22,13 @@ from starlette.staticfiles import StaticFiles
 from .api import api_router
 from .common.utils.cli import install_plugins, install_plugin_events
 from .config import (
+    DATABASE_INSTRUMENTATION_SERVER_TIMING,
+    METRIC_PROVIDERS,
     STATIC_DIR,
 )
-from .database.core import engine, sessionmaker
+from .database.core import SessionLocal
+from .database.instrumentation import get_server_timing, instrument
+from .database.tenant import get_schema_name, tenant_registry
 from .extensions import configure_extensions
 from .logging import configure_logging
 from .metrics import provider as metric_provider
@@ -74,18 +78,89 @@ api = FastAPI(
 )
 
 
-def get_path_params_from_request(request: Request) -> str:
-    path_params = {}
-    for r in api_router.routes:
-        path_regex, path_format, param_converters = compile_path(r.path)
+class RouteMatcher(object):
+    """Matches request paths against a route table compiled once.
+
+    Routes are indexed in a segment trie so that only the handful of routes
+    sharing a path's shape have their regular expressions evaluated.
+    """
+
+    def __init__(self, routes):
+        self._root = self._node()
+        # routes with `path` converters can span segments and are matched linearly
+        self._catch_all = []
+        for route in routes:
+            self.add(route.path)
+
+    @staticmethod
+    def _node() -> dict:
+        return {"static": {}, "param": None, "routes": []}
+
+    def add(self, path: str):
+        """Compiles and indexes a route template."""
+        path_regex, _, _ = compile_path(path)
+        compiled = (path, path_regex)
+
+        if ":path}" in path:
+            self._catch_all.append(compiled)
+            return
+
+        node = self._root
+        for segment in path.split("/")[1:]:
+            if "{" in segment:
+                if node["param"] is None:
+                    node["param"] = self._node()
+                node = node["param"]
+            else:
+                node = node["static"].setdefault(segment, self._node())
+        node["routes"].append(compiled)
+
+    def _candidates(self, node, segments):
+        if not segments:
+            yield from node["routes"]
+            return
+
+        segment, rest = segments[0], segments[1:]
+        static = node["static"].get(segment)
+        if static is not None:
+            yield from self._candidates(static, rest)
+        if node["param"] is not None and segment:
+            yield from self._candidates(node["param"], rest)
+
+    def match(self, path: str) -> Tuple[Optional[str], dict]:
+        """Returns the route template and path params matching a given path."""
+        segments = path.split("/")[1:]
+        for template, path_regex in chain(self._candidates(self._root, segments), self._catch_all):
+            match = path_regex.match(path)
+            if match:
+                return template, match.groupdict()
+        return None, {}
+
+
+route_matcher: Optional[RouteMatcher] = None
+
+
+def match_request_route(request: Request) -> Tuple[Optional[str], dict]:
+    """Returns the route template and path params of a request.
+
+    The route is matched once, the middlewares share the match through the request state.
+    """
+    if not hasattr(request.state, "path_params"):
         path = request["path"].removeprefix("/api/v1")  # remove the /api/v1 for matching
-        match = path_regex.match(path)
-        if match:
-            path_params = match.groupdict()
+        request.state.path_template, request.state.path_params = route_matcher.match(path)
+    return request.state.path_template, request.state.path_params
+
+
+def get_path_params_from_request(request: Request) -> dict:
+    _, path_params = match_request_route(request)
     return path_params
 
 
 def get_path_template(request: Request) -> str:
+    template, _ = match_request_route(request)
+    if template:
+        return ".".join(template.split("/")[1:])
+
     if hasattr(request, "path"):
         return ",".join(request.path.split("/")[1:])
     return ".".join(request.url.path.split("/")[1:])
@@ -106,23 +181,16 @@ async def db_session_middleware(request: Request, call_next):
     # we create a per-request id such that we can ensure that our session is scoped for a particular request.
     # see: https://github.com/tiangolo/fastapi/issues/726
     ctx_token = _request_id_ctx_var.set(request_id)
-    path_params = get_path_params_from_request(request)
+    path_template, path_params = match_request_route(request)
 
     # if this call is organization specific set the correct search path
     organization_slug = path_params.get("organization")
     if organization_slug:
         request.state.organization = organization_slug
-        schema = f"dispatch_organization_{organization_slug}"
         # validate slug exists
-        schema_names = inspect(engine).get_schema_names()
-        if schema in schema_names:
-            # add correct schema mapping depending on the request
-            schema_engine = engine.execution_options(
-                schema_translate_map={
-                    None: schema,
-                }
-            )
-        else:
+        tenant = tenant_registry.get(organization_slug)
+        if not tenant:
+            schema = get_schema_name(organization_slug)
             return JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content={"detail": [{"msg": f"Unknown database schema name: {schema}"}]},
@@ -131,15 +199,16 @@ async def db_session_middleware(request: Request, call_next):
         # add correct schema mapping depending on the request
         # can we set some default here?
         request.state.organization = "default"
-        schema_engine = engine.execution_options(
-            schema_translate_map={
-                None: "dispatch_organization_default",
-            }
-        )
+        tenant = tenant_registry.get("default") or tenant_registry.build("default")
     try:
-        session = scoped_session(sessionmaker(bind=schema_engine), scopefunc=get_request_id)
+        session = scoped_session(tenant.session_factory, scopefunc=get_request_id)
         request.state.db = session()
-        response = await call_next(request)
+        name = f"{request.method} {path_template or request.url.path}"
+        with instrument("request", name) as query_stats:
+            response = await call_next(request)
+
+        if query_stats and DATABASE_INSTRUMENTATION_SERVER_TIMING:
+            response.headers.append("Server-Timing", get_server_timing(query_stats))
     except Exception as e:
         raise e from None
     finally:
@@ -149,6 +218,15 @@ async def db_session_middleware(request: Request, call_next):
     return response
 
 
+@app.on_event("startup")
+def warm_tenant_registry():
+    db_session = SessionLocal()
+    try:
+        tenant_registry.warm(db_session)
+    finally:
+        db_session.close()
+
+
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
     response = await call_next(request)
@@ -215,6 +293,15 @@ install_plugin_events(api_router)
 # we add all API routes to the Web API framework
 api.include_router(api_router)
 
+# we compile the route table once so requests don't have to
+route_matcher = RouteMatcher(api_router.routes)
+
+# we expose the metrics kept by the prometheus metric provider to scrapers
+if "prometheus-metric" in METRIC_PROVIDERS:
+    from .plugins.dispatch_prometheus.plugin import metrics
+
+    app.add_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+
 # we mount the frontend and app
 if STATIC_DIR and path.isdir(STATIC_DIR):
     frontend.mount("/", StaticFiles(directory=STATIC_DIR), name="app")
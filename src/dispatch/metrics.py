@@ -1,16 +1,78 @@
+"""
+.. module: dispatch.metrics
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+
+Metrics are aggregated in memory (counters are summed, gauges keep their last
+value and timers become histograms) and pushed to the metric provider plugins
+in batches by a background thread, so recording a metric never waits on a
+metrics backend. When the buffer is full, new series are dropped.
+"""
+import atexit
+import bisect
 import logging
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from dispatch.plugins.base import plugins
 
-from .config import METRIC_PROVIDERS
+from .config import METRIC_BUFFER_SIZE, METRIC_FLUSH_INTERVAL, METRIC_PROVIDERS
 
 log = logging.getLogger(__file__)
 
+# upper bounds (in seconds) of the timer histogram buckets
+TIMER_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class Histogram(object):
+    """Aggregates the values of a timer."""
+
+    __slots__ = ("buckets", "counts", "sums", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: Tuple[float] = TIMER_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sums = [0.0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        self.counts[index] += 1
+        self.sums[index] += value
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class Metric(NamedTuple):
+    type: str
+    name: str
+    value: object
+    tags: Optional[dict]
+
+
+def get_series_key(metric_type: str, name: str, tags: Optional[dict]) -> tuple:
+    if not tags:
+        return (metric_type, name, ())
+    return (metric_type, name, tuple(sorted((k, str(v)) for k, v in tags.items())))
+
 
 class Metrics(object):
     _providers = []
 
-    def __init__(self):
+    def __init__(
+        self, flush_interval: float = METRIC_FLUSH_INTERVAL, max_series: int = METRIC_BUFFER_SIZE
+    ):
         if not METRIC_PROVIDERS:
             log.info(
                 "No metric providers defined via METRIC_PROVIDERS env var. Metrics will not be sent."
@@ -18,29 +80,113 @@ class Metrics(object):
         else:
             self._providers = METRIC_PROVIDERS
 
+        self.flush_interval = flush_interval
+        self.max_series = max_series
+        self.dropped = 0
+
+        self._plugins = None
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher = None
+        self._pid = None
+
+    def get_plugins(self) -> list:
+        """Resolves the provider plugins once, they are registered after this module is imported."""
+        if self._plugins is None:
+            self._plugins = [plugins.get(provider) for provider in self._providers]
+        return self._plugins
+
+    def start(self):
+        """Starts the background flusher of the current process."""
+        self._pid = os.getpid()
+        self._stopped.clear()
+        self._flusher = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stops the background flusher, flushing what's left in the buffer."""
+        self._stopped.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def _record(self, metric_type: str, name: str, value, tags: Optional[dict]):
+        if not self._providers:
+            return
+
+        if self._pid != os.getpid():
+            # first metric of this process (or of a forked worker)
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._series = {}
+                    self.start()
+
+        key = get_series_key(metric_type, name, tags)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                if len(self._series) >= self.max_series:
+                    self.dropped += 1
+                    return
+                series = self._series[key] = [
+                    Histogram() if metric_type == "timer" else 0,
+                    dict(tags) if tags else tags,
+                ]
+
+            if metric_type == "counter":
+                series[0] += value
+            elif metric_type == "gauge":
+                series[0] = value
+            else:
+                series[0].observe(value)
+
+    def collect(self) -> List[Metric]:
+        """Swaps the buffer for an empty one, returning the aggregated metrics."""
+        with self._lock:
+            series, self._series = self._series, {}
+            dropped, self.dropped = self.dropped, 0
+
+        if dropped:
+            log.warning(f"Metrics buffer full, dropped {dropped} metric(s).")
+
+        return [
+            Metric(type=metric_type, name=name, value=value, tags=tags)
+            for (metric_type, name, _), (value, tags) in series.items()
+        ]
+
+    def flush(self):
+        """Sends the aggregated metrics to every provider."""
+        with self._flush_lock:
+            metrics = self.collect()
+            if not metrics:
+                return
+
+            try:
+                providers = self.get_plugins()
+            except KeyError as e:
+                log.warning(f"Unable to find metric provider {e}. Metrics dropped.")
+                return
+
+            for plugin in providers:
+                log.debug(f"Sending {len(metrics)} metric(s) to provider {plugin.slug}.")
+                try:
+                    plugin.flush(metrics)
+                except Exception as e:
+                    log.warning(f"Unable to send metrics to provider {plugin.slug}. Error: {e}")
+
     def gauge(self, name, value, tags=None):
-        for provider in self._providers:
-            log.debug(
-                f"Sending gauge metric {name} to provider {provider}. Value: {value} Tags: {tags}"
-            )
-            p = plugins.get(provider)
-            p.gauge(name, value, tags=tags)
+        self._record("gauge", name, value, tags)
 
     def counter(self, name, value=None, tags=None):
-        for provider in self._providers:
-            log.debug(
-                f"Sending counter metric {name} to provider {provider}. Value: {value} Tags: {tags}"
-            )
-            p = plugins.get(provider)
-            p.counter(name, value=value, tags=tags)
+        self._record("counter", name, 1 if value is None else value, tags)
 
     def timer(self, name, value, tags=None):
-        for provider in self._providers:
-            log.debug(
-                f"Sending timer metric {name} to provider {provider}. Value: {value} Tags: {tags}"
-            )
-            p = plugins.get(provider)
-            p.timer(name, value, tags=tags)
+        self._record("timer", name, value, tags)
 
 
 provider = Metrics()
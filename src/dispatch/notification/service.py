@@ -140,14 +140,16 @@ def filter_and_send(
 ):
     """Sends notifications."""
     notifications = get_all_enabled(db_session=db_session, project_id=project_id)
+
+    # notifications may share filters, we evaluate each distinct filter once
+    matches = search_filter_service.match_many(
+        db_session=db_session,
+        search_filters=[f for n in notifications for f in n.filters],
+        class_instances=[class_instance],
+    )
     for notification in notifications:
         for search_filter in notification.filters:
-            match = search_filter_service.match(
-                db_session=db_session,
-                filter_spec=search_filter.expression,
-                class_instance=class_instance,
-            )
-            if match:
+            if class_instance.id in matches[search_filter.id]:
                 send(
                     db_session=db_session,
                     project_id=project_id,
@@ -6,6 +6,7 @@ from sqlalchemy.sql.expression import true
 from dispatch.auth.models import DispatchUser, DispatchUserOrganization
 from dispatch.database.core import engine
 from dispatch.database.manage import init_schema
+from dispatch.database.tenant import tenant_registry
 from dispatch.enums import UserRoles
 from dispatch.exceptions import NotFoundError
 
@@ -109,6 +110,9 @@ def create(*, db_session, organization_in: OrganizationCreate) -> Organization:
 
     # we let the new schema session create the organization
     organization = init_schema(engine=engine, organization=organization)
+
+    # we make the new schema available to the request middleware
+    tenant_registry.register(organization.slug)
     return organization
 
 
@@ -150,6 +154,7 @@ def delete(*, db_session, organization_id: int):
     organization = db_session.query(Organization).filter(Organization.id == organization_id).first()
     db_session.delete(organization)
     db_session.commit()
+    tenant_registry.unregister(organization.slug)
 
 
 def add_user(
@@ -2,7 +2,7 @@ from typing import Optional, List
 from pydantic import Field
 
 from sqlalchemy.orm import relationship, backref
-from sqlalchemy import Column, Boolean, String, Integer, ForeignKey, select
+from sqlalchemy import Column, Boolean, String, Integer, ForeignKey, Index, select
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from dispatch.database.core import Base
@@ -18,6 +18,20 @@ from dispatch.individual.models import IndividualContactRead, IndividualContactR
 
 
 class Participant(Base):
+    __table_args__ = (
+        # supports the participant visibility checks on incidents and cases
+        Index(
+            "participant_incident_id_individual_contact_id_idx",
+            "incident_id",
+            "individual_contact_id",
+        ),
+        Index(
+            "participant_case_id_individual_contact_id_idx",
+            "case_id",
+            "individual_contact_id",
+        ),
+    )
+
     # columns
     id = Column(Integer, primary_key=True)
     team = Column(String)
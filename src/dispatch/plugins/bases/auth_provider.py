@@ -5,6 +5,8 @@
     :license: Apache, see LICENSE for more details.
 .. moduleauthor:: Kevin Glisson <kglisson@netflix.com>
 """
+from typing import Optional
+
 from dispatch.plugins.base import Plugin
 from starlette.requests import Request
 
@@ -14,3 +16,14 @@ class AuthenticationProviderPlugin(Plugin):
 
     def get_current_user(self, request: Request, **kwargs):
         raise NotImplementedError
+
+    def get_credential(self, request: Request) -> Optional[str]:
+        """Returns the credential the provider authenticates a request with.
+
+        Resolved users are cached by credential, providers that don't return one aren't cached.
+        """
+        return None
+
+    def get_credential_expiration(self, credential: str) -> Optional[float]:
+        """Returns when (as a unix timestamp) a credential expires, if it does."""
+        return None
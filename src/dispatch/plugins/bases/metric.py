@@ -19,3 +19,17 @@ class MetricPlugin(Plugin):
 
     def timer(self, name, value, tags=None):
         raise NotImplementedError
+
+    def histogram(self, name, histogram, tags=None):
+        """Sends an aggregated timer, plugins that support distributions should override this."""
+        self.timer(name, histogram.mean, tags=tags)
+
+    def flush(self, metrics):
+        """Sends a batch of aggregated metrics, plugins can override this to send it at once."""
+        for metric in metrics:
+            if metric.type == "counter":
+                self.counter(metric.name, value=metric.value, tags=metric.tags)
+            elif metric.type == "gauge":
+                self.gauge(metric.name, metric.value, tags=metric.tags)
+            elif metric.type == "timer":
+                self.histogram(metric.name, metric.value, tags=metric.tags)
@@ -0,0 +1,148 @@
+"""
+.. module: dispatch.plugins.dispatch_core.jwks
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Optional
+
+import requests
+from cachetools import TLRUCache
+
+
+log = logging.getLogger(__name__)
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def get_max_age(headers) -> Optional[int]:
+    """Returns the max-age (in seconds) advertised by a response's Cache-Control header."""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+
+    match = MAX_AGE_RE.search(cache_control)
+    if match:
+        return int(match.group(1))
+
+
+class JWKSCache(object):
+    """Caches the keys of a JSON Web Key Set by `kid`.
+
+    Keys are served from memory while fresh. Stale keys keep being served
+    while a background refresh runs, and a synchronous (single-flight)
+    refetch only happens when an unknown `kid` shows up. If the key set
+    can't be fetched, the last known keys are kept.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        default_ttl: int = 300,
+        min_refresh_interval: int = 30,
+        timeout: int = 5,
+    ):
+        self.url = url
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._keys = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def fetch(self) -> None:
+        """Fetches the key set and updates the cache."""
+        fetched_at = time.monotonic()
+        try:
+            response = requests.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json()["keys"]}
+        except Exception as e:
+            log.warning(f"Unable to fetch JWKS from {self.url}. Keeping cached keys. Error: {e}")
+            self._fetched_at = fetched_at
+            self._expires_at = fetched_at + self.min_refresh_interval
+            return
+
+        max_age = get_max_age(response.headers)
+        ttl = self.default_ttl if max_age is None else max_age
+        # no-cache (or a short max-age) would have every request refresh the key set
+        ttl = max(ttl, self.min_refresh_interval)
+
+        self._keys = keys
+        self._fetched_at = fetched_at
+        self._expires_at = fetched_at + ttl
+
+    def _refresh_in_background(self) -> None:
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with self._lock:
+                    self.fetch()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def get_key(self, kid: str) -> Optional[dict]:
+        """Returns the key for a given `kid`, refetching the key set if needed."""
+        key = self._keys.get(kid)
+        if key:
+            if time.monotonic() >= self._expires_at:
+                self._refresh_in_background()
+            return key
+
+        # unknown kid, the key set may have been rotated
+        with self._lock:
+            key = self._keys.get(kid)
+            if key:
+                return key
+
+            # we don't let unknown kids hammer the identity provider
+            if self._fetched_at and (
+                time.monotonic() - self._fetched_at < self.min_refresh_interval
+            ):
+                return
+
+            self.fetch()
+            return self._keys.get(kid)
+
+
+def get_token_digest(token: str) -> str:
+    """Returns a digest suitable for keying a token cache."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_token_expiration(key, value, now) -> float:
+    """Cached verification results expire with their token."""
+    return value.get("exp", now)
+
+
+class TokenCache(TLRUCache):
+    """Caches verified token claims until the token expires."""
+
+    def __init__(self, maxsize: int = 1024):
+        super().__init__(maxsize=maxsize, ttu=get_token_expiration, timer=time.time)
+        self._lock = threading.Lock()
+
+    def get_claims(self, token: str) -> Optional[dict]:
+        with self._lock:
+            return self.get(get_token_digest(token))
+
+    def set_claims(self, token: str, claims: dict) -> None:
+        if not claims.get("exp"):
+            return
+        with self._lock:
+            self[get_token_digest(token)] = claims
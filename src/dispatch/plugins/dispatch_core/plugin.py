@@ -7,8 +7,8 @@
 import base64
 import json
 import logging
+from typing import Optional
 
-import requests
 from fastapi import HTTPException
 from fastapi.security.utils import get_authorization_scheme_param
 
@@ -32,6 +32,8 @@ from dispatch.service.models import Service, ServiceRead
 from dispatch.team import service as team_service
 from dispatch.team.models import TeamContact, TeamContactRead
 
+from .jwks import JWKSCache, TokenCache
+
 from dispatch.plugins.bases import (
     ParticipantPlugin,
     DocumentResolverPlugin,
@@ -42,6 +44,7 @@ from dispatch.plugins.bases import (
 
 from dispatch.config import (
     DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS,
+    DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS_TTL,
     DISPATCH_AUTHENTICATION_PROVIDER_HEADER_NAME,
     DISPATCH_PKCE_DONT_VERIFY_AT_HASH,
     DISPATCH_JWT_SECRET,
@@ -52,6 +55,21 @@ from dispatch.config import (
 
 log = logging.getLogger(__name__)
 
+jwks_cache = JWKSCache(
+    DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS,
+    default_ttl=DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS_TTL,
+)
+token_cache = TokenCache()
+
+
+def get_bearer_expiration(authorization: str) -> Optional[float]:
+    """Returns the expiration of a bearer token, read from its (already verified) claims."""
+    _, token = get_authorization_scheme_param(authorization)
+    try:
+        return jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+
 
 class BasicAuthProviderPlugin(AuthenticationProviderPlugin):
     title = "Dispatch Plugin - Basic Authentication Provider"
@@ -79,6 +97,12 @@ class BasicAuthProviderPlugin(AuthenticationProviderPlugin):
             raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail=[{"msg": str(e)}])
         return data["email"]
 
+    def get_credential(self, request: Request) -> Optional[str]:
+        return request.headers.get("Authorization")
+
+    def get_credential_expiration(self, credential: str) -> Optional[float]:
+        return get_bearer_expiration(credential)
+
 
 class PKCEAuthProviderPlugin(AuthenticationProviderPlugin):
     title = "Dispatch Plugin - PKCE Authentication Provider"
@@ -103,27 +127,33 @@ class PKCEAuthProviderPlugin(AuthenticationProviderPlugin):
 
         token = authorization.split()[1]
 
-        # Parse out the Key information. Add padding just in case
-        key_info = json.loads(base64.b64decode(token.split(".")[0] + "=========").decode("utf-8"))
+        data = token_cache.get_claims(token)
+        if not data:
+            # Parse out the Key information. Add padding just in case
+            key_info = json.loads(
+                base64.b64decode(token.split(".")[0] + "=========").decode("utf-8")
+            )
 
-        # Grab all possible keys to account for key rotation and find the right key
-        keys = requests.get(DISPATCH_AUTHENTICATION_PROVIDER_PKCE_JWKS).json()["keys"]
-        for potential_key in keys:
-            if potential_key["kid"] == key_info["kid"]:
-                key = potential_key
+            # Keys are cached by kid, the key set is refetched on rotation
+            key = jwks_cache.get_key(key_info.get("kid"))
+            if not key:
+                log.debug(f"No JWKS key found for kid {key_info.get('kid')}")
+                raise credentials_exception
+
+            try:
+                jwt_opts = {}
+                if DISPATCH_PKCE_DONT_VERIFY_AT_HASH:
+                    jwt_opts = {"verify_at_hash": False}
+                # If DISPATCH_JWT_AUDIENCE is defined, the we must include audience in the decode
+                if DISPATCH_JWT_AUDIENCE:
+                    data = jwt.decode(token, key, audience=DISPATCH_JWT_AUDIENCE, options=jwt_opts)
+                else:
+                    data = jwt.decode(token, key, options=jwt_opts)
+            except JWTError as err:
+                log.debug("JWT Decode error: {}".format(err))
+                raise credentials_exception
 
-        try:
-            jwt_opts = {}
-            if DISPATCH_PKCE_DONT_VERIFY_AT_HASH:
-                jwt_opts = {"verify_at_hash": False}
-            # If DISPATCH_JWT_AUDIENCE is defined, the we must include audience in the decode
-            if DISPATCH_JWT_AUDIENCE:
-                data = jwt.decode(token, key, audience=DISPATCH_JWT_AUDIENCE, options=jwt_opts)
-            else:
-                data = jwt.decode(token, key, options=jwt_opts)
-        except JWTError as err:
-            log.debug("JWT Decode error: {}".format(err))
-            raise credentials_exception
+            token_cache.set_claims(token, data)
 
         # Support overriding where email is returned in the id token
         if DISPATCH_JWT_EMAIL_OVERRIDE:
@@ -131,6 +161,12 @@ class PKCEAuthProviderPlugin(AuthenticationProviderPlugin):
         else:
             return data["email"]
 
+    def get_credential(self, request: Request) -> Optional[str]:
+        return request.headers.get("Authorization")
+
+    def get_credential_expiration(self, credential: str) -> Optional[float]:
+        return get_bearer_expiration(credential)
+
 
 class HeaderAuthProviderPlugin(AuthenticationProviderPlugin):
     title = "Dispatch Plugin - HTTP Header Authentication Provider"
@@ -150,6 +186,9 @@ class HeaderAuthProviderPlugin(AuthenticationProviderPlugin):
             raise HTTPException(status_code=HTTP_401_UNAUTHORIZED)
         return value
 
+    def get_credential(self, request: Request) -> Optional[str]:
+        return request.headers.get(DISPATCH_AUTHENTICATION_PROVIDER_HEADER_NAME)
+
 
 class DispatchTicketPlugin(TicketPlugin):
     title = "Dispatch Plugin - Ticket Management"
@@ -257,8 +296,13 @@ class DispatchDocumentResolverPlugin(DocumentResolverPlugin):
         db_session=None,
     ):
         """Fetches documents from Dispatch."""
+        # suggested documents are resolved every time a participant joins,
+        # so we don't record these recommendations
         recommendation = route_service.get(
-            db_session=db_session, incident=incident, models=[(Document, DocumentRead)]
+            db_session=db_session,
+            incident=incident,
+            models=[(Document, DocumentRead)],
+            persist=False,
         )
         return recommendation.matches
 
@@ -0,0 +1,118 @@
+"""
+.. module: dispatch.plugins.dispatch_prometheus.plugin
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+
+Keeps Dispatch's metrics in process and serves them at `/metrics` in the
+Prometheus text format.
+
+When running several workers, set `PROMETHEUS_MULTIPROC_DIR` to a directory
+shared by them (and emptied before they start), so that the metrics of every
+worker are aggregated when scraped.
+"""
+import logging
+import os
+import re
+import threading
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+
+from dispatch.metrics import TIMER_BUCKETS
+from dispatch.plugins import dispatch_prometheus as prometheus_plugin
+from dispatch.plugins.bases.metric import MetricPlugin
+
+
+log = logging.getLogger(__name__)
+
+METRIC_PREFIX = "dispatch"
+INVALID_NAME_CHARACTERS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def get_metric_name(name: str) -> str:
+    """Translates a Dispatch metric name (e.g. server.call.elapsed) into a Prometheus one."""
+    return f"{METRIC_PREFIX}_{INVALID_NAME_CHARACTERS.sub('_', name)}"
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def get_registry() -> CollectorRegistry:
+    """Returns the registry to expose, aggregating every worker's metrics if needed."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics(request: Request) -> Response:
+    """Serves the metrics in the Prometheus text format."""
+    return Response(generate_latest(get_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+class PrometheusMetricPlugin(MetricPlugin):
+    title = "Prometheus Plugin - Metric Provider"
+    slug = "prometheus-metric"
+    description = "Keeps metrics in process and exposes them to Prometheus at /metrics."
+    version = prometheus_plugin.__version__
+
+    author = "Netflix"
+    author_url = "https://github.com/netflix/dispatch.git"
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def get_metric(self, metric_class, name: str, tags: dict = None, **kwargs):
+        """Returns the (labeled) metric for a given name, registering it on first use.
+
+        Prometheus requires a fixed set of labels per metric, so the tags of the
+        first use define them: missing tags are left empty and new ones are ignored.
+        """
+        tags = tags or {}
+        with self._lock:
+            if name not in self._metrics:
+                labelnames = tuple(sorted(tags))
+                metric = metric_class(
+                    get_metric_name(name),
+                    f"Dispatch {name} metric.",
+                    labelnames=labelnames,
+                    **kwargs,
+                )
+                self._metrics[name] = (metric, labelnames)
+            metric, labelnames = self._metrics[name]
+
+        if not labelnames:
+            return metric
+        return metric.labels(**{label: str(tags.get(label, "")) for label in labelnames})
+
+    def gauge(self, name, value, tags=None):
+        self.get_metric(Gauge, name, tags, multiprocess_mode="livesum").set(value)
+
+    def counter(self, name, value=None, tags=None):
+        self.get_metric(Counter, name, tags).inc(1 if value is None else value)
+
+    def timer(self, name, value, tags=None):
+        self.get_metric(Histogram, name, tags, buckets=TIMER_BUCKETS).observe(value)
+
+    def histogram(self, name, histogram, tags=None):
+        metric = self.get_metric(Histogram, name, tags, buckets=histogram.buckets)
+
+        # the client has no bulk observe, so the values of each bucket are observed
+        # again at their mean, which keeps both the bucket counts and the sum
+        for bound, count, total in zip(histogram.buckets, histogram.counts, histogram.sums):
+            for _ in range(count):
+                metric.observe(min(total / count, bound))
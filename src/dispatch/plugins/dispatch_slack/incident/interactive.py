@@ -23,14 +23,13 @@ from slack_bolt import Ack, BoltContext, BoltRequest, Respond
 from slack_sdk.errors import SlackApiError
 from slack_sdk.web.client import WebClient
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from dispatch.auth.models import DispatchUser
 from dispatch.config import DISPATCH_UI_URL
 from dispatch.database.core import resolve_attr
-from dispatch.database.service import search_filter_sort_paginate
 from dispatch.document import service as document_service
-from dispatch.enums import Visibility
+from dispatch.enums import TypeaheadTypes, Visibility
 from dispatch.event import service as event_service
 from dispatch.exceptions import DispatchException
 from dispatch.incident import flows as incident_flows
@@ -115,9 +114,11 @@ from dispatch.report import flows as report_flows
 from dispatch.report import service as report_service
 from dispatch.report.enums import ReportTypes
 from dispatch.report.models import ExecutiveReportCreate, TacticalReportCreate
+from dispatch.search.typeahead import typeahead
 from dispatch.service import service as service_service
 from dispatch.tag import service as tag_service
 from dispatch.tag.models import Tag
+from dispatch.tag_type.models import TagType
 from dispatch.task import service as task_service
 from dispatch.task.enums import TaskStatus
 from dispatch.task.models import Task
@@ -214,24 +215,21 @@ def handle_tag_search_action(
     """Handles tag lookup actions."""
     query_str = payload["value"]
 
-    filter_spec = {
-        "and": [
-            {"model": "Project", "op": "==", "field": "id", "value": context["subject"].project_id}
-        ]
-    }
-
+    query = db_session.query(Tag).options(joinedload(Tag.tag_type))
     if "/" in query_str:
-        tag_type, query_str = query_str.split("/")
-        filter_spec["and"].append(
-            {"model": "TagType", "op": "==", "field": "name", "value": tag_type}
-        )
+        tag_type, query_str = query_str.split("/", 1)
+        query = query.join(Tag.tag_type).filter(TagType.name == tag_type)
 
-    tags = search_filter_sort_paginate(
-        db_session=db_session, model="Tag", query_str=query_str, filter_spec=filter_spec
+    tags = typeahead(
+        db_session=db_session,
+        model=TypeaheadTypes.tag,
+        query_str=query_str,
+        project_id=context["subject"].project_id,
+        query=query,
     )
 
     options = []
-    for t in tags["items"]:
+    for t in tags:
         options.append(
             {
                 "text": {"type": "plain_text", "text": f"{t.tag_type.name}/{t.name}"},
@@ -1,8 +1,17 @@
 import logging
 import json
-from typing import Any, List
+import threading
+from itertools import chain
+from typing import Any, Dict, List, NamedTuple, Optional
 
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session, selectinload
+
+from dispatch.config import ROUTE_INDEX_CACHE_TTL
+from dispatch.database.service import canonical_filter_spec
 from dispatch.search_filter import service as search_filter_service
+from dispatch.search_filter.models import SearchFilter
 
 from dispatch.incident.models import Incident
 from dispatch.route.models import Recommendation, RecommendationMatch
@@ -10,48 +19,168 @@ from dispatch.route.models import Recommendation, RecommendationMatch
 log = logging.getLogger(__name__)
 
 
-def get_resource_matches(
-    *, db_session, incident: Incident, model: Any
-) -> List[RecommendationMatch]:
-    """Fetches all matching model entities for the given incident."""
-    # get all entities with an associated filter
+class RoutedResource(NamedTuple):
+    id: int
+    state: dict
+    spec_keys: List[str]
+
+
+class RoutingIndex(NamedTuple):
+    """The resources of a project that have filters, grouped by filter expression."""
+
+    resource_type: str
+    filter_specs: Dict[str, List[dict]]
+    resources: List[RoutedResource]
+
+
+_index_cache = TTLCache(maxsize=1024, ttl=ROUTE_INDEX_CACHE_TTL)
+_index_lock = threading.Lock()
+_indexed_models = set()
+
+
+def get_schema(db_session) -> Optional[str]:
+    """Returns the tenant schema a session is bound to."""
+    execution_options = db_session.get_bind().get_execution_options()
+    return execution_options.get("schema_translate_map", {}).get(None)
+
+
+def build_index(*, db_session, project_id: int, model: Any) -> RoutingIndex:
+    """Builds the routing index of a project for a given resource model."""
     model_cls, model_state = model
     resources = (
         db_session.query(model_cls)
-        .filter(model_cls.project_id == incident.project_id)
+        .options(selectinload(model_cls.filters))
+        .filter(model_cls.project_id == project_id)
         .filter(model_cls.filters.any())
+        .order_by(model_cls.id)
         .all()
     )
 
-    matched_resources = []
+    filter_specs = {}
+    routed_resources = []
     for resource in resources:
+        spec_keys = []
         for f in resource.filters:
-            match = search_filter_service.match(
-                db_session=db_session,
-                filter_spec=f.expression,
-                class_instance=incident,
+            spec_key = canonical_filter_spec(f.expression)
+            filter_specs.setdefault(spec_key, f.expression)
+            if spec_key not in spec_keys:
+                spec_keys.append(spec_key)
+
+        routed_resources.append(
+            RoutedResource(
+                id=resource.id,
+                state=json.loads(model_state(**resource.__dict__).json()),
+                spec_keys=spec_keys,
+            )
+        )
+
+    return RoutingIndex(
+        resource_type=model_cls.__name__,
+        filter_specs=filter_specs,
+        resources=routed_resources,
+    )
+
+
+def get_index(*, db_session, project_id: int, model: Any) -> RoutingIndex:
+    """Gets the routing index of a project for a given resource model, building it if needed."""
+    model_cls, _ = model
+    key = (get_schema(db_session), project_id, model_cls.__name__)
+
+    with _index_lock:
+        index = _index_cache.get(key)
+    if index:
+        return index
+
+    index = build_index(db_session=db_session, project_id=project_id, model=model)
+    with _index_lock:
+        _indexed_models.add(model_cls)
+        _index_cache[key] = index
+    return index
+
+
+def invalidate_index() -> None:
+    """Drops all routing indexes, they are rebuilt on their next use."""
+    with _index_lock:
+        _index_cache.clear()
+
+
+def is_routing_change(instance) -> bool:
+    """Whether a change to an instance can change the routing of resources."""
+    return isinstance(instance, SearchFilter) or type(instance) in _indexed_models
+
+
+@event.listens_for(Session, "after_flush")
+def mark_routing_changes(session, flush_context):
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if is_routing_change(instance):
+            # we invalidate now and again on commit or rollback, so an index
+            # rebuilt in between from uncommitted data doesn't stick around
+            session.info["routing_changed"] = True
+            invalidate_index()
+            return
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def invalidate_routing_changes(session):
+    if session.info.pop("routing_changed", False):
+        invalidate_index()
+
+
+def get_resource_matches(
+    *, db_session, incident: Incident, model: Any, filter_matches: Dict[str, bool] = None
+) -> List[RecommendationMatch]:
+    """Fetches all matching model entities for the given incident.
+
+    Each distinct filter expression is evaluated at most once, results are
+    recorded in `filter_matches` so they can be shared across models.
+    """
+    if filter_matches is None:
+        filter_matches = {}
+
+    index = get_index(db_session=db_session, project_id=incident.project_id, model=model)
+
+    def is_match(spec_key: str) -> bool:
+        if spec_key not in filter_matches:
+            filter_matches[spec_key] = bool(
+                search_filter_service.match(
+                    db_session=db_session,
+                    filter_spec=index.filter_specs[spec_key],
+                    class_instance=incident,
+                )
             )
+        return filter_matches[spec_key]
 
-            if match:
-                matched_resources.append(
-                    RecommendationMatch(
-                        resource_state=json.loads(model_state(**resource.__dict__).json()),
-                        resource_type=model_cls.__name__,
-                    )
+    matched_resources = []
+    for resource in index.resources:
+        if any(is_match(spec_key) for spec_key in resource.spec_keys):
+            matched_resources.append(
+                RecommendationMatch(
+                    resource_state=dict(resource.state),
+                    resource_type=index.resource_type,
                 )
-                break
+            )
 
     return matched_resources
 
 
-def get(*, db_session, incident: Incident, models: List[Any]) -> Recommendation:
-    """Get routed resources."""
+def get(
+    *, db_session, incident: Incident, models: List[Any], persist: bool = True
+) -> Recommendation:
+    """Get routed resources.
+
+    Set `persist` to False to skip recording the recommendation, e.g. on hot paths.
+    """
+    filter_matches = {}
 
     matches = []
     for model in models:
-        matches += get_resource_matches(db_session=db_session, incident=incident, model=model)
+        matches += get_resource_matches(
+            db_session=db_session, incident=incident, model=model, filter_matches=filter_matches
+        )
 
     recommendation = Recommendation(matches=matches)
-    db_session.add(recommendation)
-    db_session.commit()
+    if persist:
+        db_session.add(recommendation)
+        db_session.commit()
     return recommendation
@@ -7,29 +7,149 @@
 .. moduleauthor:: Kevin Glisson <kglisson@netflix.com>
 .. moduleauthor:: Marc Vilanova <mvilanova@netflix.com>
 """
+import inspect
+import os
+import secrets
+import socket
 import threading
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Dict, Optional
 
 import schedule
 
+from dispatch.config import (
+    SCHEDULER_LEASE_TTL,
+    SCHEDULER_LEASES_ENABLED,
+    SCHEDULER_MAX_WORKERS,
+    SCHEDULER_TASK_TIMEOUT,
+)
+from dispatch.database.core import SessionLocal
+from dispatch.enums import SchedulerPolicies
+from dispatch.lease import service as lease_service
+from dispatch.metrics import provider as metrics_provider
+
 log = logging.getLogger(__name__)
 
+# a finished run keeps its lease for this share of the task's period, so that the other
+# replicas, whose schedules are offset from ours, don't run it again within the same period
+LEASE_PERIOD_SHARE = 0.9
+
+
+class TaskRun(object):
+    """A queued or running run of a scheduled task."""
+
+    def __init__(self, name: str, timeout: Optional[int] = None, period: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+        self.period = period
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.timed_out = False
+
+    def is_timed_out(self) -> bool:
+        if not self.timeout or self.started_at is None:
+            return False
+        return time.monotonic() - self.started_at > self.timeout
+
+    def get_lease_key(self, unit: str = None) -> str:
+        return f"{self.name}:{unit}" if unit else self.name
+
+
+_current_run: ContextVar[Optional[TaskRun]] = ContextVar("current_run", default=None)
+
+
+def get_current_run() -> Optional[TaskRun]:
+    """Returns the scheduled task run in progress, if any."""
+    return _current_run.get()
+
+
+def is_timed_out() -> bool:
+    """Whether the scheduled task run in progress exceeded its timeout.
+
+    Threads can't be interrupted, so long running tasks are expected to check
+    this between units of work and stop early.
+    """
+    run = _current_run.get()
+    return run is not None and run.is_timed_out()
 
-def run_threaded(job_func):
-    """Runs a given job in a thread."""
-    job_thread = threading.Thread(target=job_func)
-    job_thread.start()
+
+def acquire_lease(unit: str = None) -> bool:
+    """Claims the scheduled task run in progress, or one of its units (e.g. a project),
+    for this scheduler replica.
+
+    Returns False when another replica is running it or already ran it this period.
+    Always True when leases are disabled or outside of a scheduled run.
+    """
+    run = _current_run.get()
+    if run is None or not scheduler.leases_enabled:
+        return True
+    hold_for = run.period * LEASE_PERIOD_SHARE if run.period else 0
+    return scheduler.acquire_lease(run.get_lease_key(unit), hold_for=hold_for)
+
+
+def release_lease(unit: str = None):
+    """Marks a run, or one of its units, claimed with `acquire_lease` as done."""
+    run = _current_run.get()
+    if run is not None and scheduler.leases_enabled:
+        scheduler.release_lease(run.get_lease_key(unit))
+
+
+def get_lease_tags(key: str) -> dict:
+    # units (e.g. organization:project) would make for too many series
+    return {"task": key.split(":", 1)[0]}
+
+
+def get_replica_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
 
 
 #  See: https://schedule.readthedocs.io/en/stable/ for documentation on job syntax
 class Scheduler(object):
-    """Simple scheduler class that holds all scheduled functions."""
+    """Simple scheduler class that holds all scheduled functions.
+
+    Tasks run on a bounded pool of worker threads. A task never runs twice at
+    the same time: when it's due while still queued or running, the run is
+    either skipped or, with the coalesce policy, deferred until the current
+    run ends (however many times it was due in the meantime).
+
+    With leases enabled, several replicas can run the same tasks: each run is
+    leased to one replica (scheduled project tasks lease each project instead),
+    the leases of the runs in progress are renewed while they run, and the runs
+    of a replica that stops renewing them are taken over once they expire.
+    """
 
     registered_tasks = []
 
+    def __init__(
+        self,
+        max_workers: int = SCHEDULER_MAX_WORKERS,
+        leases_enabled: bool = SCHEDULER_LEASES_ENABLED,
+        lease_ttl: int = SCHEDULER_LEASE_TTL,
+    ):
+        self.max_workers = max_workers
+        self.leases_enabled = leases_enabled
+        self.lease_ttl = lease_ttl
+        self.replica_id = get_replica_id()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._runs = {}
+        self._coalesced = set()
+        self._queued = 0
+        # lease key -> how long to hold it once released
+        self._leases: Dict[str, float] = {}
+        # keeps a lease from being renewed while it's being released
+        self._lease_lock = threading.Lock()
+        self._heartbeat_at = 0.0
+
     def add(self, job, *args, **kwargs):
-        """Adds a task to the scheduler."""
+        """Adds a task to the scheduler.
+
+        Accepts the task's `name`, its overlap `policy` (skip by default) and its
+        `timeout` in seconds.
+        """
 
         def decorator(func):
             if not kwargs.get("name"):
@@ -37,9 +157,20 @@ class Scheduler(object):
             else:
                 name = kwargs.pop("name")
 
-            self.registered_tasks.append(
-                {"name": name, "func": func, "job": job.do(run_threaded, func)}
-            )
+            task = {
+                "name": name,
+                "func": func,
+                "policy": kwargs.pop("policy", SchedulerPolicies.skip),
+                "timeout": kwargs.pop("timeout", SCHEDULER_TASK_TIMEOUT),
+                # scheduled project tasks lease each of their projects
+                "leased_by_unit": hasattr(
+                    inspect.unwrap(func, stop=lambda f: hasattr(f, "__scheduled_project_task__")),
+                    "__scheduled_project_task__",
+                ),
+            }
+            task["job"] = job.do(self.submit, task)
+            self.registered_tasks.append(task)
+            return func
 
         return decorator
 
@@ -47,10 +178,175 @@ class Scheduler(object):
         """Removes a task from the scheduler."""
         schedule.cancel_job(task["job"])
 
+    def get_executor(self) -> ThreadPoolExecutor:
+        if not self._executor:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="scheduler"
+            )
+        return self._executor
+
+    def submit(self, task: dict):
+        """Queues a run of a task, unless one is already queued or running."""
+        name = task["name"]
+        tags = {"task": name}
+        with self._lock:
+            if name in self._runs:
+                if task["policy"] == SchedulerPolicies.coalesce:
+                    self._coalesced.add(name)
+                    log.debug(f"Deferring task {name} until its previous run ends.")
+                    metrics_provider.counter("scheduler.task.coalesced", tags=tags)
+                else:
+                    log.warning(f"Skipping task {name}, its previous run is still in progress.")
+                    metrics_provider.counter("scheduler.task.skipped", tags=tags)
+                return
+
+            run = self._runs[name] = TaskRun(
+                name, timeout=task["timeout"], period=task["job"].period.total_seconds()
+            )
+            self._queued += 1
+            queued = self._queued
+
+        metrics_provider.gauge("scheduler.queue.depth", queued)
+        self.get_executor().submit(self.run, task, run)
+
+    def run(self, task: dict, run: TaskRun):
+        """Runs a queued task, recording how long it waited and took."""
+        tags = {"task": run.name}
+        with self._lock:
+            self._queued -= 1
+
+        run.started_at = time.monotonic()
+        lag = run.started_at - run.enqueued_at
+        metrics_provider.timer("scheduler.task.lag", value=lag, tags=tags)
+
+        token = _current_run.set(run)
+        try:
+            if task["leased_by_unit"]:
+                task["func"]()
+            elif acquire_lease():
+                try:
+                    task["func"]()
+                finally:
+                    release_lease()
+            else:
+                log.debug(f"Skipping task {run.name}, another replica ran it this period.")
+        except Exception as e:
+            log.exception(e)
+        finally:
+            _current_run.reset(token)
+            if self.leases_enabled:
+                # e.g. units leased before the task failed
+                self.release_run_leases(run)
+            elapsed_time = time.monotonic() - run.started_at
+            metrics_provider.timer("scheduler.task.elapsed", value=elapsed_time, tags=tags)
+
+            with self._lock:
+                del self._runs[run.name]
+                coalesced = run.name in self._coalesced
+                self._coalesced.discard(run.name)
+
+        if coalesced:
+            self.submit(task)
+
+    def check_timeouts(self):
+        """Reports the runs that exceeded their timeout."""
+        with self._lock:
+            runs = list(self._runs.values())
+
+        for run in runs:
+            if not run.timed_out and run.is_timed_out():
+                run.timed_out = True
+                log.error(f"Task {run.name} is still running after its {run.timeout}s timeout.")
+                metrics_provider.counter("scheduler.task.timeout", tags={"task": run.name})
+
+    def acquire_lease(self, key: str, hold_for: float = 0) -> bool:
+        """Leases a run to this replica, holding it `hold_for` seconds once released."""
+        db_session = SessionLocal()
+        try:
+            acquired = lease_service.acquire(
+                db_session=db_session, key=key, owner=self.replica_id, ttl=self.lease_ttl
+            )
+        except Exception as e:
+            log.warning(f"Unable to acquire the lease of {key}. Error: {e}")
+            return False
+        finally:
+            db_session.close()
+
+        if not acquired:
+            metrics_provider.counter("scheduler.lease.contended", tags=get_lease_tags(key))
+            return False
+
+        with self._lock:
+            self._leases[key] = hold_for
+        return True
+
+    def release_lease(self, key: str):
+        with self._lease_lock:
+            with self._lock:
+                hold_for = self._leases.pop(key, None)
+            if hold_for is None:
+                return
+
+            db_session = SessionLocal()
+            try:
+                lease_service.release(
+                    db_session=db_session, key=key, owner=self.replica_id, hold_for=hold_for
+                )
+            except Exception as e:
+                # the lease expires on its own, once it's no longer renewed
+                log.warning(f"Unable to release the lease of {key}. Error: {e}")
+            finally:
+                db_session.close()
+
+    def release_run_leases(self, run: TaskRun):
+        """Releases the leases a run didn't release itself."""
+        with self._lock:
+            keys = [key for key in self._leases if key.split(":", 1)[0] == run.name]
+        for key in keys:
+            self.release_lease(key)
+
+    def heartbeat(self):
+        """Renews the leases of the runs in progress on this replica."""
+        self._heartbeat_at = time.monotonic()
+        with self._lease_lock:
+            with self._lock:
+                keys = list(self._leases)
+            if not keys:
+                return
+
+            db_session = SessionLocal()
+            try:
+                renewed = lease_service.renew(
+                    db_session=db_session, keys=keys, owner=self.replica_id, ttl=self.lease_ttl
+                )
+            except Exception as e:
+                log.warning(f"Unable to renew {len(keys)} lease(s). Error: {e}")
+                return
+            finally:
+                db_session.close()
+
+            with self._lock:
+                lost = [
+                    key
+                    for key in set(keys) - set(renewed)
+                    if self._leases.pop(key, None) is not None
+                ]
+
+        for key in lost:
+            # it expired and was taken over, another replica may be running it too
+            log.error(f"Lost the lease of {key}.")
+            metrics_provider.counter("scheduler.lease.lost", tags=get_lease_tags(key))
+
     def start(self):
         """Runs all scheduled tasks."""
+        if self.leases_enabled:
+            log.info(f"Starting scheduler replica {self.replica_id}.")
+
         while True:
             schedule.run_pending()
+            self.check_timeouts()
+            if self.leases_enabled and time.monotonic() - self._heartbeat_at >= self.lease_ttl / 3:
+                self.heartbeat()
             time.sleep(1)
 
 
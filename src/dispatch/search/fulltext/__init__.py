@@ -118,10 +118,13 @@ class SQLConstruct(object):
             table=self.table.name, column=self.tsvector_column.name
         )
 
+    def column_value(self, column):
+        return text("NEW.{column}".format(column=column.name))
+
     def column_vector(self, column):
         if column.name in RESERVED_WORDS:
             column.name = quote_identifier(column.name)
-        value = text("NEW.{column}".format(column=column.name))
+        value = self.column_value(column)
         try:
             vectorizer_func = vectorizer[column]
         except KeyError:
@@ -193,6 +196,35 @@ class CreateSearchTriggerSQL(SQLConstruct):
         )
 
 
+class UpdateSearchVectorSQL(SQLConstruct):
+    """Recomputes the search vector of the rows in a primary key range.
+
+    The range is given by the `search_vector_lower` (exclusive, omitted for the
+    first range) and `search_vector_upper` (inclusive) parameters.
+    """
+
+    def __init__(self, tsvector_column, lower_bound=True, **kwargs):
+        super().__init__(tsvector_column, **kwargs)
+        self.lower_bound = lower_bound
+
+    def column_value(self, column):
+        return text(column.name)
+
+    def __str__(self):
+        (primary_key,) = self.table.primary_key.columns
+        conditions = ["{pk} <= %(search_vector_upper)s"]
+        if self.lower_bound:
+            conditions.append("{pk} > %(search_vector_lower)s")
+
+        sql = "UPDATE {table} SET {search_vector_name} = {ts_vector} WHERE "
+        return (sql + " AND ".join(conditions)).format(
+            table=self.table_name,
+            search_vector_name=self.tsvector_column.name,
+            ts_vector=self.search_vector,
+            pk=quote_identifier(primary_key.name),
+        )
+
+
 class DropSearchFunctionSQL(SQLConstruct):
     def __str__(self):
         return "DROP FUNCTION IF EXISTS %s.%s()" % (self.schema_name, self.search_function_name)
@@ -294,7 +326,9 @@ class SearchManager:
 search_manager = SearchManager()
 
 
-def sync_trigger(conn, table, tsvector_column, indexed_columns, metadata=None, options=None):
+def sync_trigger(
+    conn, table, tsvector_column, indexed_columns, metadata=None, options=None, update_rows=True
+):
     """
     Synchronizes search trigger and trigger function for given table and given
     search index column. Internally this function executes the following SQL
@@ -384,6 +418,9 @@ def sync_trigger(conn, table, tsvector_column, indexed_columns, metadata=None, o
         Table. If None is given then new MetaData object is initialized within
         this function.
     :param options: Dictionary of configuration options
+    :param update_rows:
+        Whether to update all rows, pass False when they are reindexed in
+        batches instead (see `dispatch database reindex-search`)
     """
     if metadata is None:
         metadata = MetaData()
@@ -402,8 +439,10 @@ def sync_trigger(conn, table, tsvector_column, indexed_columns, metadata=None, o
     for class_ in classes:
         sql = class_(**params)
         conn.execute(str(sql), **sql.params)
-    update_sql = table.update().values({indexed_columns[0]: text(indexed_columns[0])})
-    conn.execute(update_sql)
+
+    if update_rows:
+        update_sql = table.update().values({indexed_columns[0]: text(indexed_columns[0])})
+        conn.execute(update_sql)
 
 
 def drop_trigger(conn, table_name, tsvector_column, metadata=None, options=None):
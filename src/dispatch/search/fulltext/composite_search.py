@@ -10,6 +10,13 @@ Base usage::
     s.search(query=q)
 
 
+Ranked, per type top-k usage::
+
+    s = CompositeSearch(session, [User, Comment, Blog], model_filters={Blog: published})
+    q = s.build_query('star wars', sort=True, limit=10, offset=10, mode=SearchModes.websearch)
+    s.search(query=q)
+
+
 Adding other objects::
 
     class RatingSearch(CompositeSearch):
@@ -35,15 +42,35 @@ Adding other objects::
 
 """
 from collections import defaultdict
+from sqlalchemy import desc, func, select, union_all
 from sqlalchemy.sql.expression import literal
 
-from . import inspect_search_vectors, search
+from dispatch.enums import SearchModes
+
+from . import inspect_search_vectors, search, search_manager
+
+
+def get_tsquery(search_query, regconfig=None, mode=SearchModes.tsquery):
+    """Parses a search query into a tsquery.
+
+    `tsquery` mode (the default) uses tsq_parse, which matches words by prefix.
+    `websearch` mode uses websearch_to_tsquery, which never raises on malformed input
+    but only matches whole words.
+    """
+    if regconfig is None:
+        regconfig = search_manager.options["regconfig"]
+
+    if mode == SearchModes.websearch:
+        return func.websearch_to_tsquery(regconfig, search_query)
+    return func.tsq_parse(regconfig, search_query)
 
 
 class CompositeSearch(object):
-    def __init__(self, session, model_classes):
+    def __init__(self, session, model_classes, model_filters=None):
         self.session = session
         self.model_classes = model_classes
+        # callables that restrict the query of a model, e.g. for permissions
+        self.model_filters = model_filters or {}
 
     def union_query(self):
         qs = None
@@ -61,9 +88,58 @@ class CompositeSearch(object):
                 qs = qs.union(q)
         return qs
 
-    def build_query(self, search_query, vector=None, regconfig=None, sort=False):
-        qs = self.union_query()
-        return search(qs, search_query, vector, regconfig, sort)
+    def filter_query(self, model_class, query):
+        model_filter = self.model_filters.get(model_class)
+        if model_filter:
+            query = model_filter(query)
+        return query
+
+    def ranked_query(self, model_class, tsquery, limit=None, offset=0):
+        """Returns the top ranked hits of a model, filtered by its model filter."""
+        vector = inspect_search_vectors(model_class)[0]
+        rank = func.ts_rank_cd(vector, tsquery)
+
+        q = self.session.query(
+            model_class.id.label("id"),
+            literal(model_class.__name__).label("type"),
+            rank.label("rank"),
+        ).filter(vector.op("@@")(tsquery))
+        q = self.filter_query(model_class, q)
+
+        if limit:
+            q = q.order_by(desc(rank)).limit(limit).offset(offset)
+        return q.subquery()
+
+    def build_query(
+        self,
+        search_query,
+        vector=None,
+        regconfig=None,
+        sort=False,
+        limit=None,
+        offset=0,
+        mode=None,
+    ):
+        """Builds the search query.
+
+        Passing a `limit` (and `offset`) or a parsing `mode` ranks each model
+        separately, returning at most `limit` hits per model.
+        """
+        if limit is None and mode is None:
+            qs = self.union_query()
+            return search(qs, search_query, vector, regconfig, sort)
+
+        tsquery = get_tsquery(search_query, regconfig, mode or SearchModes.tsquery)
+        parts = []
+        for model_class in self.model_classes:
+            ranked = self.ranked_query(model_class, tsquery, limit=limit, offset=offset)
+            parts.append(select([ranked.c.id, ranked.c.type, ranked.c.rank]))
+
+        hits = union_all(*parts).alias("hits")
+        qs = self.session.query(hits.c.id, hits.c.type, hits.c.rank)
+        if sort:
+            qs = qs.order_by(desc(hits.c.rank))
+        return qs
 
     def split_filter(self, model_class, obj):
         return obj.type == model_class.__name__
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from pydantic import Field
 
@@ -43,6 +43,13 @@ class ContentResponse(DispatchBase):
         allow_population_by_field_name = True
 
 
+class TypeaheadResponse(DispatchBase):
+    query: Optional[str] = Field(None, nullable=True)
+    items: List[Any] = []
+
+
 class SearchResponse(DispatchBase):
     query: Optional[str] = Field(None, nullable=True)
+    page: Optional[int] = 1
+    itemsPerPage: Optional[int]
     results: ContentResponse
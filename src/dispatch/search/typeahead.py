@@ -0,0 +1,75 @@
+"""
+.. module: dispatch.search.typeahead
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+
+Prefix and fuzzy lookups for autocomplete fields, backed by pg_trgm GIN indexes.
+"""
+from typing import List
+
+from sqlalchemy import desc, func, or_, orm
+
+from dispatch.database.core import Base, get_class_by_tablename
+from dispatch.enums import TypeaheadTypes
+
+# the columns matched for each typeahead type, each one has a trigram index
+TYPEAHEAD_FIELDS = {
+    TypeaheadTypes.individual_contact: ["name", "email"],
+    TypeaheadTypes.service: ["name"],
+    TypeaheadTypes.tag: ["name"],
+    TypeaheadTypes.term: ["text"],
+}
+
+TYPEAHEAD_LIMIT = 10
+
+
+def escape_like(value: str) -> str:
+    """Escapes the LIKE wildcards of a user provided value."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def typeahead(
+    *,
+    db_session,
+    model: TypeaheadTypes,
+    query_str: str,
+    project_id: int = None,
+    limit: int = TYPEAHEAD_LIMIT,
+    query: orm.Query = None,
+) -> List[Base]:
+    """Returns the best matches for a (partial) query.
+
+    Values containing the query match, as do values similar to it (typos).
+    Prefix matches rank first, then matches by trigram similarity. An empty
+    query returns the first values in alphabetical order. An existing `query`
+    of the model can be passed to further restrict the matches.
+    """
+    query_str = query_str.strip()
+
+    model = TypeaheadTypes(model)
+    model_cls = get_class_by_tablename(model.value)
+    fields = [getattr(model_cls, f) for f in TYPEAHEAD_FIELDS[model]]
+
+    if query is None:
+        query = db_session.query(model_cls)
+
+    if project_id:
+        query = query.filter(model_cls.project_id == project_id)
+
+    if not query_str:
+        return query.order_by(fields[0]).limit(limit).all()
+
+    contains = f"%{escape_like(query_str)}%"
+    prefix = f"{escape_like(query_str)}%"
+
+    # both ILIKE and the similarity operator (%) are served by the trigram indexes
+    query = query.filter(
+        or_(*[f.ilike(contains) for f in fields], *[f.op("%")(query_str) for f in fields])
+    )
+    query = query.order_by(
+        desc(or_(*[f.ilike(prefix) for f in fields])),
+        desc(func.greatest(*[func.similarity(f, query_str) for f in fields])),
+        fields[0],
+    )
+    return query.limit(limit).all()
@@ -3,49 +3,96 @@ from fastapi import APIRouter, Depends
 from fastapi.params import Query
 from starlette.responses import JSONResponse
 
-from dispatch.database.core import get_class_by_tablename
-from dispatch.database.service import composite_search
-from dispatch.database.service import common_parameters
-from dispatch.enums import SearchTypes, UserRoles
-from dispatch.enums import Visibility
+from sqlalchemy.orm import Session
+
+from dispatch.auth.models import DispatchUser
+from dispatch.auth.service import get_current_user
+from dispatch.common.utils.views import ModelResponse
+from dispatch.database.core import get_class_by_tablename, get_db
+from dispatch.database.service import QueryStr, composite_search
+from dispatch.enums import SearchModes, SearchTypes, TypeaheadTypes
+from dispatch.individual.models import IndividualContactRead
+from dispatch.models import PrimaryKey
+from dispatch.service.models import ServiceRead
+from dispatch.tag.models import TagRead
+from dispatch.term.models import TermRead
 
 from .models import (
     SearchResponse,
+    TypeaheadResponse,
 )
+from .typeahead import TYPEAHEAD_LIMIT, typeahead
 
 router = APIRouter()
 
+# hits returned per type, the search page only sends the query and the types
+SEARCH_ITEMS_PER_PAGE = 25
+
+TYPEAHEAD_SCHEMAS = {
+    TypeaheadTypes.individual_contact: IndividualContactRead,
+    TypeaheadTypes.service: ServiceRead,
+    TypeaheadTypes.tag: TagRead,
+    TypeaheadTypes.term: TermRead,
+}
+
+
+@router.get("/typeahead", summary="Autocompletes tags, individuals, services and terms.")
+def search_typeahead(
+    *,
+    db_session: Session = Depends(get_db),
+    query_str: str = Query(..., alias="q", min_length=1),
+    type: TypeaheadTypes = Query(...),
+    project_id: PrimaryKey = Query(None, alias="projectId"),
+    limit: int = Query(TYPEAHEAD_LIMIT, gt=0, le=100),
+):
+    """Returns the best prefix or fuzzy matches for a partial query."""
+    items = typeahead(
+        db_session=db_session,
+        model=type,
+        query_str=query_str,
+        project_id=project_id,
+        limit=limit,
+    )
+    schema = TYPEAHEAD_SCHEMAS[type]
+    return ModelResponse(
+        TypeaheadResponse(query=query_str, items=[schema.from_orm(i) for i in items])
+    )
+
 
 @router.get("", response_class=JSONResponse)
 def search(
     *,
-    common: dict = Depends(common_parameters),
+    db_session: Session = Depends(get_db),
+    query_str: QueryStr = Query(None, alias="q"),
+    page: int = Query(1, gt=0, lt=2147483647),
+    items_per_page: int = Query(SEARCH_ITEMS_PER_PAGE, alias="itemsPerPage", gt=-2, lt=2147483647),
     type: List[SearchTypes] = Query(..., alias="type[]"),
+    mode: SearchModes = Query(SearchModes.tsquery),
+    current_user: DispatchUser = Depends(get_current_user),
 ):
-    """Perform a search."""
-    if common["query_str"]:
+    """Perform a search.
+
+    Returns the `itemsPerPage` best ranked hits of each type for the requested page.
+    """
+    if query_str:
         models = [get_class_by_tablename(t) for t in type]
         results = composite_search(
-            db_session=common["db_session"],
-            query_str=common["query_str"],
+            db_session=db_session,
+            query_str=query_str,
             models=models,
-            current_user=common["current_user"],
+            current_user=current_user,
+            page=page,
+            items_per_page=items_per_page,
+            mode=mode,
         )
-        # add a filter for restricted incidents
-        # TODO won't currently show incidents that you are a member
-        admin_projects = []
-        for p in common["current_user"].projects:
-            if p.role == UserRoles.admin:
-                admin_projects.append(p)
-
-        filtered_incidents = []
-        for incident in results["Incident"]:
-            if incident.project in admin_projects or incident.visibility == Visibility.open:
-                filtered_incidents.append(incident)
-
-        results["Incident"] = filtered_incidents
-
     else:
         results = []
 
-    return SearchResponse(**{"query": common["query_str"], "results": results}).dict(by_alias=False)
+    return SearchResponse(
+        **{
+            "query": query_str,
+            "page": page,
+            "itemsPerPage": items_per_page,
+            "results": results,
+        }
+    ).dict(by_alias=False)
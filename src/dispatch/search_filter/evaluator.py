@@ -0,0 +1,318 @@
+"""
+.. module: dispatch.search_filter.evaluator
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+
+Evaluates filter specs against already loaded objects, mirroring the SQL
+produced by `dispatch.database.service.apply_filters` so that matching an
+object against a search filter doesn't need a database round trip.
+
+SQL's three-valued logic is kept: comparisons involving NULL (None) are
+unknown, and the object matches if any joined row satisfies the whole
+expression, just like the equivalent query.
+"""
+import functools
+import json
+import re
+from datetime import date, datetime
+from numbers import Number
+from typing import List, Optional
+
+from sqlalchemy import and_, not_, or_
+from sqlalchemy.orm import class_mapper
+
+from dispatch.config import DATABASE_FILTER_CACHE_SIZE
+from dispatch.database.core import Base
+from dispatch.database.service import (
+    FILTER_SPECIFIC_JOINS,
+    BooleanFilter,
+    Filter,
+    build_filters,
+    canonical_filter_spec,
+)
+
+
+class UnsupportedFilterError(Exception):
+    """Raised when a filter can't be evaluated in memory and must run as SQL."""
+
+
+def get_like_pattern(pattern: str, case_sensitive: bool = True):
+    """Translates a SQL LIKE pattern into a compiled regular expression."""
+    regex = []
+    escaped = False
+    for c in pattern:
+        if escaped:
+            regex.append(re.escape(c))
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c == "%":
+            regex.append(".*")
+        elif c == "_":
+            regex.append(".")
+        else:
+            regex.append(re.escape(c))
+    flags = re.DOTALL if case_sensitive else re.DOTALL | re.IGNORECASE
+    return re.compile(f"^{''.join(regex)}$", flags)
+
+
+def coerce(value, other):
+    """Coerces a filter value to the type of the column value it's compared with."""
+    if value is None or other is None:
+        return value
+
+    if isinstance(other, bool) or isinstance(value, bool):
+        if isinstance(other, bool) and isinstance(value, bool):
+            return value
+        raise UnsupportedFilterError(f"Can't compare {value!r} with {other!r}.")
+
+    if isinstance(other, (datetime, date)) and isinstance(value, str):
+        try:
+            value = type(other).fromisoformat(value)
+        except ValueError:
+            raise UnsupportedFilterError(f"Can't compare {value!r} with {other!r}.")
+
+    if isinstance(other, Number) and isinstance(value, str):
+        try:
+            return type(other)(value)
+        except ValueError:
+            raise UnsupportedFilterError(f"Can't compare {value!r} with {other!r}.")
+
+    if isinstance(other, str) and isinstance(value, str):
+        return value
+    if isinstance(other, Number) and isinstance(value, Number):
+        return value
+    if isinstance(other, (datetime, date)) and isinstance(value, (datetime, date)):
+        # dates can't be ordered against datetimes, nor naive datetimes against aware ones
+        # (e.g. a value with an offset against a timestamp column), we leave those to SQL
+        if isinstance(other, datetime) != isinstance(value, datetime):
+            raise UnsupportedFilterError(f"Can't compare {value!r} with {other!r}.")
+        if isinstance(other, datetime) and (other.tzinfo is None) != (value.tzinfo is None):
+            raise UnsupportedFilterError(f"Can't compare {value!r} with {other!r}.")
+        return value
+
+    raise UnsupportedFilterError(f"Can't compare {value!r} with {other!r}.")
+
+
+def compare(function):
+    """Wraps a comparison so that NULL operands yield unknown (None)."""
+
+    def wrapper(field, value):
+        if field is None or value is None:
+            return None
+        return function(field, coerce(value, field))
+
+    return wrapper
+
+
+def like(case_sensitive: bool = True, negate: bool = False):
+    def wrapper(field, value):
+        if field is None or value is None:
+            return None
+        if not isinstance(field, str) or not isinstance(value, str):
+            raise UnsupportedFilterError("LIKE is only supported on strings.")
+        matched = bool(get_like_pattern(value, case_sensitive).match(field))
+        return not matched if negate else matched
+
+    return wrapper
+
+
+def is_in(negate: bool = False):
+    def wrapper(field, value):
+        if field is None:
+            return None
+        if not isinstance(value, (list, tuple, set)):
+            raise UnsupportedFilterError("IN requires a list of values.")
+        matched = any(field == coerce(v, field) for v in value if v is not None)
+        if not matched and any(v is None for v in value):
+            return None
+        return not matched if negate else matched
+
+    return wrapper
+
+
+OPERATORS = {
+    "is_null": lambda f: f is None,
+    "is_not_null": lambda f: f is not None,
+    "==": compare(lambda f, a: f == a),
+    "eq": compare(lambda f, a: f == a),
+    "!=": compare(lambda f, a: f != a),
+    "ne": compare(lambda f, a: f != a),
+    ">": compare(lambda f, a: f > a),
+    "gt": compare(lambda f, a: f > a),
+    "<": compare(lambda f, a: f < a),
+    "lt": compare(lambda f, a: f < a),
+    ">=": compare(lambda f, a: f >= a),
+    "ge": compare(lambda f, a: f >= a),
+    "<=": compare(lambda f, a: f <= a),
+    "le": compare(lambda f, a: f <= a),
+    "like": like(),
+    "ilike": like(case_sensitive=False),
+    "not_ilike": like(case_sensitive=False, negate=True),
+    "in": is_in(),
+    "not_in": is_in(negate=True),
+}
+
+
+def sql_and(values: List[Optional[bool]]) -> Optional[bool]:
+    if any(v is False for v in values):
+        return False
+    if any(v is None for v in values):
+        return None
+    return True
+
+
+def sql_or(values: List[Optional[bool]]) -> Optional[bool]:
+    if any(v is True for v in values):
+        return True
+    if any(v is None for v in values):
+        return None
+    return False
+
+
+def sql_not(values: List[Optional[bool]]) -> Optional[bool]:
+    (value,) = values
+    return None if value is None else not value
+
+
+BOOLEAN_FUNCTIONS = {and_: sql_and, or_: sql_or, not_: sql_not}
+
+
+def get_relationships(model: Base, target: str) -> list:
+    """Returns the relationships of a model that point to the model named `target`."""
+    return [r for r in class_mapper(model).relationships if r.mapper.class_.__name__ == target]
+
+
+def get_join_path(model: Base, target: str) -> list:
+    """Returns the relationships to follow from a model to reach the model named `target`.
+
+    Mirrors the joins the SQL path makes: a direct relationship, or one hop through
+    the relationship used by the model specific joins (e.g. Incident.tags for TagType).
+    """
+    relationships = get_relationships(model, target)
+    if len(relationships) == 1:
+        return relationships
+    if relationships:
+        raise UnsupportedFilterError(f"Ambiguous join from {model.__name__} to {target}.")
+
+    specific_join = FILTER_SPECIFIC_JOINS.get((model, target))
+    if specific_join and hasattr(specific_join[0], "property"):
+        via = specific_join[0].property
+        hops = get_relationships(via.mapper.class_, target)
+        if len(hops) == 1:
+            return [via, hops[0]]
+
+    raise UnsupportedFilterError(f"Can't join {model.__name__} to {target} in memory.")
+
+
+def is_outer_join(model: Base, target: str, relationship) -> bool:
+    """Whether the SQL path outer joins a relationship for a given filter model."""
+    specific_join = FILTER_SPECIFIC_JOINS.get((model, target))
+    if not specific_join:
+        return False
+    joined, is_outer = specific_join
+    return is_outer and getattr(joined, "property", None) is relationship
+
+
+def get_filter_models(filters: list) -> set:
+    models = set()
+    for f in filters:
+        models.update(f.get_named_models())
+    return models
+
+
+def get_rows(instance: Base, model_names: set) -> List[dict]:
+    """Builds the rows the SQL join would produce, as bindings of model name to object."""
+    model = type(instance)
+    rows = [{model.__name__: instance}]
+
+    # we expand the rows one relationship at a time, sharing hops between models
+    expanded = {}
+    for target in sorted(model_names - {model.__name__}):
+        path = get_join_path(model, target)
+
+        for depth, relationship in enumerate(path):
+            key = tuple(r.key for r in path[: depth + 1])
+            name = relationship.mapper.class_.__name__
+            if key in expanded:
+                continue
+            expanded[key] = name
+
+            # only the first hop can be outer joined, further hops are auto (inner) joins
+            outer = depth == 0 and is_outer_join(model, target, relationship)
+            parent = model.__name__ if depth == 0 else path[depth - 1].mapper.class_.__name__
+
+            new_rows = []
+            for row in rows:
+                source = row.get(parent)
+                related = getattr(source, relationship.key) if source is not None else None
+
+                if relationship.uselist:
+                    related = list(related or [])
+                else:
+                    related = [related] if related is not None else []
+
+                if not related:
+                    if outer:
+                        new_rows.append({**row, name: None})
+                    continue
+
+                for r in related:
+                    new_rows.append({**row, name: r})
+            rows = new_rows
+
+    return rows
+
+
+def evaluate_filter(f, row: dict, default_model: str) -> Optional[bool]:
+    if isinstance(f, BooleanFilter):
+        function = BOOLEAN_FUNCTIONS[f.function]
+        return function([evaluate_filter(child, row, default_model) for child in f.filters])
+
+    if isinstance(f, Filter):
+        model_name = f.filter_spec.get("model", default_model)
+        if model_name not in row:
+            raise UnsupportedFilterError(f"Model {model_name} is not part of the evaluated rows.")
+
+        operator = OPERATORS.get(f.operator.operator)
+        if not operator:
+            raise UnsupportedFilterError(f"Operator {f.operator.operator} is not supported.")
+
+        source = row[model_name]
+        field_name = f.filter_spec["field"]
+        if source is None:
+            field = None
+        elif hasattr(type(source), field_name):
+            field = getattr(source, field_name)
+        else:
+            raise UnsupportedFilterError(f"Field {field_name} not found on {model_name}.")
+
+        if isinstance(field, Base) or isinstance(field, (list, dict)):
+            raise UnsupportedFilterError(f"Field {field_name} is not a scalar column.")
+
+        if f.operator.arity == 1:
+            return operator(field)
+        return operator(field, f.value)
+
+    raise UnsupportedFilterError(f"Unknown filter {f}.")
+
+
+@functools.lru_cache(maxsize=DATABASE_FILTER_CACHE_SIZE)
+def _build_filters(spec_key: str) -> list:
+    return build_filters(json.loads(spec_key))
+
+
+def evaluate(*, filter_spec, class_instance: Base) -> bool:
+    """Evaluates a filter spec against a loaded object.
+
+    Raises UnsupportedFilterError for constructs that can only be evaluated in SQL.
+    """
+    filters = _build_filters(canonical_filter_spec(filter_spec))
+    default_model = type(class_instance).__name__
+
+    rows = get_rows(class_instance, get_filter_models(filters))
+    for row in rows:
+        if sql_and([evaluate_filter(f, row, default_model) for f in filters]) is True:
+            return True
+    return False
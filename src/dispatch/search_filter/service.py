@@ -1,14 +1,21 @@
-from typing import List, Optional
-
-from sqlalchemy_filters import apply_filters
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
 
 from dispatch.database.core import Base, get_class_by_tablename, get_table_name_by_class_instance
-from dispatch.database.service import apply_filter_specific_joins
+from dispatch.database.service import apply_compiled_filters, canonical_filter_spec
 from dispatch.project import service as project_service
 
+from .evaluator import UnsupportedFilterError, evaluate
 from .models import SearchFilter, SearchFilterCreate, SearchFilterUpdate
 
 
+log = logging.getLogger(__name__)
+
+# the number of ids matched per query when falling back to SQL
+MATCH_BATCH_SIZE = 1000
+
+
 def get(*, db_session, search_filter_id: int) -> Optional[SearchFilter]:
     """Gets a search filter by id."""
     return db_session.query(SearchFilter).filter(SearchFilter.id == search_filter_id).first()
@@ -25,16 +32,83 @@ def get_by_name(*, db_session, project_id: int, name: str) -> Optional[SearchFil
 
 
 def match(*, db_session, filter_spec: List[dict], class_instance: Base):
-    """Matches a class instance with a given search filter."""
+    """Matches a class instance with a given search filter.
+
+    The filter is evaluated against the loaded instance, falling back to
+    the database for constructs that can only be evaluated in SQL.
+    """
+    try:
+        if evaluate(filter_spec=filter_spec, class_instance=class_instance):
+            return class_instance
+        return None
+    except UnsupportedFilterError as e:
+        log.debug(f"Falling back to SQL to match filter. Reason: {e}")
+
+    return match_sql(db_session=db_session, filter_spec=filter_spec, class_instance=class_instance)
+
+
+def match_sql(*, db_session, filter_spec: List[dict], class_instance: Base):
+    """Matches a class instance with a given search filter using the database."""
     table_name = get_table_name_by_class_instance(class_instance)
     model_cls = get_class_by_tablename(table_name)
     query = db_session.query(model_cls)
 
-    query = apply_filter_specific_joins(model_cls, filter_spec, query)
-    query = apply_filters(query, filter_spec)
+    query = apply_compiled_filters(query, filter_spec, model_cls)
     return query.filter(model_cls.id == class_instance.id).one_or_none()
 
 
+def get_matching_ids(*, db_session, filter_spec: List[dict], class_instances: List[Base]) -> Set:
+    """Returns the ids of the class instances that match a given search filter.
+
+    The filter is evaluated in memory when possible, otherwise it's run once
+    as SQL against the whole candidate id set.
+    """
+    try:
+        return {
+            i.id for i in class_instances if evaluate(filter_spec=filter_spec, class_instance=i)
+        }
+    except UnsupportedFilterError as e:
+        log.debug(f"Falling back to SQL to match filter. Reason: {e}")
+
+    instances_by_model = defaultdict(list)
+    for class_instance in class_instances:
+        instances_by_model[type(class_instance)].append(class_instance)
+
+    matching_ids = set()
+    for model_cls, instances in instances_by_model.items():
+        ids = [i.id for i in instances]
+        for start in range(0, len(ids), MATCH_BATCH_SIZE):
+            query = db_session.query(model_cls.id)
+            query = apply_compiled_filters(query, filter_spec, model_cls)
+            query = query.filter(model_cls.id.in_(ids[start : start + MATCH_BATCH_SIZE]))
+            matching_ids.update(row.id for row in query)
+    return matching_ids
+
+
+def match_many(
+    *, db_session, search_filters: List[SearchFilter], class_instances: List[Base]
+) -> Dict[int, Set]:
+    """Matches class instances against many search filters.
+
+    Returns a mapping of search filter id to the ids of the matching instances.
+    Each distinct filter expression is only evaluated once.
+    """
+    search_filters_by_spec = defaultdict(dict)
+    for search_filter in search_filters:
+        spec_key = canonical_filter_spec(search_filter.expression)
+        search_filters_by_spec[spec_key][search_filter.id] = search_filter
+
+    matches = {}
+    for search_filters_with_spec in search_filters_by_spec.values():
+        filter_spec = next(iter(search_filters_with_spec.values())).expression
+        matching_ids = get_matching_ids(
+            db_session=db_session, filter_spec=filter_spec, class_instances=class_instances
+        )
+        for search_filter_id in search_filters_with_spec:
+            matches[search_filter_id] = matching_ids
+    return matches
+
+
 def get_or_create(*, db_session, search_filter_in) -> SearchFilter:
     if search_filter_in.id:
         q = db_session.query(SearchFilter).filter(SearchFilter.id == search_filter_in.id)
@@ -3,7 +3,16 @@ from typing import List, Optional
 from pydantic import Field
 from dispatch.models import EvergreenBase, EvergreenMixin, PrimaryKey
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, PrimaryKeyConstraint, String, Table
+from sqlalchemy import (
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.schema import UniqueConstraint
 from sqlalchemy_utils import TSVectorType
@@ -25,7 +34,16 @@ assoc_service_filters = Table(
 
 # SQLAlchemy models...
 class Service(Base, TimeStampMixin, ProjectMixin, EvergreenMixin):
-    __table_args__ = (UniqueConstraint("external_id", "project_id"),)
+    __table_args__ = (
+        UniqueConstraint("external_id", "project_id"),
+        # supports typeahead lookups
+        Index(
+            "service_name_trgm_idx",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "public.gin_trgm_ops"},
+        ),
+    )
     id = Column(Integer, primary_key=True)
     is_active = Column(Boolean, default=True)
     name = Column(String)
@@ -249,3 +249,4 @@ class SignalInstanceRead(SignalInstanceBase):
 class SignalInstancePagination(DispatchBase):
     items: List[SignalInstanceRead]
     total: int
+    next: Optional[str]
@@ -4,12 +4,20 @@ from pydantic.error_wrappers import ErrorWrapper, ValidationError
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from dispatch.common.utils.views import create_export_response
 from dispatch.database.core import get_db
 from dispatch.exceptions import ExistsError
-from dispatch.database.service import common_parameters, search_filter_sort_paginate
+from dispatch.database.service import (
+    common_parameters,
+    export_parameters,
+    get_loading_plan,
+    search_filter_sort_paginate,
+    search_filter_sort_stream,
+)
 from dispatch.models import PrimaryKey
 
 from .models import (
+    SignalInstance,
     SignalCreate,
     SignalUpdate,
     SignalPagination,
@@ -29,6 +37,23 @@ def get_signal_instances(*, common: dict = Depends(common_parameters)):
     return search_filter_sort_paginate(model="SignalInstance", **common)
 
 
+@router.get("/instances/export", summary="Exports signal instances as NDJSON or CSV.")
+def export_signal_instances(*, export: dict = Depends(export_parameters)):
+    """Streams all signal instances matching the given search and filters."""
+    export_format = export.pop("export_format")
+    signal_instances = search_filter_sort_stream(
+        model="SignalInstance",
+        loading_plan=get_loading_plan(SignalInstance, SignalInstanceRead),
+        **export,
+    )
+    return create_export_response(
+        instances=signal_instances,
+        schema=SignalInstanceRead,
+        export_format=export_format,
+        filename="signal_instances",
+    )
+
+
 @router.get("", response_model=SignalPagination)
 def get_signals(*, common: dict = Depends(common_parameters)):
     """Get all signal definitions."""
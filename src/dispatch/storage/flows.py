@@ -5,6 +5,7 @@ from dispatch.database.core import SessionLocal
 from dispatch.database.core import get_table_name_by_class_instance
 from dispatch.event import service as event_service
 from dispatch.plugin import service as plugin_service
+from dispatch.tracing import traced
 
 from .enums import StorageAction
 from .models import Storage, StorageCreate
@@ -14,6 +15,7 @@ from .service import create
 log = logging.getLogger(__name__)
 
 
+@traced()
 def create_storage(subject: Any, storage_members: List[str], db_session: SessionLocal):
     """Creates a storage."""
     plugin = plugin_service.get_active_instance(
@@ -76,6 +78,7 @@ def create_storage(subject: Any, storage_members: List[str], db_session: Session
     return storage
 
 
+@traced()
 def update_storage(
     subject: Any,
     storage_action: StorageAction,
@@ -127,6 +130,7 @@ def update_storage(
         )
 
 
+@traced()
 def delete_storage(storage: Storage, db_session: SessionLocal):
     """Deletes an existing storage."""
     plugin = plugin_service.get_active_instance(
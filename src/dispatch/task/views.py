@@ -1,4 +1,3 @@
-import json
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
@@ -6,12 +5,16 @@ from sqlalchemy.orm import Session
 
 from dispatch.auth.models import DispatchUser
 from dispatch.auth.service import get_current_user
-from dispatch.common.utils.views import create_pydantic_include
+from dispatch.common.utils.views import ModelResponse, create_pagination_include
 from dispatch.database.core import get_db
-from dispatch.database.service import common_parameters, search_filter_sort_paginate
+from dispatch.database.service import (
+    common_parameters,
+    get_loading_plan,
+    search_filter_sort_paginate,
+)
 from dispatch.models import PrimaryKey
 
-from .models import TaskCreate, TaskUpdate, TaskRead, TaskPagination
+from .models import Task, TaskCreate, TaskUpdate, TaskRead, TaskPagination
 from .service import get, update, create, delete
 
 
@@ -23,21 +26,16 @@ def get_tasks(
     *, common: dict = Depends(common_parameters), include: List[str] = Query([], alias="include[]")
 ):
     """Retrieve all tasks."""
-    pagination = search_filter_sort_paginate(model="Task", **common)
+    pagination = search_filter_sort_paginate(
+        model="Task", loading_plan=get_loading_plan(Task, TaskRead), **common
+    )
 
     if include:
         # only allow two levels for now
-        include_sets = create_pydantic_include(include)
-
-        include_fields = {
-            "items": {"__all__": include_sets},
-            "itemsPerPage": ...,
-            "page": ...,
-            "total": ...,
-        }
-
-        return json.loads(TaskPagination(**pagination).json(include=include_fields))
-    return json.loads(TaskPagination(**pagination).json())
+        return ModelResponse(
+            TaskPagination(**pagination), include=create_pagination_include(include)
+        )
+    return ModelResponse(TaskPagination(**pagination))
 
 
 @router.post("", response_model=TaskRead, tags=["tasks"])
@@ -9,6 +9,7 @@ from dispatch.incident import service as incident_service
 from dispatch.incident.models import Incident
 from dispatch.incident.type import service as incident_type_service
 from dispatch.plugin import service as plugin_service
+from dispatch.tracing import traced
 
 from .models import Ticket, TicketCreate
 from .service import create
@@ -17,6 +18,7 @@ from .service import create
 log = logging.getLogger(__name__)
 
 
+@traced()
 def create_incident_ticket(incident: Incident, db_session: SessionLocal):
     """Creates a ticket for an incident."""
     plugin = plugin_service.get_active_instance(
@@ -59,6 +61,7 @@ def create_incident_ticket(incident: Incident, db_session: SessionLocal):
     return ticket
 
 
+@traced()
 def update_incident_ticket(
     incident_id: int,
     db_session: SessionLocal,
@@ -114,6 +117,7 @@ def update_incident_ticket(
     )
 
 
+@traced()
 def create_case_ticket(case: Case, db_session: SessionLocal):
     """Creates a ticket for a case."""
     plugin = plugin_service.get_active_instance(
@@ -171,6 +175,7 @@ def create_case_ticket(case: Case, db_session: SessionLocal):
     return ticket
 
 
+@traced()
 def update_case_ticket(
     case: Case,
     db_session: SessionLocal,
@@ -222,6 +227,7 @@ def update_case_ticket(
     )
 
 
+@traced()
 def delete_ticket(ticket: Ticket, db_session: SessionLocal):
     """Deletes a ticket."""
     plugin = plugin_service.get_active_instance(
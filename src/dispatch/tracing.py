@@ -0,0 +1,236 @@
+"""
+.. module: dispatch.tracing
+    :platform: Unix
+    :copyright: (c) 2019 by Netflix Inc., see AUTHORS for more
+    :license: Apache, see LICENSE for more details.
+
+A lightweight span API for timing the steps of long running flows.
+
+Spans opened while another span is in progress become its children. Every span
+is summarized into the `span.elapsed` metric, and once the outermost span of a
+trace ends, the trace is handed to the configured exporter as OpenTelemetry
+(OTLP) JSON.
+"""
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, List, Optional
+
+import requests
+
+from dispatch.config import (
+    TRACE_EXPORTER,
+    TRACE_EXPORT_QUEUE_SIZE,
+    TRACE_FILE_PATH,
+    TRACE_OTLP_ENDPOINT,
+)
+from dispatch.metrics import provider as metrics_provider
+
+
+log = logging.getLogger(__name__)
+
+
+class Span(object):
+    """A timed step of a trace."""
+
+    def __init__(self, name: str, parent: "Span" = None, attributes: dict = None):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        # the spans of the trace, shared by all of them and exported with the root
+        self.spans: List[Span] = parent.spans if parent else []
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self, error: Exception = None):
+        self.end_time = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.spans.append(self)
+
+    @property
+    def elapsed(self) -> float:
+        """The duration of the span, in seconds."""
+        return ((self.end_time or time.time_ns()) - self.start_time) / 1e9
+
+    def to_otel(self) -> dict:
+        """Returns the span in the OTLP JSON format."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # internal
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [get_otel_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+def get_otel_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def get_otel_trace(spans: List[Span]) -> dict:
+    """Returns the spans of a trace as an OTLP JSON export request."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [get_otel_attribute("service.name", "dispatch")]},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [span.to_otel() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class TraceExporter(object):
+    """Exports traces from a background thread, dropping them if it can't keep up."""
+
+    def __init__(self, maxsize: int = TRACE_EXPORT_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def send(self, trace: dict):
+        raise NotImplementedError
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                self.send(trace)
+            except Exception as e:
+                log.warning(f"Unable to export trace. Error: {e}")
+
+    def export(self, spans: List[Span]):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+
+        try:
+            self._queue.put_nowait(get_otel_trace(spans))
+        except queue.Full:
+            log.warning(f"Trace export queue full, dropped a trace of {len(spans)} span(s).")
+
+
+class FileTraceExporter(TraceExporter):
+    """Appends each trace to a file, one JSON document per line."""
+
+    def __init__(self, path: str = TRACE_FILE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def send(self, trace: dict):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(trace) + "\n")
+
+
+class OTLPTraceExporter(TraceExporter):
+    """Posts each trace to an OTLP/HTTP endpoint (e.g. an OpenTelemetry collector)."""
+
+    def __init__(self, endpoint: str = TRACE_OTLP_ENDPOINT, timeout: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def send(self, trace: dict):
+        response = requests.post(self.endpoint, json=trace, timeout=self.timeout)
+        response.raise_for_status()
+
+
+EXPORTERS = {"file": FileTraceExporter, "otlp": OTLPTraceExporter}
+
+exporter: Optional[TraceExporter] = None
+if TRACE_EXPORTER:
+    if TRACE_EXPORTER in EXPORTERS:
+        exporter = EXPORTERS[TRACE_EXPORTER]()
+    else:
+        log.warning(f"Unknown trace exporter {TRACE_EXPORTER}. Traces will not be exported.")
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_current_span() -> Optional[Span]:
+    """Returns the span in progress, if any."""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Records the duration and outcome of the block as a span.
+
+    Extra keyword arguments are recorded as span attributes (e.g. plugin_slug).
+    """
+    current = Span(name, parent=_current_span.get(), attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    else:
+        current.end()
+    finally:
+        _current_span.reset(token)
+
+        tags = {"span": name, "status": "error" if current.error else "ok"}
+        if "plugin_slug" in current.attributes:
+            tags["plugin"] = current.attributes["plugin_slug"]
+        metrics_provider.timer("span.elapsed", value=current.elapsed, tags=tags)
+
+        if current.parent is None and exporter:
+            exporter.export(current.spans)
+
+
+def get_span_name(func) -> str:
+    """Names a function's spans after its module, e.g. incident.flows.create_conversation."""
+    return f"{func.__module__.removeprefix('dispatch.')}.{func.__qualname__}"
+
+
+def traced(name: str = None, **attributes):
+    """Decorator that records each call of a function as a span."""
+
+    def decorator(func):
+        span_name = name or get_span_name(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
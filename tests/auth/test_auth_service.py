@@ -0,0 +1,92 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+
+def get_request(headers: dict, organization: str = "default") -> Request:
+    request = Request(
+        {
+            "type": "http",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+    request.state.organization = organization
+    return request
+
+
+@pytest.fixture
+def auth_provider(monkeypatch):
+    """Authenticates requests with the given provider, starting from an empty cache."""
+    from dispatch.auth import service
+
+    def use(plugin):
+        monkeypatch.setattr(service, "DISPATCH_AUTHENTICATION_PROVIDER_SLUG", plugin.slug)
+        monkeypatch.setattr(service, "DISPATCH_AUTHENTICATION_CACHE_TTL", 60)
+        monkeypatch.setattr(service.plugins, "get", lambda slug: plugin)
+        service.clear_credential_cache()
+        return plugin
+
+    yield use
+    service.clear_credential_cache()
+
+
+def test_get_current_user_email_header(auth_provider):
+    from dispatch.auth.service import get_current_user_email
+    from dispatch.config import DISPATCH_AUTHENTICATION_PROVIDER_HEADER_NAME as header_name
+    from dispatch.plugins.dispatch_core.plugin import HeaderAuthProviderPlugin
+
+    auth_provider(HeaderAuthProviderPlugin())
+
+    request = get_request({header_name: "victim@example.com"})
+    assert get_current_user_email(request) == "victim@example.com"
+
+    # the cache is keyed on the header the provider reads, not on Authorization
+    request = get_request(
+        {"Authorization": "victim@example.com", header_name: "attacker@example.com"}
+    )
+    assert get_current_user_email(request) == "attacker@example.com"
+
+    with pytest.raises(HTTPException):
+        get_current_user_email(get_request({"Authorization": "victim@example.com"}))
+
+
+def test_get_current_user_email_expired_token(auth_provider):
+    from jose import jwt
+
+    from dispatch.auth.service import get_current_user_email
+    from dispatch.config import DISPATCH_JWT_SECRET
+    from dispatch.plugins.dispatch_core.plugin import BasicAuthProviderPlugin
+
+    auth_provider(BasicAuthProviderPlugin())
+
+    exp = int(time.time()) + 1
+    token = jwt.encode({"email": "user@example.com", "exp": exp}, DISPATCH_JWT_SECRET)
+    request = get_request({"Authorization": f"Bearer {token}"})
+    assert get_current_user_email(request) == "user@example.com"
+
+    # the cached email expires with the token, not after the cache TTL
+    time.sleep(exp + 1 - time.time())
+    with pytest.raises(HTTPException):
+        get_current_user_email(get_request({"Authorization": f"Bearer {token}"}))
+
+
+def test_get_current_role(session, user, organization):
+    from dispatch.auth.models import DispatchUserOrganization
+    from dispatch.auth.service import get_current_role
+    from dispatch.enums import UserRoles
+
+    user_organization = DispatchUserOrganization(organization=organization, role=UserRoles.member)
+    user.organizations.append(user_organization)
+    session.commit()
+
+    request = get_request({}, organization=organization.slug)
+    assert get_current_role(request, current_user=user) == UserRoles.member
+
+    # roles aren't cached across requests, so changes apply right away
+    user_organization.role = UserRoles.admin
+    session.commit()
+
+    request = get_request({}, organization=organization.slug)
+    assert get_current_role(request, current_user=user) == UserRoles.admin
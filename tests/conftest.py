@@ -484,6 +484,11 @@ def incident(session):
     return IncidentFactory()
 
 
+@pytest.fixture
+def incidents(session):
+    return [IncidentFactory(), IncidentFactory()]
+
+
 @pytest.fixture
 def event(session):
     return EventFactory()
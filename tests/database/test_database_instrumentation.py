@@ -0,0 +1,80 @@
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def instrumented(monkeypatch):
+    """Instruments every unit of work."""
+    from dispatch.database import instrumentation
+
+    monkeypatch.setattr(instrumentation, "DATABASE_INSTRUMENTATION_ENABLED", True)
+    monkeypatch.setattr(instrumentation, "DATABASE_INSTRUMENTATION_SAMPLE_RATE", 1.0)
+
+
+def execute(statement: str):
+    """Runs the engine event listeners for a statement, like a cursor execution would."""
+    from dispatch.database.instrumentation import after_cursor_execute, before_cursor_execute
+
+    context = SimpleNamespace()
+    before_cursor_execute(None, None, statement, {}, context, False)
+    after_cursor_execute(None, None, statement, {}, context, False)
+
+
+def test_repeated():
+    from dispatch.database.instrumentation import QueryStats
+
+    stats = QueryStats("request", "/incidents")
+    for _ in range(3):
+        stats.record("SELECT participant", 0.001)
+    for _ in range(5):
+        stats.record("SELECT tag", 0.001)
+    stats.record("SELECT incident", 0.001)
+
+    assert stats.count == 9
+    assert stats.repeated(threshold=3) == [("SELECT tag", 5), ("SELECT participant", 3)]
+    assert stats.repeated(threshold=6) == []
+
+
+def test_slowest():
+    from dispatch.database.instrumentation import QueryStats
+
+    stats = QueryStats("request", "/incidents")
+    stats.record("SELECT a", 0.001)
+    stats.record("SELECT a", 0.5)
+    stats.record("SELECT b", 0.2)
+    stats.record("SELECT c", 0.01)
+
+    # ranked by their slowest single execution
+    assert stats.slowest(n=2) == [("SELECT a", 0.5), ("SELECT b", 0.2)]
+    assert stats.elapsed == pytest.approx(0.711)
+
+
+def test_instrument_nested(instrumented):
+    from dispatch.database.instrumentation import get_query_stats, instrument
+
+    with instrument("request", "/incidents") as stats:
+        execute("SELECT incident")
+        with instrument("background", "flow") as nested:
+            assert nested is None
+            assert get_query_stats() is stats
+            execute("SELECT participant")
+
+    assert stats.count == 2
+    assert set(stats.statements) == {"SELECT incident", "SELECT participant"}
+    assert get_query_stats() is None
+
+
+def test_instrument_finished(instrumented):
+    from dispatch.database.instrumentation import get_query_stats, instrument
+
+    with instrument("request", "/incidents") as stats:
+        # e.g. a background task started by the request, which outlives it
+        context = contextvars.copy_context()
+        execute("SELECT incident")
+
+    assert stats.finished
+    assert context.run(get_query_stats) is None
+    context.run(execute, "SELECT participant")
+    assert stats.count == 1
@@ -0,0 +1,215 @@
+import pytest
+from pydantic import ValidationError
+
+
+def get_pages(session, **kwargs) -> list:
+    """Follows the cursors of a keyset paginated query, returning the items of every page."""
+    from dispatch.database.service import search_filter_sort_paginate
+
+    items, cursor = [], ""
+    while cursor is not None:
+        page = search_filter_sort_paginate(
+            db_session=session, model="Tag", items_per_page=2, cursor=cursor, **kwargs
+        )
+        items += page["items"]
+        cursor = page["next"]
+    return items
+
+
+def get_source_filter(source: str) -> list:
+    return [{"model": "Tag", "field": "source", "op": "==", "value": source}]
+
+
+def test_encode_decode_cursor():
+    from datetime import datetime
+
+    from dispatch.database.service import decode_cursor, encode_cursor
+    from dispatch.tag.models import Tag
+
+    columns = [(Tag.created_at, True), (Tag.id, True)]
+    created_at = datetime(2023, 1, 2, 3, 4, 5)
+
+    assert decode_cursor(encode_cursor([created_at, 7]), columns) == [created_at, 7]
+    assert decode_cursor(encode_cursor([None, 7]), columns) == [None, 7]
+
+
+def test_decode_cursor_invalid():
+    from dispatch.database.service import decode_cursor, encode_cursor
+    from dispatch.tag.models import Tag
+
+    columns = [(Tag.name, False), (Tag.id, False)]
+
+    with pytest.raises(ValidationError):
+        decode_cursor("not a cursor", columns)
+
+    with pytest.raises(ValidationError):
+        decode_cursor(encode_cursor([1]), columns)
+
+
+def test_keyset_paginate_nulls(session):
+    from tests.factories import TagFactory
+
+    descriptions = [None, "b", None, "a", "c"]
+    tags = [TagFactory(source="keyset-nulls", description=d) for d in descriptions]
+    by_description = {d: sorted(t.id for t in tags if t.description == d) for d in descriptions}
+
+    # NULLs sort last in ascending order, ties are broken by id
+    items = get_pages(
+        session,
+        filter_spec=get_source_filter("keyset-nulls"),
+        sort_by=["description"],
+        descending=[False],
+    )
+    expected = by_description["a"] + by_description["b"] + by_description["c"]
+    assert [t.id for t in items] == expected + by_description[None]
+
+    # and first in descending order
+    items = get_pages(
+        session,
+        filter_spec=get_source_filter("keyset-nulls"),
+        sort_by=["description"],
+        descending=[True],
+    )
+    expected = sorted(by_description[None], reverse=True)
+    expected += by_description["c"] + by_description["b"] + by_description["a"]
+    assert [t.id for t in items] == expected
+
+
+def test_keyset_paginate_search(session):
+    from tests.factories import TagFactory
+
+    tags = [TagFactory(source="keyset-search", name=f"keyset {i}") for i in range(5)]
+
+    # the search rank doesn't apply to cursor pages, which follow the keyset order
+    items = get_pages(session, query_str="keyset", filter_spec=get_source_filter("keyset-search"))
+    assert [t.id for t in items] == sorted((t.id for t in tags), reverse=True)
+
+
+def test_keyset_paginate_sort_mismatch(session):
+    from dispatch.database.service import search_filter_sort_paginate
+
+    with pytest.raises(ValidationError):
+        search_filter_sort_paginate(
+            db_session=session,
+            model="Tag",
+            cursor="",
+            sort_by=["name", "description"],
+            descending=[False],
+        )
+
+
+def test_search_filter_distinct(session):
+    from dispatch.enums import UserRoles
+    from dispatch.database.service import search_filter
+
+    query = search_filter(
+        db_session=session,
+        model="Incident",
+        filter_spec=[{"model": "Incident", "field": "status", "op": "==", "value": "Active"}],
+        role=UserRoles.admin,
+    )
+    assert not query._distinct
+
+    query = search_filter(
+        db_session=session,
+        model="Incident",
+        filter_spec=[{"model": "Tag", "field": "name", "op": "==", "value": "tag"}],
+        role=UserRoles.admin,
+    )
+    assert query._distinct
+
+
+def test_search_filter_sort_stream_ndjson(session, incident):
+    import json
+
+    from dispatch.common.utils.views import stream_ndjson
+    from dispatch.database.service import get_loading_plan, search_filter_sort_stream
+    from dispatch.enums import UserRoles
+    from dispatch.incident.models import Incident, IncidentReadMinimal
+
+    session.commit()
+
+    # the stream runs in its own session, fetching rows in batches
+    incidents = search_filter_sort_stream(
+        db_session=session,
+        model="Incident",
+        filter_spec=[{"model": "Incident", "field": "id", "op": "==", "value": incident.id}],
+        role=UserRoles.admin,
+        loading_plan=get_loading_plan(Incident, IncidentReadMinimal),
+        batch_size=1,
+    )
+    lines = b"".join(stream_ndjson(incidents, IncidentReadMinimal)).decode("utf-8").splitlines()
+
+    assert len(lines) == 1
+    row = json.loads(lines[0])
+    assert row["id"] == incident.id
+    assert row["title"] == incident.title
+
+
+def test_search_filter_sort_stream_csv(session, incidents):
+    import csv
+    import io
+
+    from dispatch.common.utils.views import stream_csv
+    from dispatch.database.service import get_loading_plan, search_filter_sort_stream
+    from dispatch.enums import UserRoles
+    from dispatch.incident.models import Incident, IncidentReadMinimal
+
+    session.commit()
+    ids = sorted(i.id for i in incidents)
+
+    instances = search_filter_sort_stream(
+        db_session=session,
+        model="Incident",
+        filter_spec=[{"model": "Incident", "field": "id", "op": "in", "value": ids}],
+        role=UserRoles.admin,
+        loading_plan=get_loading_plan(Incident, IncidentReadMinimal),
+    )
+    content = b"".join(stream_csv(instances, IncidentReadMinimal)).decode("utf-8")
+
+    reader = csv.DictReader(io.StringIO(content))
+    assert reader.fieldnames == list(IncidentReadMinimal.__fields__)
+    assert [int(row["id"]) for row in reader] == ids
+
+    # the header is sent even when there's nothing to export
+    content = b"".join(stream_csv([], IncidentReadMinimal)).decode("utf-8")
+    assert content.splitlines() == [",".join(IncidentReadMinimal.__fields__)]
+
+
+def test_search_filter_sort_stream_restricted(session, user):
+    from dispatch.database.service import search_filter_sort_stream
+    from dispatch.enums import UserRoles, Visibility
+    from tests.factories import EventFactory, IncidentFactory
+
+    open_incident = IncidentFactory(visibility=Visibility.open)
+    restricted_incident = IncidentFactory(visibility=Visibility.restricted)
+    open_event = EventFactory(incident=open_incident)
+    restricted_event = EventFactory(incident=restricted_incident)
+    session.commit()
+
+    # members can't export restricted incidents they don't participate in, nor their events
+    ids = {
+        i.id
+        for i in search_filter_sort_stream(
+            db_session=session, model="Incident", current_user=user, role=UserRoles.member
+        )
+    }
+    assert open_incident.id in ids
+    assert restricted_incident.id not in ids
+
+    ids = {
+        e.id
+        for e in search_filter_sort_stream(
+            db_session=session, model="Event", current_user=user, role=UserRoles.member
+        )
+    }
+    assert open_event.id in ids
+    assert restricted_event.id not in ids
+
+    ids = {
+        e.id
+        for e in search_filter_sort_stream(
+            db_session=session, model="Event", current_user=user, role=UserRoles.admin
+        )
+    }
+    assert restricted_event.id in ids
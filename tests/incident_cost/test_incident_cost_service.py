@@ -48,3 +48,57 @@ def test_delete(session, incident_cost):
 
     delete(db_session=session, incident_cost_id=incident_cost.id)
     assert not get(db_session=session, incident_cost_id=incident_cost.id)
+
+
+def test_upsert_amounts(session, incident, incident_cost_type):
+    from datetime import datetime
+
+    from dispatch.incident_cost.service import (
+        get_by_incident_id_and_incident_cost_type_id,
+        upsert_amounts,
+    )
+
+    for amount in [100, 200]:
+        upsert_amounts(
+            db_session=session,
+            incident_cost_type=incident_cost_type,
+            amounts={incident.id: amount},
+            calculated_at=datetime.utcnow(),
+        )
+
+    incident_cost = get_by_incident_id_and_incident_cost_type_id(
+        db_session=session, incident_id=incident.id, incident_cost_type_id=incident_cost_type.id
+    )
+    assert incident_cost.amount == 200
+
+
+def test_get_stale_response_costs(session, incident, incident_cost_type):
+    from datetime import datetime, timedelta
+
+    from dispatch.incident.enums import IncidentStatus
+    from dispatch.incident_cost.service import get_stale_response_costs, upsert_amounts
+
+    incident.status = IncidentStatus.closed
+    incident.stable_at = datetime.utcnow() - timedelta(days=1)
+    session.commit()
+
+    def get_stale_incidents():
+        return [
+            stale_incident
+            for stale_incident, _ in get_stale_response_costs(
+                db_session=session,
+                project_id=incident.project_id,
+                incident_cost_type_id=incident_cost_type.id,
+            )
+        ]
+
+    # closed incidents without a cost are calculated once
+    assert incident in get_stale_incidents()
+
+    upsert_amounts(
+        db_session=session,
+        incident_cost_type=incident_cost_type,
+        amounts={incident.id: 100},
+        calculated_at=datetime.utcnow(),
+    )
+    assert incident not in get_stale_incidents()
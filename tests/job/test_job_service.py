@@ -0,0 +1,142 @@
+def delete_jobs(session):
+    """Deletes the jobs queued by other tests (the service commits them), so claims are
+    deterministic."""
+    from dispatch.job.models import Job
+
+    session.query(Job).delete()
+    session.commit()
+
+
+def test_create(session):
+    from dispatch.job.enums import JobStatus
+    from dispatch.job.service import create
+
+    job = create(
+        db_session=session,
+        name="dispatch.incident.flows:incident_create_flow",
+        organization_slug="default",
+        arguments={"incident_id": 1, "organization_slug": "default"},
+    )
+    assert job.status == JobStatus.pending
+    assert job.attempts == 0
+
+
+def test_create_idempotent(session):
+    from dispatch.job.service import create
+
+    kwargs = {
+        "name": "dispatch.incident.flows:incident_create_flow",
+        "organization_slug": "default",
+        "arguments": {"incident_id": 2, "organization_slug": "default"},
+        "idempotency_key": "incident-create-2",
+    }
+    job = create(db_session=session, **kwargs)
+    t_job = create(db_session=session, **kwargs)
+    assert t_job.id == job.id
+    assert job.idempotency_key == "default:incident-create-2"
+
+
+def test_enqueue(session):
+    from dispatch.incident.flows import incident_add_or_reactivate_participant_flow
+    from dispatch.job.service import enqueue
+
+    job = enqueue(
+        db_session=session,
+        func=incident_add_or_reactivate_participant_flow,
+        args=("user@example.com",),
+        kwargs={"incident_id": 3, "organization_slug": "default"},
+    )
+    assert job.name == "dispatch.incident.flows:incident_add_or_reactivate_participant_flow"
+    assert job.arguments == {
+        "user_email": "user@example.com",
+        "incident_id": 3,
+        "organization_slug": "default",
+    }
+    # flows are only retried if they opt in
+    assert job.max_attempts == 1
+
+
+def test_enqueue_max_attempts(session):
+    from dispatch.incident.flows import incident_add_participant_to_tactical_group_flow
+    from dispatch.job.service import enqueue
+
+    job = enqueue(
+        db_session=session,
+        func=incident_add_participant_to_tactical_group_flow,
+        args=("user@example.com",),
+        kwargs={"incident_id": 3, "organization_slug": "default"},
+    )
+    assert job.max_attempts == 3
+
+
+def test_claim_and_finish(session):
+    from dispatch.job.enums import JobStatus
+    from dispatch.job.service import claim, create, finish, get
+
+    delete_jobs(session)
+    job = create(
+        db_session=session,
+        name="dispatch.incident.flows:incident_create_flow",
+        organization_slug="claimed",
+        arguments={"incident_id": 4, "organization_slug": "claimed"},
+    )
+
+    t_job = claim(db_session=session, worker_id="worker-a", ttl=60, tenant_concurrency=100)
+    assert t_job.id == job.id
+    assert t_job.status == JobStatus.running
+    assert t_job.locked_by == "worker-a"
+    assert t_job.attempts == 1
+
+    finish(db_session=session, job_id=t_job.id, worker_id="worker-a")
+    t_job = get(db_session=session, job_id=job.id)
+    session.refresh(t_job)
+    assert t_job.status == JobStatus.succeeded
+
+
+def test_finish_retry(session):
+    from dispatch.job.enums import JobStatus
+    from dispatch.job.service import claim, create, finish, get
+
+    delete_jobs(session)
+    job = create(
+        db_session=session,
+        name="dispatch.incident.flows:incident_create_flow",
+        organization_slug="retried",
+        arguments={"incident_id": 5, "organization_slug": "retried"},
+        max_attempts=3,
+    )
+    t_job = claim(db_session=session, worker_id="worker-a", ttl=60, tenant_concurrency=100)
+    assert t_job.id == job.id
+
+    finish(
+        db_session=session, job_id=job.id, worker_id="worker-a", error="Error: boom", retry_in=30
+    )
+    t_job = get(db_session=session, job_id=job.id)
+    session.refresh(t_job)
+    assert t_job.status == JobStatus.pending
+    assert t_job.error == "Error: boom"
+    assert t_job.locked_by is None
+
+
+def test_finish_retry_exhausted(session):
+    from dispatch.job.enums import JobStatus
+    from dispatch.job.service import claim, create, finish, get
+
+    delete_jobs(session)
+    job = create(
+        db_session=session,
+        name="dispatch.incident.flows:incident_create_flow",
+        organization_slug="exhausted",
+        arguments={"incident_id": 6, "organization_slug": "exhausted"},
+    )
+    t_job = claim(db_session=session, worker_id="worker-a", ttl=60, tenant_concurrency=100)
+    assert t_job.id == job.id
+
+    # out of attempts, the job fails instead of waiting for a claim that never comes
+    finish(
+        db_session=session, job_id=job.id, worker_id="worker-a", error="Error: boom", retry_in=30
+    )
+    t_job = get(db_session=session, job_id=job.id)
+    session.refresh(t_job)
+    assert t_job.status == JobStatus.failed
+    assert t_job.finished_at is not None
@@ -0,0 +1,55 @@
+def test_acquire(session):
+    from dispatch.lease.service import acquire, get
+
+    assert acquire(db_session=session, key="task:default:1", owner="replica-a", ttl=60)
+
+    t_lease = get(db_session=session, key="task:default:1")
+    assert t_lease.owner == "replica-a"
+    assert t_lease.expires_at > t_lease.acquired_at
+
+
+def test_acquire_held(session):
+    from dispatch.lease.service import acquire, get
+
+    acquire(db_session=session, key="task:default:2", owner="replica-a", ttl=60)
+
+    assert not acquire(db_session=session, key="task:default:2", owner="replica-b", ttl=60)
+    assert not acquire(db_session=session, key="task:default:2", owner="replica-a", ttl=60)
+    assert get(db_session=session, key="task:default:2").owner == "replica-a"
+
+
+def test_acquire_expired(session):
+    from dispatch.lease.service import acquire, get
+
+    acquire(db_session=session, key="task:default:3", owner="replica-a", ttl=-1)
+
+    assert acquire(db_session=session, key="task:default:3", owner="replica-b", ttl=60)
+    assert get(db_session=session, key="task:default:3").owner == "replica-b"
+
+
+def test_renew(session):
+    from dispatch.lease.service import acquire, renew
+
+    acquire(db_session=session, key="task:default:4", owner="replica-a", ttl=60)
+    acquire(db_session=session, key="task:default:5", owner="replica-b", ttl=60)
+
+    renewed = renew(
+        db_session=session,
+        keys=["task:default:4", "task:default:5"],
+        owner="replica-a",
+        ttl=120,
+    )
+    assert renewed == ["task:default:4"]
+
+
+def test_release(session):
+    from datetime import timedelta
+
+    from dispatch.lease.service import acquire, get, release
+
+    acquire(db_session=session, key="task:default:6", owner="replica-a", ttl=60)
+    release(db_session=session, key="task:default:6", owner="replica-a", hold_for=300)
+
+    t_lease = get(db_session=session, key="task:default:6")
+    session.refresh(t_lease)
+    assert t_lease.expires_at == t_lease.acquired_at + timedelta(seconds=300)
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+
+def get_route_matcher(*paths):
+    from dispatch.main import RouteMatcher
+
+    return RouteMatcher([SimpleNamespace(path=path) for path in paths])
+
+
+def test_route_matcher_static_over_param():
+    route_matcher = get_route_matcher(
+        "/{organization}/incidents/{incident_id}",
+        "/{organization}/incidents/export",
+    )
+
+    # static segments are preferred, whatever the order routes were added in
+    assert route_matcher.match("/default/incidents/export") == (
+        "/{organization}/incidents/export",
+        {"organization": "default"},
+    )
+    assert route_matcher.match("/default/incidents/1") == (
+        "/{organization}/incidents/{incident_id}",
+        {"organization": "default", "incident_id": "1"},
+    )
+
+
+def test_route_matcher_first_match():
+    route_matcher = get_route_matcher(
+        "/{organization}/incidents/{incident_id}",
+        "/{organization}/incidents/{incident_name}",
+    )
+
+    # routes of the same shape are tried in the order they were added
+    template, path_params = route_matcher.match("/default/incidents/1")
+    assert template == "/{organization}/incidents/{incident_id}"
+    assert path_params == {"organization": "default", "incident_id": "1"}
+
+
+def test_route_matcher_converters():
+    route_matcher = get_route_matcher(
+        "/{organization}/incidents/{incident_id:int}",
+        "/{organization}/documents/{file_path:path}",
+    )
+
+    assert route_matcher.match("/default/incidents/1") == (
+        "/{organization}/incidents/{incident_id:int}",
+        {"organization": "default", "incident_id": "1"},
+    )
+    # the regular expression of a candidate still has to match
+    assert route_matcher.match("/default/incidents/abc") == (None, {})
+    assert route_matcher.match("/default/documents/a/b.txt") == (
+        "/{organization}/documents/{file_path:path}",
+        {"organization": "default", "file_path": "a/b.txt"},
+    )
+
+
+def test_route_matcher_unmatched():
+    route_matcher = get_route_matcher("/{organization}/incidents", "/healthcheck")
+
+    assert route_matcher.match("/healthcheck") == ("/healthcheck", {})
+    assert route_matcher.match("/default/cases") == (None, {})
+    assert route_matcher.match("/default/incidents/1") == (None, {})
+    # params don't match empty segments
+    assert route_matcher.match("//incidents") == (None, {})
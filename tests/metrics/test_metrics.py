@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def metrics():
+    """A metrics buffer with a provider, without its background flusher."""
+    from dispatch.metrics import Metrics
+
+    metrics = Metrics(max_series=3)
+    metrics._providers = ["test-metric"]
+    metrics._pid = os.getpid()
+    return metrics
+
+
+def get_metric_plugin():
+    from dispatch.plugins.bases.metric import MetricPlugin
+
+    class TestMetricPlugin(MetricPlugin):
+        slug = "test-metric"
+
+        def __init__(self):
+            self.sent = []
+
+        def gauge(self, name, value, tags=None):
+            self.sent.append(("gauge", name, value, tags))
+
+        def counter(self, name, value=None, tags=None):
+            self.sent.append(("counter", name, value, tags))
+
+        def timer(self, name, value, tags=None):
+            self.sent.append(("timer", name, value, tags))
+
+    return TestMetricPlugin()
+
+
+def test_record_aggregates(metrics):
+    metrics.counter("requests", tags={"route": "/a"})
+    metrics.counter("requests", value=2, tags={"route": "/a"})
+    metrics.counter("requests", tags={"route": "/b"})
+    metrics.gauge("queue.depth", 3)
+    metrics.gauge("queue.depth", 1)
+
+    collected = {(m.type, m.name, str(m.tags)): m.value for m in metrics.collect()}
+    assert collected == {
+        ("counter", "requests", "{'route': '/a'}"): 3,
+        ("counter", "requests", "{'route': '/b'}"): 1,
+        ("gauge", "queue.depth", "None"): 1,
+    }
+
+    # collecting empties the buffer
+    assert metrics.collect() == []
+
+
+def test_histogram_buckets():
+    from dispatch.metrics import Histogram
+
+    histogram = Histogram(buckets=(0.1, 1.0, float("inf")))
+    for value in (0.1, 0.2, 1.0, 1.5):
+        histogram.observe(value)
+
+    # upper bounds are inclusive, like Prometheus' `le`
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.sums == pytest.approx([0.1, 1.2, 1.5])
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.8)
+    assert (histogram.min, histogram.max) == (0.1, 1.5)
+    assert histogram.mean == pytest.approx(0.7)
+
+
+def test_record_drops_new_series(metrics):
+    for i in range(5):
+        metrics.counter(f"counter.{i}")
+    # existing series are still aggregated
+    metrics.counter("counter.0")
+
+    assert metrics.dropped == 2
+    collected = {m.name: m.value for m in metrics.collect()}
+    assert collected == {"counter.0": 2, "counter.1": 1, "counter.2": 1}
+    assert metrics.dropped == 0
+
+
+def test_flush(metrics):
+    plugin = get_metric_plugin()
+    metrics._plugins = [plugin]
+
+    metrics.counter("requests", value=2)
+    metrics.gauge("queue.depth", 5, tags={"queue": "default"})
+    metrics.timer("elapsed", 1.0)
+    metrics.timer("elapsed", 3.0)
+    metrics.flush()
+
+    # aggregated timers are sent as their mean by providers without histograms
+    assert sorted(plugin.sent) == [
+        ("counter", "requests", 2, None),
+        ("gauge", "queue.depth", 5, {"queue": "default"}),
+        ("timer", "elapsed", 2.0, None),
+    ]
+
+    # nothing left to send
+    plugin.sent.clear()
+    metrics.flush()
+    assert plugin.sent == []
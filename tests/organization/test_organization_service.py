@@ -13,6 +13,7 @@ def test_get_all(session, organizations):
 
 
 def test_create(session):
+    from dispatch.database.tenant import tenant_registry
     from dispatch.organization.service import create
     from dispatch.organization.models import OrganizationCreate
 
@@ -33,6 +34,7 @@ def test_create(session):
     )
     organization = create(db_session=session, organization_in=organization_in)
     assert organization
+    assert organization.slug in tenant_registry
 
 
 def test_update(session, organization):
@@ -59,3 +61,12 @@ def test_delete(session, organization):
 
     delete(db_session=session, organization_id=organization.id)
     assert not get(db_session=session, organization_id=organization.id)
+
+
+def test_delete_unregisters_tenant(session, organization):
+    from dispatch.database.tenant import tenant_registry
+    from dispatch.organization.service import delete
+
+    tenant_registry.register(organization.slug)
+    delete(db_session=session, organization_id=organization.id)
+    assert organization.slug not in tenant_registry
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+
+class FakeResponse(object):
+    def __init__(self, keys, headers=None):
+        self._keys = keys
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"keys": self._keys}
+
+
+def test_token_cache_expires():
+    from dispatch.plugins.dispatch_core.jwks import TokenCache
+
+    token_cache = TokenCache()
+    token_cache.set_claims("token", {"email": "user@example.com", "exp": time.time() + 1})
+    assert token_cache.get_claims("token")["email"] == "user@example.com"
+
+    # cached claims expire with their token
+    time.sleep(1.1)
+    assert token_cache.get_claims("token") is None
+
+    # tokens without an expiration aren't cached
+    token_cache.set_claims("token", {"email": "user@example.com"})
+    assert token_cache.get_claims("token") is None
+
+
+def test_jwks_cache_unknown_kid(monkeypatch):
+    from dispatch.plugins.dispatch_core import jwks
+
+    fetches = []
+
+    def get(url, timeout=None):
+        fetches.append(url)
+        return FakeResponse([{"kid": "known"}])
+
+    monkeypatch.setattr(jwks.requests, "get", get)
+    jwks_cache = jwks.JWKSCache("https://example.com/jwks", min_refresh_interval=30)
+
+    assert jwks_cache.get_key("known") == {"kid": "known"}
+    assert len(fetches) == 1
+
+    # unknown kids don't refetch the key set more than once per min_refresh_interval
+    for _ in range(5):
+        assert jwks_cache.get_key("unknown") is None
+    assert len(fetches) == 1
+
+    jwks_cache._fetched_at -= 30
+    assert jwks_cache.get_key("unknown") is None
+    assert len(fetches) == 2
+
+
+def test_jwks_cache_ttl_floor(monkeypatch):
+    from dispatch.plugins.dispatch_core import jwks
+
+    monkeypatch.setattr(
+        jwks.requests,
+        "get",
+        lambda url, timeout=None: FakeResponse([{"kid": "known"}], {"Cache-Control": "no-cache"}),
+    )
+    jwks_cache = jwks.JWKSCache("https://example.com/jwks", min_refresh_interval=30)
+    jwks_cache.fetch()
+
+    # no-cache doesn't have every request refresh the key set
+    assert jwks_cache._expires_at - jwks_cache._fetched_at == pytest.approx(30)
+
+
+def test_jwks_cache_fetch_error(monkeypatch):
+    from dispatch.plugins.dispatch_core import jwks
+
+    monkeypatch.setattr(
+        jwks.requests, "get", lambda url, timeout=None: FakeResponse([{"kid": "known"}])
+    )
+    jwks_cache = jwks.JWKSCache("https://example.com/jwks", min_refresh_interval=30)
+    jwks_cache.fetch()
+
+    def get(url, timeout=None):
+        raise Exception("unavailable")
+
+    # the last known keys are kept
+    monkeypatch.setattr(jwks.requests, "get", get)
+    jwks_cache.fetch()
+    assert jwks_cache.get_key("known") == {"kid": "known"}
+    assert jwks_cache._expires_at - jwks_cache._fetched_at == pytest.approx(30)
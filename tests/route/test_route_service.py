@@ -0,0 +1,40 @@
+def test_get(session, incident, document, search_filter):
+    from dispatch.document.models import Document, DocumentRead
+    from dispatch.route.service import get
+
+    search_filter.project = incident.project
+    search_filter.expression = {
+        "and": [{"model": "Incident", "field": "id", "op": "==", "value": incident.id}]
+    }
+    document.project = incident.project
+    document.filters = [search_filter]
+    session.commit()
+
+    recommendation = get(
+        db_session=session, incident=incident, models=[(Document, DocumentRead)], persist=False
+    )
+    assert [m.resource_state["id"] for m in recommendation.matches] == [document.id]
+    assert not recommendation.id
+
+
+def test_get_invalidates_index(session, incident, document, search_filter):
+    from dispatch.document.models import Document, DocumentRead
+    from dispatch.route.service import get
+
+    search_filter.project = incident.project
+    search_filter.expression = {
+        "and": [{"model": "Incident", "field": "id", "op": "!=", "value": incident.id}]
+    }
+    document.project = incident.project
+    document.filters = [search_filter]
+    session.commit()
+
+    models = [(Document, DocumentRead)]
+    assert not get(db_session=session, incident=incident, models=models).matches
+
+    search_filter.expression = {
+        "and": [{"model": "Incident", "field": "id", "op": "==", "value": incident.id}]
+    }
+    session.commit()
+
+    assert get(db_session=session, incident=incident, models=models).matches
@@ -0,0 +1,152 @@
+import threading
+import time
+
+import schedule
+
+
+def get_task(func, **kwargs) -> dict:
+    """Returns a task as registered by Scheduler.add, without registering it."""
+    from dispatch.config import SCHEDULER_TASK_TIMEOUT
+    from dispatch.enums import SchedulerPolicies
+
+    return {
+        "name": func.__name__,
+        "func": func,
+        "policy": kwargs.get("policy", SchedulerPolicies.skip),
+        "timeout": kwargs.get("timeout", SCHEDULER_TASK_TIMEOUT),
+        "leased_by_unit": False,
+        "job": schedule.Scheduler().every(1).hours.do(func),
+    }
+
+
+def wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the scheduler"
+        time.sleep(0.01)
+
+
+def test_submit_skip():
+    from dispatch.scheduler import Scheduler
+
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def task():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+
+    scheduler = Scheduler(max_workers=2, leases_enabled=False)
+    t_task = get_task(task)
+
+    scheduler.submit(t_task)
+    assert started.wait(5)
+
+    # due while the previous run is in progress, the run is dropped
+    scheduler.submit(t_task)
+    scheduler.submit(t_task)
+    release.set()
+
+    wait_for(lambda: not scheduler._runs)
+    assert len(calls) == 1
+
+
+def test_submit_coalesce():
+    from dispatch.enums import SchedulerPolicies
+    from dispatch.scheduler import Scheduler
+
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def task():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+
+    scheduler = Scheduler(max_workers=2, leases_enabled=False)
+    t_task = get_task(task, policy=SchedulerPolicies.coalesce)
+
+    scheduler.submit(t_task)
+    assert started.wait(5)
+
+    # however many times it was due in the meantime, the task runs once more
+    scheduler.submit(t_task)
+    scheduler.submit(t_task)
+    release.set()
+
+    wait_for(lambda: len(calls) == 2 and not scheduler._runs)
+    time.sleep(0.1)
+    assert len(calls) == 2
+
+
+def test_is_timed_out():
+    from dispatch.scheduler import Scheduler, is_timed_out
+
+    results = []
+
+    def task():
+        results.append(is_timed_out())
+        time.sleep(0.1)
+        results.append(is_timed_out())
+
+    scheduler = Scheduler(max_workers=1, leases_enabled=False)
+    scheduler.submit(get_task(task, timeout=0.05))
+
+    wait_for(lambda: not scheduler._runs)
+    assert results == [False, True]
+
+    # outside of a scheduled run
+    assert not is_timed_out()
+
+
+def test_check_timeouts():
+    from dispatch.scheduler import Scheduler, TaskRun
+
+    scheduler = Scheduler(max_workers=1, leases_enabled=False)
+    run = scheduler._runs["task"] = TaskRun("task", timeout=0.05)
+    run.started_at = time.monotonic()
+
+    scheduler.check_timeouts()
+    assert not run.timed_out
+
+    time.sleep(0.1)
+    scheduler.check_timeouts()
+    assert run.timed_out
+
+
+def test_scheduled_project_task_fanout(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from dispatch import decorators
+    from dispatch.decorators import ProjectUnit, scheduled_project_task
+    from dispatch.enums import SchedulerFanoutModes
+
+    units = [ProjectUnit("default", project_id) for project_id in range(1, 5)]
+    monkeypatch.setattr(decorators, "get_project_units", lambda db_session: units)
+    monkeypatch.setattr(decorators, "get_schema_session", lambda slug: MagicMock())
+    monkeypatch.setattr(
+        decorators.project_service, "get", lambda *, db_session, project_id: project_id
+    )
+
+    counters = []
+    monkeypatch.setattr(
+        decorators.metrics_provider,
+        "counter",
+        lambda name, value=None, tags=None: counters.append(name),
+    )
+
+    calls = []
+
+    @scheduled_project_task(mode=SchedulerFanoutModes.thread, concurrency=2)
+    def task(db_session, project):
+        calls.append((project, threading.current_thread().name))
+        if project == 2:
+            raise Exception("unit failed")
+
+    task()
+
+    # the failing project doesn't keep the others from running
+    assert sorted(project for project, _ in calls) == [1, 2, 3, 4]
+    assert all(name.startswith("scheduled-project") for _, name in calls)
+    assert counters.count("function.unit.error.counter") == 1
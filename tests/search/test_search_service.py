@@ -0,0 +1,19 @@
+def test_typeahead(session, tag):
+    from dispatch.enums import TypeaheadTypes
+    from dispatch.search.typeahead import typeahead
+
+    tags = typeahead(
+        db_session=session,
+        model=TypeaheadTypes.tag,
+        query_str=tag.name[:3],
+        project_id=tag.project.id,
+    )
+    assert tag in tags
+
+    tags = typeahead(
+        db_session=session,
+        model=TypeaheadTypes.tag,
+        query_str=tag.name,
+        project_id=tag.project.id + 1,
+    )
+    assert tag not in tags
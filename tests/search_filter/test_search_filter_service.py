@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_get(session, search_filter):
     from dispatch.search_filter.service import get
 
@@ -43,3 +46,109 @@ def test_delete(session, search_filter):
 
     delete(db_session=session, search_filter_id=search_filter.id)
     assert not get(db_session=session, search_filter_id=search_filter.id)
+
+
+def test_match(session, incident):
+    from dispatch.search_filter.service import match
+
+    filter_spec = {"and": [{"model": "Incident", "field": "id", "op": "==", "value": incident.id}]}
+    assert match(db_session=session, filter_spec=filter_spec, class_instance=incident)
+
+    filter_spec = {"and": [{"model": "Incident", "field": "id", "op": "!=", "value": incident.id}]}
+    assert not match(db_session=session, filter_spec=filter_spec, class_instance=incident)
+
+
+def test_compile_filter_spec_is_cached():
+    from dispatch.database.service import compile_filter_spec
+    from dispatch.incident.models import Incident
+
+    filter_spec = {"and": [{"model": "Incident", "field": "title", "op": "==", "value": "a"}]}
+    reordered_spec = {"and": [{"value": "a", "op": "==", "field": "title", "model": "Incident"}]}
+
+    compiled = compile_filter_spec(Incident, filter_spec)
+    assert compiled
+    assert compile_filter_spec(Incident, reordered_spec) is compiled
+
+
+def test_evaluate_matches_sql(session, incident, tag):
+    from dispatch.search_filter.evaluator import UnsupportedFilterError, evaluate
+    from dispatch.search_filter.service import match, match_sql
+
+    incident.tags.append(tag)
+    session.commit()
+
+    filter_specs = [
+        {"and": [{"model": "Incident", "field": "title", "op": "==", "value": incident.title}]},
+        {"and": [{"model": "Incident", "field": "title", "op": "!=", "value": incident.title}]},
+        {"and": [{"model": "Incident", "field": "title", "op": "ilike", "value": "%"}]},
+        {"and": [{"model": "Incident", "field": "id", "op": "in", "value": [incident.id]}]},
+        {"and": [{"model": "Incident", "field": "id", "op": "not_in", "value": [incident.id]}]},
+        {"and": [{"model": "Incident", "field": "closed_at", "op": "is_null"}]},
+        {
+            "and": [
+                {
+                    "model": "Incident",
+                    "field": "reported_at",
+                    "op": ">",
+                    "value": "2000-01-01T00:00:00",
+                }
+            ]
+        },
+        {"and": [{"model": "Tag", "field": "name", "op": "==", "value": tag.name}]},
+        {"and": [{"model": "Tag", "field": "name", "op": "==", "value": "missing"}]},
+        {"and": [{"model": "TagType", "field": "name", "op": "==", "value": tag.tag_type.name}]},
+        {
+            "and": [
+                {
+                    "model": "IncidentType",
+                    "field": "name",
+                    "op": "==",
+                    "value": incident.incident_type.name,
+                }
+            ]
+        },
+        {
+            "or": [
+                {"model": "IncidentPriority", "field": "name", "op": "==", "value": "missing"},
+                {"not": [{"model": "Tag", "field": "name", "op": "==", "value": "missing"}]},
+            ]
+        },
+    ]
+
+    for filter_spec in filter_specs:
+        expected = bool(
+            match_sql(db_session=session, filter_spec=filter_spec, class_instance=incident)
+        )
+        assert evaluate(filter_spec=filter_spec, class_instance=incident) == expected, filter_spec
+
+    # aware values can't be compared with naive columns in memory, match falls back to SQL
+    filter_spec = {
+        "and": [
+            {
+                "model": "Incident",
+                "field": "reported_at",
+                "op": ">",
+                "value": "2000-01-01T00:00:00+00:00",
+            }
+        ]
+    }
+    with pytest.raises(UnsupportedFilterError):
+        evaluate(filter_spec=filter_spec, class_instance=incident)
+
+    expected = bool(match_sql(db_session=session, filter_spec=filter_spec, class_instance=incident))
+    assert match(db_session=session, filter_spec=filter_spec, class_instance=incident) == expected
+
+
+def test_match_many(session, incidents, search_filter):
+    from dispatch.search_filter.service import match_many
+
+    incident = incidents[0]
+    search_filter.expression = {
+        "and": [{"model": "Incident", "field": "id", "op": "==", "value": incident.id}]
+    }
+    session.commit()
+
+    matches = match_many(
+        db_session=session, search_filters=[search_filter], class_instances=incidents
+    )
+    assert matches[search_filter.id] == {incident.id}
@@ -0,0 +1,65 @@
+import pytest
+
+
+def test_span_nesting():
+    from dispatch.tracing import get_current_span, span
+
+    with span("flow", incident_id=1) as root:
+        assert get_current_span() is root
+        with span("step", plugin_slug="test-plugin") as child:
+            assert get_current_span() is child
+        assert get_current_span() is root
+
+    assert get_current_span() is None
+
+    assert child.parent is root
+    assert child.trace_id == root.trace_id
+    # spans are appended as they end, the root last
+    assert root.spans == [child, root]
+    assert child.end_time <= root.end_time
+
+
+def test_span_error():
+    from dispatch.tracing import span
+
+    with pytest.raises(ValueError):
+        with span("flow") as root:
+            raise ValueError("boom")
+
+    assert root.error == "ValueError: boom"
+    assert root.to_otel()["status"] == {"code": 2, "message": "ValueError: boom"}
+
+
+def test_to_otel():
+    from dispatch.tracing import get_otel_trace, span
+
+    with span("flow", incident_id=1, public=True) as root:
+        with span("step", plugin_slug="test-plugin") as child:
+            pass
+
+    otel_root, otel_child = root.to_otel(), child.to_otel()
+    assert otel_root["traceId"] == otel_child["traceId"] == root.trace_id
+    assert otel_child["parentSpanId"] == root.span_id
+    assert "parentSpanId" not in otel_root
+    assert otel_root["status"] == {"code": 1}
+    assert otel_root["startTimeUnixNano"] == str(root.start_time)
+    assert otel_root["attributes"] == [
+        {"key": "incident_id", "value": {"intValue": "1"}},
+        {"key": "public", "value": {"boolValue": True}},
+    ]
+
+    trace = get_otel_trace(root.spans)
+    spans = trace["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["step", "flow"]
+
+
+def test_traced():
+    from dispatch.tracing import get_current_span, traced
+
+    @traced()
+    def step():
+        return get_current_span()
+
+    current = step()
+    assert current.name == f"{__name__}.test_traced.<locals>.step"
+    assert current.parent is None